@@ -0,0 +1,97 @@
+# pylint: disable=C
+# type: ignore
+import os
+import pickle
+import sys
+import timeit
+
+path = os.path.dirname(os.path.abspath(__file__))
+sourcePath = os.path.join(path, "..")
+sourcePath = os.path.abspath(sourcePath)
+sys.path.append(sourcePath)
+
+from src.crypto.envelope import DATA_KEY_SALT
+from src.crypto.envelope import generate_data_key
+from src.model.codec import decode_list
+from src.model.codec import decode_optional
+from src.model.codec import encode_list
+from src.model.codec import encode_optional
+from src.model.metadata import Metadata
+from src.model.metadata import adapt_metadata
+from src.model.metadata import convert_metadata
+from src.model.password import Password
+from src.model.password import adapt_passwords
+from src.model.password import convert_passwords
+
+
+def sample_row() -> tuple:
+    """
+    Creates the values of the encoded columns of a typical password entry.
+    """
+    key = generate_data_key()
+    passwords = [Password(f"password{i}") for i in range(3)]
+    for password in passwords:
+        password.encrypt_with_key(key, DATA_KEY_SALT)
+    username = Password("user@example.com")
+    username.encrypt_with_key(key, DATA_KEY_SALT)
+    return (
+        DATA_KEY_SALT,
+        username(),
+        passwords,
+        [os.urandom(40), os.urandom(40)],
+        os.urandom(60),
+        Metadata().encrypt(key),
+    )
+
+
+def main() -> None:
+    """
+    Compares the size and decode time of a row encoded with pickle, as done
+    by older versions, and with `src.model.codec`.
+
+    The number of decoded rows can be passed as the first argument and
+    defaults to 20000.
+    """
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    row = sample_row()
+    salt, username, passwords, categories, note, metadata = row
+
+    pickled = [pickle.dumps(value) for value in row]
+    encoded = [
+        encode_optional(salt),
+        encode_optional(username),
+        adapt_passwords(passwords),
+        encode_list(categories),
+        encode_optional(note),
+        adapt_metadata(metadata),
+    ]
+
+    def decode_pickled() -> None:
+        for value in pickled:
+            pickle.loads(value)
+
+    def decode_encoded() -> None:
+        decode_optional(encoded[0])
+        decode_optional(encoded[1])
+        convert_passwords(encoded[2])
+        decode_list(encoded[3])
+        decode_optional(encoded[4])
+        convert_metadata(encoded[5])
+
+    candidates = (
+        ("pickle", pickled, decode_pickled),
+        ("codec", encoded, decode_encoded),
+    )
+    # Alternate between both candidates, so drift affects them alike
+    best = {name: float("inf") for name, _, _ in candidates}
+    for _ in range(5):
+        for name, _, decode in candidates:
+            best[name] = min(best[name], timeit.timeit(decode, number=rows))
+
+    for name, values, _ in candidates:
+        size = sum(len(value) for value in values)
+        print(f"{name:<8}{size:>6} bytes/row{best[name] / rows * 1e6:>10.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# pylint: disable=C
+# type: ignore
+import lzma
+import os
+import sqlite3
+import sys
+import timeit
+
+path = os.path.dirname(os.path.abspath(__file__))
+sourcePath = os.path.join(path, "..")
+sourcePath = os.path.abspath(sourcePath)
+sys.path.append(sourcePath)
+
+from src.controller.connection import connect_to_db
+from src.controller.user import retrieve_user_by_name
+from src.controller.user import unlock_vault
+from src.crypto.aead import RecordCipher
+from src.model.codec import decode_list
+from src.model.codec import decode_optional
+from src.model.password import Password
+from src.model.password import adapt_password
+from src.model.password import convert_password
+from dotenv import load_dotenv
+
+THRESHOLDS = (0, 64, 128, 256, 512, 1024)
+FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6}]
+
+
+def vault_payloads(cursor: sqlite3.Cursor, username: str, password: str) -> list:
+    """
+    Decrypts the encrypted payloads of a user's vault, i.e. sealed entries and
+    bodies, encrypted fields and the password history.
+    """
+    user = retrieve_user_by_name(cursor, username)
+    if user is None:
+        sys.exit(f'User "{username}" not found')
+    user.set_clear_password(password)
+    unlock_vault(cursor, user)
+    cipher = RecordCipher(user.get_data_key(), threshold=0)
+
+    records = []
+    cursor.execute(
+        "SELECT entry, body, note, categories FROM passwords WHERE user=?",
+        (user.id,),
+    )
+    for entry, body, note, categories in cursor.fetchall():
+        records += [record for record in (entry, body) if record is not None]
+        if note is not None and decode_optional(note) is not None:
+            records.append(decode_optional(note))
+        if categories is not None:
+            records += decode_list(categories)
+    cursor.execute(
+        "SELECT h.password FROM password_history h "
+        "JOIN passwords p ON p.id = h.entry WHERE p.user=?",
+        (user.id,),
+    )
+    records += [convert_password(row[0]).password_bytes for row in cursor]
+    return [cipher.decrypt(record) for record in records if record]
+
+
+def main() -> None:
+    """
+    Compares the stored size and the seal and open time of the payloads of a
+    vault with zlib compression at several thresholds, and with lzma.
+
+    The username and password of the vault can be passed as the first two
+    arguments and default to the test user of "scripts/populate_database.py".
+    """
+    load_dotenv()
+    sqlite3.register_converter("password", convert_password)
+    sqlite3.register_adapter(Password, adapt_password)
+    username = sys.argv[1] if len(sys.argv) > 1 else "Test"
+    password = sys.argv[2] if len(sys.argv) > 2 else "TestUser2103"
+    with connect_to_db() as connection:
+        payloads = vault_payloads(connection.cursor(), username, password)
+        connection.rollback()
+    if not payloads:
+        sys.exit("The vault is empty")
+
+    key = os.urandom(32)
+    plain = sum(len(payload) for payload in payloads)
+    print(f"{len(payloads)} payloads, {plain} bytes of plaintext")
+    print(f"{'candidate':<14}{'stored bytes':>14}{'ratio':>8}{'us/payload':>12}")
+
+    candidates = [
+        (f"zlib >= {threshold}" if threshold else "none", RecordCipher(key, threshold))
+        for threshold in THRESHOLDS
+    ]
+    candidates.append(("lzma >= 256", LzmaCipher(key, 256)))
+    for name, cipher in candidates:
+        records = [cipher.seal(payload) for payload in payloads]
+        assert [cipher.open(record) for record in records] == payloads
+
+        def round_trip() -> None:
+            for payload in payloads:
+                cipher.open(cipher.seal(payload))
+
+        best = min(timeit.repeat(round_trip, number=20, repeat=5)) / 20
+        size = sum(len(record) for record in records)
+        print(
+            f"{name:<14}{size:>14}{size / plain:>8.2f}"
+            f"{best / len(payloads) * 1e6:>12.2f}"
+        )
+
+
+class LzmaCipher:
+    """
+    Seals payloads of at least the threshold compressed with lzma, marked by
+    a leading byte, for comparison with the zlib compression of RecordCipher.
+    """
+
+    def __init__(self, key: bytes, threshold: int) -> None:
+        self.cipher = RecordCipher(key, threshold=0)
+        self.threshold = threshold
+
+    def seal(self, data: bytes) -> bytes:
+        if len(data) >= self.threshold:
+            compressed = lzma.compress(data, format=lzma.FORMAT_RAW, filters=FILTERS)
+            if len(compressed) < len(data):
+                return self.cipher.seal(b"\x01" + compressed)
+        return self.cipher.seal(b"\x00" + data)
+
+    def open(self, record: bytes) -> bytes:
+        data = self.cipher.open(record)
+        if data[0]:
+            return lzma.decompress(data[1:], format=lzma.FORMAT_RAW, filters=FILTERS)
+        return data[1:]
+
+
+if __name__ == "__main__":
+    main()
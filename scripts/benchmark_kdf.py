@@ -0,0 +1,51 @@
+# pylint: disable=C
+# type: ignore
+import os
+import statistics
+import sys
+import time
+
+path = os.path.dirname(os.path.abspath(__file__))
+sourcePath = os.path.join(path, "..")
+sourcePath = os.path.abspath(sourcePath)
+sys.path.append(sourcePath)
+
+from src.crypto.kdf_backend import KDF_BACKENDS
+
+MINIMAL_COST = {"pbkdf2-sha256": (2, 0, 0)}
+
+
+def time_calls(backend, cost, calls: int) -> list[float]:
+    """
+    Derives a key repeatedly and returns the duration of every call in milliseconds.
+    """
+    salt = os.urandom(16)
+    durations = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        backend.derive(b"benchmark", salt, cost)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main() -> None:
+    """
+    Compares the key derivation backends on this host.
+
+    For every backend, the median latency with its configured cost and the
+    per-call overhead with a minimal cost are printed. The number of calls
+    per backend can be passed as the first argument and defaults to 5.
+    """
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'backend':<16}{'cost':>20}{'median ms':>12}{'overhead us':>14}")
+    for backend in KDF_BACKENDS.values():
+        cost = backend.default_cost()
+        median = statistics.median(time_calls(backend, cost, calls))
+        minimal = MINIMAL_COST.get(backend.name, (2, 1, 1))
+        overhead = statistics.median(time_calls(backend, minimal, 1000)) * 1000
+        print(f"{backend.name:<16}{str(cost):>20}{median:>12.1f}{overhead:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
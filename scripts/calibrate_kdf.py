@@ -0,0 +1,37 @@
+# pylint: disable=C
+# type: ignore
+import os
+import sys
+import time
+
+path = os.path.dirname(os.path.abspath(__file__))
+sourcePath = os.path.join(path, "..")
+sourcePath = os.path.abspath(sourcePath)
+sys.path.append(sourcePath)
+
+from src.crypto.key_derivation import calibrate_scrypt, scrypt_derive
+
+
+def main() -> None:
+    """
+    Benchmarks Scrypt on this host and prints the parameters reaching the
+    target latency, in a format that can be added to the ".env" file.
+
+    The target latency in milliseconds can be passed as the first argument
+    and defaults to 250ms.
+    """
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    n, r, p = calibrate_scrypt(target_ms)
+
+    start = time.perf_counter()
+    scrypt_derive(b"calibration", n=n, r=r, p=p)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"# Scrypt takes {elapsed_ms:.0f}ms on this host (target {target_ms:.0f}ms)")
+    print(f"SCRYPT_N={n}")
+    print(f"SCRYPT_R={r}")
+    print(f"SCRYPT_P={p}")
+
+
+if __name__ == "__main__":
+    main()
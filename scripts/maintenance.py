@@ -0,0 +1,97 @@
+# pylint: disable=C
+# type: ignore
+import argparse
+import os
+import sys
+
+path = os.path.dirname(os.path.abspath(__file__))
+sourcePath = os.path.join(path, "..")
+sourcePath = os.path.abspath(sourcePath)
+sys.path.append(sourcePath)
+
+from src.controller.connection import connect_to_db
+from src.controller.maintenance import AUTO_VACUUM_MODES
+from src.controller.maintenance import analyze
+from src.controller.maintenance import blob_size_histograms
+from src.controller.maintenance import incremental_vacuum
+from src.controller.maintenance import index_usage
+from src.controller.maintenance import optimize
+from src.controller.maintenance import page_statistics
+from src.controller.maintenance import table_statistics
+from src.controller.maintenance import user_row_counts
+from src.controller.maintenance import vacuum
+from dotenv import load_dotenv
+
+
+def print_report(cursor) -> None:
+    """
+    Prints the storage statistics of the database.
+    """
+    pages = page_statistics(cursor)
+    size = pages["page_count"] * pages["page_size"]
+    free_share = pages["freelist_count"] / max(pages["page_count"], 1)
+    print("Database")
+    print(f"  size          {size / 2**20:.2f} MiB ({pages['page_count']} pages)")
+    print(f"  free pages    {pages['freelist_count']} ({free_share:.1%})")
+    print(f"  auto vacuum   {AUTO_VACUUM_MODES.get(pages['auto_vacuum'], 'unknown')}")
+
+    print("\nUsers (hashed username, entries, stored passwords)")
+    for username, entries, passwords in user_row_counts(cursor):
+        print(f"  {username.hex()[:12]}  {entries:>8}{passwords:>8}")
+
+    print("\nValue sizes (up to bytes: count)")
+    for name, histogram in blob_size_histograms(cursor).items():
+        buckets = ", ".join(f"{bucket}: {count}" for bucket, count in histogram.items())
+        print(f"  {name:<10}{buckets or '-'}")
+
+    tables = table_statistics(cursor)
+    if tables:
+        print("\nTables and indexes (pages, unused share)")
+        for name, page_count, unused in tables:
+            print(f"  {name:<28}{page_count:>8}{unused:>8.1%}")
+
+    print("\nIndexes (table, statistics, used by)")
+    for index, table, stat, queries in index_usage(cursor):
+        print(f"  {index:<28}{table:<20}{stat or '-':<16}{', '.join(queries) or '-'}")
+
+
+def main() -> None:
+    """
+    Prints the storage statistics of the database and runs the requested
+    maintenance operations before.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--incremental",
+        type=int,
+        metavar="PAGES",
+        help="free up to PAGES unused pages, 0 frees all",
+    )
+    parser.add_argument("--analyze", action="store_true", help="run ANALYZE")
+    parser.add_argument("--optimize", action="store_true", help="run PRAGMA optimize")
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="rebuild the database, which also enables incremental auto vacuum",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    connection = connect_to_db()
+    try:
+        if args.vacuum:
+            vacuum(connection)
+        if args.incremental is not None:
+            freed = incremental_vacuum(connection, args.incremental)
+            print(f"Freed {freed} pages\n")
+        if args.analyze:
+            analyze(connection)
+        if args.optimize:
+            optimize(connection)
+        print_report(connection.cursor())
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,9 @@ sourcePath = os.path.abspath(sourcePath)
 sys.path.append(sourcePath)
 
 from src.controller.connection import connect_to_db
-from src.controller.password import insert_password_information
+from src.controller.unit_of_work import UnitOfWork
 from src.controller.user import insert_user
+from src.controller.user import unlock_vault
 from src.crypto.hashing import hash_sha256
 from src.model.password import Password, adapt_password, convert_password
 from src.model.password_information import PasswordInformation
@@ -30,12 +31,14 @@ def main() -> None:
     load_dotenv()
     sqlite3.register_converter("password", convert_password)
     sqlite3.register_adapter(Password, adapt_password)
-    with connect_to_db() as connection:
-        cursor = connection.cursor()
-        add_test_users(cursor)
+    connection = connect_to_db()
+    with UnitOfWork(connection) as work:
+        add_test_users(work.cursor)
+        test_user = User.new("Test", "TestUser2103")
+        test_user.set_clear_password("TestUser2103")
+        unlock_vault(work.cursor, test_user)
         for i in range(7):
-            add_test_passwords(cursor, User.new("Test", "TestUser2103"), i)
-        connection.commit()
+            add_test_passwords(work, test_user, i)
 
 
 def add_test_users(cursor: sqlite3.Cursor) -> None:
@@ -56,12 +59,12 @@ def add_test_users(cursor: sqlite3.Cursor) -> None:
     insert_user(cursor, test_user)
 
 
-def add_test_passwords(cursor: sqlite3.Cursor, user: User, index: int) -> None:
+def add_test_passwords(work: UnitOfWork, user: User, index: int) -> None:
     """
-    Adds test password information to the database for a given user.
+    Adds test password information to the unit of work for a given user.
 
     Args:
-        cursor (sqlite3.Cursor): The SQLite cursor used to execute SQL commands.
+        work (UnitOfWork): The unit of work the passwords are inserted with.
         user (User): The user object associated with the passwords.
         index (int): An index value used to create unique password entries.
     """
@@ -87,11 +90,14 @@ def add_test_passwords(cursor: sqlite3.Cursor, user: User, index: int) -> None:
         user, test_password_5, f"www.gmail{index}.com", "test@gmail.com"
     )
 
-    insert_password_information(cursor, test_password_information_1)
-    insert_password_information(cursor, test_password_information_2)
-    insert_password_information(cursor, test_password_information_3)
-    insert_password_information(cursor, test_password_information_4)
-    insert_password_information(cursor, test_password_information_5)
+    for password_information in (
+        test_password_information_1,
+        test_password_information_2,
+        test_password_information_3,
+        test_password_information_4,
+        test_password_information_5,
+    ):
+        work.insert(password_information)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,40 @@ Provides utility functions for managing database paths and other constants.
 Main Functions:
     db_path() -> str: 
         Retrieves the database path from an environment variable or generates a default.
+    key_cache_size() -> int:
+        Retrieves the maximum number of cached derived keys.
+    scrypt_parameters() -> tuple[int, int, int]:
+        Retrieves the Scrypt cost parameters used for new key derivations.
+    kdf_backend() -> str:
+        Retrieves the name of the key derivation backend used for new key derivations.
+    pbkdf2_iterations() -> int:
+        Retrieves the PBKDF2 iteration count used for new key derivations.
+    decrypt_workers() -> int:
+        Retrieves the number of worker processes used for bulk decryption.
+    parallel_decrypt_threshold() -> int:
+        Retrieves the number of keys from which their derivation runs in parallel.
+    entry_format() -> str:
+        Retrieves the format new password entries are stored in.
+    entry_page_size() -> int:
+        Retrieves the number of password entries retrieved per page when streaming.
+    connection_profile() -> dict[str, str]:
+        Retrieves the SQLite pragmas applied to every database connection.
+    busy_timeout() -> int:
+        Retrieves how long a connection waits for a locked database.
+    reader_connections() -> int:
+        Retrieves the maximum number of read-only connections of the connection pool.
+    compression_threshold() -> int:
+        Retrieves the size from which encrypted data is compressed first.
+    backup_dir() -> str:
+        Retrieves the directory database backups are written to.
+    backup_count() -> int:
+        Retrieves the number of database backups kept when rotating them.
+    backup_interval() -> int:
+        Retrieves the interval of scheduled database backups in seconds.
+    backup_step_pages() -> int:
+        Retrieves the number of database pages copied per backup step.
+    maintenance_step_pages() -> int:
+        Retrieves the number of free pages released per idle maintenance step.
 
 Constants:
     MIN_SIZE: tuple[int, int] = (35, 80)
@@ -32,3 +66,292 @@ def db_path() -> str:
              default generated path.
     """
     return os.getenv("DB_PATH") or hash_sha256("ppwm".encode()).hex()[:12]
+
+
+def key_cache_size() -> int:
+    """
+    Retrieves the maximum number of derived keys kept in the session key cache.
+
+    This function checks for the presence of an environment variable named
+    'KEY_CACHE_SIZE'. If the environment variable is not set, a default of
+    4096 keys is used.
+
+    Returns:
+        int: The maximum number of cached derived keys.
+    """
+    return int(os.getenv("KEY_CACHE_SIZE") or 4096)
+
+
+def scrypt_parameters() -> tuple[int, int, int]:
+    """
+    Retrieves the Scrypt cost parameters n, r and p used for new key derivations.
+
+    This function checks for the presence of the environment variables
+    'SCRYPT_N', 'SCRYPT_R' and 'SCRYPT_P'. Unset variables default to
+    n=2**14, r=8 and p=1. Suitable values for a host can be determined with
+    "scripts/calibrate_kdf.py".
+
+    Returns:
+        tuple[int, int, int]: The Scrypt parameters n, r and p.
+    """
+    return (
+        int(os.getenv("SCRYPT_N") or 2**14),
+        int(os.getenv("SCRYPT_R") or 8),
+        int(os.getenv("SCRYPT_P") or 1),
+    )
+
+
+def kdf_backend() -> str:
+    """
+    Retrieves the name of the key derivation backend used for new key derivations.
+
+    Either "scrypt" (Scrypt of the cryptography package), "hashlib-scrypt"
+    (Scrypt of the standard library) or "pbkdf2-sha256". Records derived with
+    another backend can still be read. The backends can be compared on a host
+    with "scripts/benchmark_kdf.py".
+
+    This function checks for the presence of an environment variable named
+    'KDF_BACKEND'. If the environment variable is not set, "scrypt" is used.
+
+    Returns:
+        str: The name of the key derivation backend.
+    """
+    return os.getenv("KDF_BACKEND") or "scrypt"
+
+
+def pbkdf2_iterations() -> int:
+    """
+    Retrieves the PBKDF2 iteration count used for new key derivations.
+
+    The iteration count is stored as a power of two, other values are
+    rejected when a key is derived.
+
+    This function checks for the presence of an environment variable named
+    'PBKDF2_ITERATIONS'. If the environment variable is not set, 2**20
+    iterations are used.
+
+    Returns:
+        int: The PBKDF2 iteration count.
+    """
+    return int(os.getenv("PBKDF2_ITERATIONS") or 2**20)
+
+
+def decrypt_workers() -> int:
+    """
+    Retrieves the number of worker processes used for bulk decryption.
+
+    This function checks for the presence of an environment variable named
+    'DECRYPT_WORKERS'. If the environment variable is not set, one worker per
+    CPU core is used.
+
+    Returns:
+        int: The number of decryption worker processes.
+    """
+    return int(os.getenv("DECRYPT_WORKERS") or os.cpu_count() or 1)
+
+
+def parallel_decrypt_threshold() -> int:
+    """
+    Retrieves the number of keys derived per row from the master password
+    from which their derivation is spread across the worker processes. A
+    derivation takes tens of milliseconds, while starting the worker pool
+    takes about a second on first use, so fewer keys are derived serially.
+
+    This function checks for the presence of an environment variable named
+    'PARALLEL_DECRYPT_THRESHOLD'. If the environment variable is not set, a
+    default of 32 keys is used.
+
+    Returns:
+        int: The minimum number of keys for parallel derivation.
+    """
+    return int(os.getenv("PARALLEL_DECRYPT_THRESHOLD") or 32)
+
+
+def entry_format() -> str:
+    """
+    Retrieves the format new password entries are stored in.
+
+    With "sealed", the whole entry including its metadata is serialized and
+    encrypted as a single record. With "fields", every field is encrypted on
+    its own, as done by older versions.
+
+    This function checks for the presence of an environment variable named
+    'ENTRY_FORMAT'. If the environment variable is not set, "sealed" is used.
+
+    Returns:
+        str: The entry format, either "sealed" or "fields".
+    """
+    return os.getenv("ENTRY_FORMAT") or "sealed"
+
+
+def entry_page_size() -> int:
+    """
+    Retrieves the number of password entries retrieved per page when the
+    entries are streamed, e.g. for exports. It bounds the number of entries
+    held in memory at once.
+
+    This function checks for the presence of an environment variable named
+    'ENTRY_PAGE_SIZE'. If the environment variable is not set, a default of 256
+    entries is used.
+
+    Returns:
+        int: The number of entries per page.
+    """
+    return int(os.getenv("ENTRY_PAGE_SIZE") or 256)
+
+
+def connection_profile() -> dict[str, str]:
+    """
+    Retrieves the SQLite pragmas applied to every database connection.
+
+    New databases are created with `auto_vacuum=INCREMENTAL`, so pages freed by
+    deletions can be returned in small steps, see `src.controller.maintenance`.
+    Existing databases only switch to another mode when they are vacuumed.
+    By default the database is opened in WAL mode with `synchronous=NORMAL`,
+    which only syncs at checkpoints and keeps the database consistent on a
+    crash. The page cache holds up to 16 MiB (negative sizes are in KiB),
+    up to 64 MiB of the database are memory mapped and temporary tables and
+    indexes are kept in memory.
+
+    This function checks for the presence of the environment variables
+    'SQLITE_AUTO_VACUUM', 'SQLITE_JOURNAL_MODE', 'SQLITE_SYNCHRONOUS',
+    'SQLITE_CACHE_SIZE', 'SQLITE_MMAP_SIZE' and 'SQLITE_TEMP_STORE'. Unset
+    variables use the defaults above.
+
+    Returns:
+        dict[str, str]: The values of the pragmas by their name.
+    """
+    # The auto vacuum mode of a new database has to be set before its journal mode
+    return {
+        "auto_vacuum": os.getenv("SQLITE_AUTO_VACUUM") or "incremental",
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE") or "wal",
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS") or "normal",
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE") or str(-16 * 1024),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE") or str(64 * 1024 * 1024),
+        "temp_store": os.getenv("SQLITE_TEMP_STORE") or "memory",
+    }
+
+
+def busy_timeout() -> int:
+    """
+    Retrieves how long a connection waits for a lock held by another
+    connection, e.g. of a background thread, before failing with
+    "database is locked".
+
+    This function checks for the presence of an environment variable named
+    'SQLITE_BUSY_TIMEOUT'. If the environment variable is not set, a default of
+    5000 milliseconds is used.
+
+    Returns:
+        int: The busy timeout in milliseconds.
+    """
+    return int(os.getenv("SQLITE_BUSY_TIMEOUT") or 5000)
+
+
+def reader_connections() -> int:
+    """
+    Retrieves the maximum number of read-only connections the connection pool
+    opens next to its writer. Threads reading beyond that wait for a reader
+    to be returned.
+
+    This function checks for the presence of an environment variable named
+    'READER_CONNECTIONS'. If the environment variable is not set, a default of
+    4 connections is used.
+
+    Returns:
+        int: The maximum number of reader connections.
+    """
+    return int(os.getenv("READER_CONNECTIONS") or 4)
+
+
+def compression_threshold() -> int:
+    """
+    Retrieves the size in bytes from which data is compressed before it is
+    encrypted. Passwords and short fields stay below it, while long notes and
+    sealed entries shrink considerably. A threshold of 0 disables compression.
+
+    This function checks for the presence of an environment variable named
+    'COMPRESSION_THRESHOLD'. If the environment variable is not set, a default
+    of 256 bytes is used. The trade-off can be measured on a vault with
+    "scripts/benchmark_compression.py".
+
+    Returns:
+        int: The compression threshold in bytes.
+    """
+    return int(os.getenv("COMPRESSION_THRESHOLD") or 256)
+
+
+def backup_dir() -> str:
+    """
+    Retrieves the directory database backups are written to.
+
+    This function checks for the presence of an environment variable named
+    'BACKUP_DIR'. If the environment variable is not set, the directory
+    "backups" is used.
+
+    Returns:
+        str: The backup directory.
+    """
+    return os.getenv("BACKUP_DIR") or "backups"
+
+
+def backup_count() -> int:
+    """
+    Retrieves the number of database backups that are kept. Older backups are
+    removed whenever a new one is written.
+
+    This function checks for the presence of an environment variable named
+    'BACKUP_COUNT'. If the environment variable is not set, a default of 7
+    backups is used.
+
+    Returns:
+        int: The number of backups to keep.
+    """
+    return int(os.getenv("BACKUP_COUNT") or 7)
+
+
+def backup_interval() -> int:
+    """
+    Retrieves the interval in which the database is backed up in the
+    background while the application is running. An interval of 0 disables
+    scheduled backups, backups can still be started from the interface.
+
+    This function checks for the presence of an environment variable named
+    'BACKUP_INTERVAL'. If the environment variable is not set, a default of
+    86400 seconds (one day) is used.
+
+    Returns:
+        int: The backup interval in seconds.
+    """
+    return int(os.getenv("BACKUP_INTERVAL") or 86400)
+
+
+def backup_step_pages() -> int:
+    """
+    Retrieves the number of database pages copied per backup step. Between
+    steps the database isn't locked, so smaller steps keep writers from
+    waiting on a backup.
+
+    This function checks for the presence of an environment variable named
+    'BACKUP_STEP_PAGES'. If the environment variable is not set, a default of
+    256 pages is used.
+
+    Returns:
+        int: The number of pages per backup step.
+    """
+    return int(os.getenv("BACKUP_STEP_PAGES") or 256)
+
+
+def maintenance_step_pages() -> int:
+    """
+    Retrieves the number of free database pages returned to the file system
+    per maintenance step, which runs while the interface is idle.
+
+    This function checks for the presence of an environment variable named
+    'MAINTENANCE_STEP_PAGES'. If the environment variable is not set, a
+    default of 128 pages is used.
+
+    Returns:
+        int: The number of pages per maintenance step.
+    """
+    return int(os.getenv("MAINTENANCE_STEP_PAGES") or 128)
@@ -0,0 +1,179 @@
+"""
+Provides online backups of the database using SQLite's backup API.
+
+Backups are copied in small steps, so writers only wait for a single step,
+and written to timestamped files, of which only the newest are kept.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import Callable
+from typing import Optional
+
+from src.config import backup_count
+from src.config import backup_dir
+from src.config import backup_step_pages
+from src.config import db_path
+
+BACKUP_SUFFIX = ".db"
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+BUSY_RETRY_DELAY = 0.005
+
+
+def backup_database(
+    source: sqlite3.Connection,
+    directory: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    """
+    Backs up the database to a new timestamped file and removes the oldest
+    backups beyond `backup_count`.
+
+    In WAL mode the backup is copied from a single read snapshot of the
+    source, which doesn't block writers, so it doesn't restart when the
+    database is written to meanwhile. The file only appears under its final
+    name once it is complete.
+
+    Args:
+        source (sqlite3.Connection): The connection to back up, preferably a
+        reader of the connection pool.
+        directory (Optional[str]): The directory the backup is written to.
+        If None, the configured backup directory is used.
+        progress (Optional[Callable[[int, int], None]]): Called after every
+        step with the number of remaining and total pages. Raising aborts
+        the backup.
+
+    Returns:
+        str: The path of the backup.
+    """
+    directory = directory or backup_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _backup_name(datetime.now()))
+    partial = path + ".partial"
+
+    snapshot = not source.in_transaction and _journal_mode(source) == "wal"
+    if snapshot:
+        source.execute("BEGIN")
+        source.execute("SELECT 1 FROM sqlite_schema LIMIT 1").fetchall()
+    try:
+        with closing(sqlite3.connect(partial)) as target:
+            source.backup(
+                target,
+                pages=backup_step_pages(),
+                progress=_step_callback(progress),
+                sleep=BUSY_RETRY_DELAY,
+            )
+        os.replace(partial, path)
+    finally:
+        if snapshot:
+            source.rollback()
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    rotate_backups(directory, backup_count())
+    return path
+
+
+def list_backups(directory: Optional[str] = None) -> list[str]:
+    """
+    Lists the backups of the database, oldest first.
+
+    Args:
+        directory (Optional[str]): The directory of the backups.
+        If None, the configured backup directory is used.
+
+    Returns:
+        list[str]: The paths of the backups.
+    """
+    directory = directory or backup_dir()
+    if not os.path.isdir(directory):
+        return []
+    prefix = _backup_prefix()
+    names = sorted(
+        name
+        for name in os.listdir(directory)
+        if name.startswith(prefix) and name.endswith(BACKUP_SUFFIX)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def rotate_backups(directory: Optional[str], keep: int) -> list[str]:
+    """
+    Removes all but the newest backups of the database.
+
+    Args:
+        directory (Optional[str]): The directory of the backups.
+        If None, the configured backup directory is used.
+        keep (int): The number of backups to keep.
+
+    Returns:
+        list[str]: The paths of the removed backups.
+    """
+    backups = list_backups(directory)
+    removed = backups[: max(len(backups) - keep, 0)]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def _backup_prefix() -> str:
+    """
+    Returns the prefix of the backup names of the database.
+
+    Returns:
+        str: The file name of the database followed by a dash.
+    """
+    return os.path.basename(db_path()) + "-"
+
+
+def _backup_name(timestamp: datetime) -> str:
+    """
+    Returns the name of a backup taken at the given time. Names sort in the
+    order the backups were taken, and include the microseconds, so backups
+    started within the same second don't overwrite each other.
+
+    Args:
+        timestamp (datetime): The time of the backup.
+
+    Returns:
+        str: The file name of the backup.
+    """
+    return f"{_backup_prefix()}{timestamp.strftime(TIMESTAMP_FORMAT)}{BACKUP_SUFFIX}"
+
+
+def _journal_mode(connection: sqlite3.Connection) -> str:
+    """
+    Returns the journal mode of the database of a connection.
+
+    Args:
+        connection (sqlite3.Connection): The connection.
+
+    Returns:
+        str: The journal mode in lowercase.
+    """
+    mode: str = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    return mode.lower()
+
+
+def _step_callback(
+    progress: Optional[Callable[[int, int], None]]
+) -> Optional[Callable[[int, int, int], object]]:
+    """
+    Adapts a progress callback to the signature expected by `backup`.
+
+    Args:
+        progress (Optional[Callable[[int, int], None]]): The callback taking
+        the number of remaining and total pages.
+
+    Returns:
+        Optional[Callable[[int, int, int], object]]: The adapted callback.
+    """
+    if progress is None:
+        return None
+
+    def step(_status: int, remaining: int, total: int) -> None:
+        progress(remaining, total)
+
+    return step
@@ -0,0 +1,160 @@
+"""
+Backs up the database on a background thread, either when a backup is
+requested or when the newest backup is older than the backup interval.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from src.config import backup_interval
+from src.controller.backup import backup_database
+from src.controller.backup import list_backups
+from src.controller.connection_pool import CONNECTION_POOL
+from src.controller.connection_pool import ConnectionPool
+
+
+class BackupCancelled(Exception):
+    """
+    Raised to abort a running backup when the scheduler is stopped.
+    """
+
+
+class BackupScheduler:  # pylint: disable=too-many-instance-attributes
+    """
+    Runs database backups on a background thread.
+
+    Backups are read through a reader of the connection pool, so they don't
+    hold the writer of the interface. The state of the scheduler can be read
+    from any thread.
+
+    Attributes:
+        pool (ConnectionPool): The pool the backups are read from.
+        interval (Optional[int]): The backup interval in seconds, 0 disables
+        scheduled backups. If None, the configured interval is used.
+        progress (Optional[float]): The progress of the running backup between
+        0 and 1, or None if no backup is running.
+        completed (int): The number of backups that were attempted.
+        last_backup (Optional[str]): The path of the last successful backup.
+        last_error (Optional[Exception]): The error of the last backup, if it failed.
+    """
+
+    def __init__(
+        self, pool: ConnectionPool = CONNECTION_POOL, interval: Optional[int] = None
+    ) -> None:
+        """
+        Initializes the BackupScheduler without starting the background thread.
+
+        Args:
+            pool (ConnectionPool): The pool the backups are read from.
+            interval (Optional[int]): The backup interval in seconds, 0 disables
+            scheduled backups. If None, the configured interval is used.
+        """
+        self.pool = pool
+        self.interval = interval
+        self.progress: Optional[float] = None
+        self.completed = 0
+        self.last_backup: Optional[str] = None
+        self.last_error: Optional[Exception] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = False
+        self._attempted_at = 0.0
+
+    def start(self) -> None:
+        """
+        Starts the background thread, if it isn't running yet. The pool must
+        be open until the scheduler is stopped.
+        """
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._wake.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="backup-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def request(self) -> None:
+        """
+        Requests a backup, which starts right away or once the running one is done.
+        """
+        self.start()
+        self._wake.set()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread, aborting a running backup.
+        """
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """
+        Waits for backups to be requested or due and runs them until stopped.
+        """
+        while True:
+            self._wake.wait(self._seconds_until_due())
+            if self._stopping:
+                return
+            self._wake.clear()
+            self._backup()
+
+    def _backup(self) -> None:
+        """
+        Runs a single backup and records its result.
+        """
+        self.progress = 0.0
+        self._attempted_at = time.time()
+        try:
+            with self.pool.reader() as connection:
+                self.last_backup = backup_database(connection, progress=self._step)
+            self.last_error = None
+        except BackupCancelled:
+            pass
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.last_error = e
+        finally:
+            self.progress = None
+            self.completed += 1
+
+    def _step(self, remaining: int, total: int) -> None:
+        """
+        Records the progress of the running backup.
+
+        Args:
+            remaining (int): The number of pages left to copy.
+            total (int): The number of pages of the database.
+
+        Raises:
+            BackupCancelled: If the scheduler is being stopped.
+        """
+        if self._stopping:
+            raise BackupCancelled()
+        self.progress = 1 - remaining / total if total else 1.0
+
+    def _seconds_until_due(self) -> Optional[float]:
+        """
+        Returns the time until the next scheduled backup, based on the time
+        the newest backup was written or the last backup was attempted.
+
+        Returns:
+            Optional[float]: The seconds until the next backup, or None if
+            scheduled backups are disabled.
+        """
+        interval = backup_interval() if self.interval is None else self.interval
+        if interval <= 0:
+            return None
+        backups = list_backups()
+        last = max(
+            os.path.getmtime(backups[-1]) if backups else 0.0, self._attempted_at
+        )
+        return max(last + interval - time.time(), 0)
+
+
+BACKUP_SCHEDULER = BackupScheduler()
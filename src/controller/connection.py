@@ -3,66 +3,59 @@ Handles database connections and schema initialization.
 """
 
 import sqlite3
+from typing import Iterable
 
+from src.config import busy_timeout
+from src.config import connection_profile
 from src.config import db_path
+from src.controller.schema import migrate
 
 
 def connect_to_db() -> sqlite3.Connection:
     """
-    Establishes a connection to the SQLite database and initializes the
-    necessary tables if they do not already exist.
+    Establishes a connection to the SQLite database and upgrades its schema
+    if needed.
 
     The connection is configured to parse declared types (e.g., custom types)
-    and initializes the database schema by calling `initialize_tables`.
+    and tuned with the pragmas of `connection_profile` in the config. It waits
+    up to `busy_timeout` for locks held by other connections. The schema is
+    created or upgraded by `migrate`.
 
     Returns:
         sqlite3.Connection: The SQLite connection object, which can be used
                              to interact with the database.
     """
-    connection = sqlite3.connect(db_path(), detect_types=sqlite3.PARSE_DECLTYPES)
-    cursor = connection.cursor()
-    initialize_tables(cursor)
+    connection = sqlite3.connect(
+        db_path(),
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        timeout=busy_timeout() / 1000,
+    )
+    apply_connection_profile(connection)
+    migrate(connection)
 
     return connection
 
 
-def initialize_tables(cursor: sqlite3.Cursor) -> None:
+def apply_connection_profile(
+    connection: sqlite3.Connection, exclude: Iterable[str] = ()
+) -> None:
     """
-    Initializes the necessary tables in the SQLite database if they do not
-    already exist.
+    Applies the pragmas of `connection_profile` in the config to a connection.
 
-    This function creates the `passwords` and `users` tables, ensuring that
-    the database schema is set up for storing password and user information.
+    Pragma values can't be bound as parameters, so only plain words and
+    integers are accepted.
 
     Args:
-        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
-                                 SQL commands.
+        connection (sqlite3.Connection): The connection to configure.
+        exclude (Iterable[str]): The pragmas to leave unchanged.
 
-    Returns:
-        None: This function does not return any value. It modifies the database
-              schema directly.
+    Raises:
+        ValueError: If a configured value isn't a plain word or integer.
     """
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS passwords (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        description BLOB NOT NULL,
-        username BLOB,
-        passwords BLOB NOT NULL,
-        categories BLOB,
-        note BLOB,
-        user BLOB NOT NULL,
-        metadata BLOB NOT NULL,
-        salt BLOB NOT NULL,
-        FOREIGN KEY(user) REFERENCES users(username)
-    );
-        """
-    )
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS users (
-        username BLOB UNIQUE NOT NULL,
-        password password NOT NULL
-    );
-    """
-    )
+    excluded = set(exclude)
+    for pragma, value in connection_profile().items():
+        if pragma in excluded:
+            continue
+        if not value.removeprefix("-").isalnum():
+            raise ValueError(f"Invalid value {value!r} for pragma {pragma}")
+        connection.execute(f"PRAGMA {pragma} = {value}")
@@ -0,0 +1,234 @@
+"""
+Provides a pool with one writer and several read-only reader connections, so
+background threads can read the database while the UI thread writes to it.
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from types import TracebackType
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from urllib.parse import quote
+
+from src.config import busy_timeout
+from src.config import reader_connections
+from src.controller.connection import apply_connection_profile
+from src.controller.connection import connect_to_db
+
+
+class ConnectionPool:  # pylint: disable=too-many-instance-attributes
+    """
+    A pool of one writer and up to `readers` read-only connections.
+
+    The writer is opened, and the schema migrated, by `open`. It belongs to
+    the thread that opened the pool, and SQLite's `check_same_thread` check
+    is kept for it. In WAL mode readers don't block the writer and see the
+    last committed state, so reads can run on other threads concurrently.
+    Readers are opened on first use, on the database file of the writer, and
+    checked out by one thread at a time, so they are opened without the
+    `check_same_thread` check to be reusable by other threads. Checking out a
+    reader again on the same thread returns the reader it already holds.
+
+    Attributes:
+        readers (Optional[int]): The maximum number of reader connections.
+        If None, the configured amount of readers is used.
+        connect (Callable[[], sqlite3.Connection]): Opens the writer.
+    """
+
+    def __init__(
+        self,
+        readers: Optional[int] = None,
+        connect: Callable[[], sqlite3.Connection] = connect_to_db,
+    ) -> None:
+        """
+        Initializes the ConnectionPool without opening any connections.
+
+        Args:
+            readers (Optional[int]): The maximum number of reader connections.
+            If None, the configured amount of readers is used.
+            connect (Callable[[], sqlite3.Connection]): Opens the writer.
+        """
+        self.readers = readers
+        self.connect = connect
+        self._writer: Optional[sqlite3.Connection] = None
+        self._path = ""
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened: list[sqlite3.Connection] = []
+        self._slots = threading.BoundedSemaphore(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __enter__(self) -> ConnectionPool:
+        """
+        Returns the pool for the block, see `open`.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """
+        Closes the pool when the block is left.
+        """
+        self.close()
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        """
+        Returns the writer connection.
+
+        Returns:
+            sqlite3.Connection: The writer connection.
+
+        Raises:
+            RuntimeError: If the pool isn't open.
+        """
+        if self._writer is None:
+            raise RuntimeError("The connection pool isn't open")
+        return self._writer
+
+    def open(self) -> ConnectionPool:
+        """
+        Opens the writer connection, which upgrades the schema if needed.
+
+        Returns:
+            ConnectionPool: The pool itself, to be used as a context manager.
+
+        Raises:
+            RuntimeError: If the pool is already open.
+        """
+        if self._writer is not None:
+            raise RuntimeError("The connection pool is already open")
+        self._writer = self.connect()
+        self._path = _database_path(self._writer)
+        readers = reader_connections() if self.readers is None else self.readers
+        self._slots = threading.BoundedSemaphore(max(readers, 1))
+        return self
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Checks out a read-only connection for the calling thread, waiting for
+        one to be returned if all readers are in use.
+
+        Yields:
+            sqlite3.Connection: The reader connection.
+
+        Raises:
+            RuntimeError: If the pool isn't open.
+        """
+        held: Optional[sqlite3.Connection] = getattr(self._local, "reader", None)
+        if held is not None:
+            yield held
+            return
+
+        if self._writer is None:
+            raise RuntimeError("The connection pool isn't open")
+        self._slots.acquire()  # pylint: disable=consider-using-with
+        try:
+            connection = self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._local.reader = connection
+        try:
+            yield connection
+        finally:
+            self._local.reader = None
+            self._checkin(connection)
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Closes the writer and all readers. Readers that are checked out while
+        the pool is closed are closed as well.
+        """
+        with self._lock:
+            for connection in self._opened:
+                connection.close()
+            self._opened = []
+            self._idle = queue.LifoQueue()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _checkout(self) -> sqlite3.Connection:
+        """
+        Takes an idle reader, or opens a new one if none is idle.
+
+        Returns:
+            sqlite3.Connection: The reader connection.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        connection = _connect_reader(self._path)
+        with self._lock:
+            self._opened.append(connection)
+        return connection
+
+    def _checkin(self, connection: sqlite3.Connection) -> None:
+        """
+        Returns a reader to the idle readers, ending its read transaction.
+        Readers that were closed with the pool in the meantime are dropped.
+
+        Args:
+            connection (sqlite3.Connection): The reader connection.
+        """
+        with self._lock:
+            if connection not in self._opened:
+                return
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put(connection)
+
+
+def _database_path(connection: sqlite3.Connection) -> str:
+    """
+    Retrieves the path of the main database of a connection.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+
+    Returns:
+        str: The path of the database file, empty for in-memory databases.
+    """
+    databases: list[tuple[int, str, str]] = connection.execute(
+        "PRAGMA database_list"
+    ).fetchall()
+    return next(path for _, name, path in databases if name == "main")
+
+
+def _connect_reader(path: str) -> sqlite3.Connection:
+    """
+    Opens a read-only connection to the database. The journal and auto vacuum
+    modes are properties of the database file, so they're left to the writer.
+
+    Args:
+        path (str): The path of the database.
+
+    Returns:
+        sqlite3.Connection: The reader connection.
+    """
+    connection = sqlite3.connect(
+        f"file:{quote(path)}?mode=ro",
+        uri=True,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        timeout=busy_timeout() / 1000,
+        check_same_thread=False,
+    )
+    apply_connection_profile(connection, exclude=("auto_vacuum", "journal_mode"))
+    connection.execute("PRAGMA query_only = ON")
+    return connection
+
+
+CONNECTION_POOL = ConnectionPool()
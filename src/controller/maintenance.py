@@ -0,0 +1,298 @@
+"""
+Provides statistics about the storage of the database and maintenance
+operations, which free unused pages and keep the query planner statistics
+up to date.
+
+Free pages are only returned to the file system by incremental vacuum steps
+if the database uses `auto_vacuum=INCREMENTAL`. New databases are created
+with it, existing ones are converted by a full `vacuum`.
+"""
+
+import sqlite3
+from typing import Optional
+
+from src.config import maintenance_step_pages
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+# The queries the application relies on, to show which index each one uses
+INDEX_QUERIES: dict[str, str] = {
+    "list entries": "SELECT id FROM passwords WHERE user = ? ORDER BY id",
+    "page entries": "SELECT id FROM passwords WHERE user = ? AND id > ? ORDER BY id",
+    "find duplicate": "SELECT 1 FROM passwords WHERE user = ? AND blind_index = ?",
+    "changed entries": "SELECT id FROM passwords WHERE user = ? AND change_seq > ?",
+    "deleted entries": (
+        "SELECT id FROM password_tombstones WHERE user = ? AND change_seq > ?"
+    ),
+    "history": (
+        "SELECT password FROM password_history WHERE entry = ? ORDER BY seq DESC"
+    ),
+}
+
+# The sizes of the encrypted values, optionally of a single user
+_BLOB_SIZES: dict[str, str] = {
+    "entry": "SELECT length(entry) FROM passwords WHERE ?1 IS NULL OR user = ?1",
+    "body": "SELECT length(body) FROM passwords WHERE ?1 IS NULL OR user = ?1",
+    "note": """
+        SELECT length(note) FROM passwords
+        WHERE entry IS NULL AND (?1 IS NULL OR user = ?1)
+    """,
+    "history": """
+        SELECT length(h.password) FROM password_history h
+        JOIN passwords p ON p.id = h.entry
+        WHERE ?1 IS NULL OR p.user = ?1
+    """,
+}
+
+
+def page_statistics(cursor: sqlite3.Cursor) -> dict[str, int]:
+    """
+    Retrieves the page size, the amount of pages, the amount of free pages and
+    the auto vacuum mode of the database.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+
+    Returns:
+        dict[str, int]: The values of the pragmas "page_size", "page_count",
+        "freelist_count" and "auto_vacuum" by their name.
+    """
+    return {
+        pragma: cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in ("page_size", "page_count", "freelist_count", "auto_vacuum")
+    }
+
+
+def table_statistics(cursor: sqlite3.Cursor) -> list[tuple[str, int, float]]:
+    """
+    Retrieves the amount of pages of every table and index and the share of
+    their pages left unused, i.e. their fragmentation. This requires SQLite
+    to be built with the `dbstat` table.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+
+    Returns:
+        list[tuple[str, int, float]]: The name, amount of pages and unused
+        share of every table and index, largest first. Empty if `dbstat`
+        isn't available.
+    """
+    try:
+        cursor.execute(
+            """
+            SELECT name, COUNT(*), SUM(unused) * 1.0 / SUM(pgsize) FROM dbstat
+            GROUP BY name ORDER BY COUNT(*) DESC, name
+            """
+        )
+    except sqlite3.OperationalError:
+        return []
+    tables: list[tuple[str, int, float]] = cursor.fetchall()
+    return tables
+
+
+def user_row_counts(
+    cursor: sqlite3.Cursor, user: Optional[int] = None
+) -> list[tuple[bytes, int, int]]:
+    """
+    Counts the password entries and stored passwords of every user, or of a
+    single user.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+        user (Optional[int]): The id of the user to count.
+        If None, every user is counted.
+
+    Returns:
+        list[tuple[bytes, int, int]]: The hashed username, the amount of entries
+        and the amount of stored passwords of the users.
+    """
+    cursor.execute(
+        """
+        SELECT
+            u.username,
+            (SELECT COUNT(*) FROM passwords WHERE user = u.id),
+            (
+                SELECT COUNT(*) FROM password_history h
+                JOIN passwords p ON p.id = h.entry
+                WHERE p.user = u.id
+            )
+        FROM users u
+        WHERE ?1 IS NULL OR u.id = ?1
+        ORDER BY u.id
+        """,
+        (user,),
+    )
+    counts: list[tuple[bytes, int, int]] = cursor.fetchall()
+    return counts
+
+
+def blob_size_histograms(
+    cursor: sqlite3.Cursor, user: Optional[int] = None
+) -> dict[str, dict[int, int]]:
+    """
+    Counts the encrypted values by their size, for sealed entries and bodies,
+    notes of entries stored as fields and stored passwords. Sizes are grouped
+    by the next power of two.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+        user (Optional[int]): The id of the user whose values
+        are counted. If None, the values of every user are counted.
+
+    Returns:
+        dict[str, dict[int, int]]: For every kind of value, the amount of
+        values by the upper bound of their size in bytes, in ascending order.
+    """
+    histograms: dict[str, dict[int, int]] = {}
+    for name, query in _BLOB_SIZES.items():
+        histogram: dict[int, int] = {}
+        for (size,) in cursor.execute(query, (user,)):
+            if size:
+                bucket = 1 << (size - 1).bit_length()
+                histogram[bucket] = histogram.get(bucket, 0) + 1
+        histograms[name] = dict(sorted(histogram.items()))
+    return histograms
+
+
+def index_usage(
+    cursor: sqlite3.Cursor,
+) -> list[tuple[str, str, Optional[str], list[str]]]:
+    """
+    Lists the indexes of the database with their statistics of the last
+    `ANALYZE` and the queries of `INDEX_QUERIES` the query planner uses them for.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+
+    Returns:
+        list[tuple[str, str, Optional[str], list[str]]]: The name, table,
+        statistics (if analyzed) and the using queries of every index.
+    """
+    cursor.execute(
+        "SELECT name, tbl_name FROM sqlite_schema WHERE type = 'index' ORDER BY name"
+    )
+    indexes = cursor.fetchall()
+    stats: dict[str, str] = {}
+    if cursor.execute(
+        "SELECT 1 FROM sqlite_schema WHERE name = 'sqlite_stat1'"
+    ).fetchone():
+        cursor.execute("SELECT idx, stat FROM sqlite_stat1 WHERE idx IS NOT NULL")
+        stats = dict(cursor.fetchall())
+
+    plans: dict[str, str] = {}
+    for name, query in INDEX_QUERIES.items():
+        parameters = (None,) * query.count("?")
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}", parameters)
+        plans[name] = " ".join(str(row[-1]) for row in cursor.fetchall())
+
+    return [
+        (
+            index,
+            table,
+            stats.get(index),
+            [name for name, plan in plans.items() if f"INDEX {index} " in f"{plan} "],
+        )
+        for index, table in indexes
+    ]
+
+
+def incremental_vacuum(connection: sqlite3.Connection, pages: int = 0) -> int:
+    """
+    Returns free pages to the file system, if the database uses incremental
+    auto vacuum. A pending transaction is committed first.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+        pages (int): The maximum amount of pages to free, 0 frees all of them.
+
+    Returns:
+        int: The amount of freed pages.
+    """
+    cursor = connection.cursor()
+    if page_statistics(cursor)["auto_vacuum"] != 2:
+        return 0
+    before: int = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+    if before == 0:
+        return 0
+    # execute() would only run the first step of the pragma, freeing one page
+    connection.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+    after: int = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+    return before - after
+
+
+def optimize(connection: sqlite3.Connection) -> None:
+    """
+    Lets SQLite refresh the query planner statistics that are likely outdated.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+    """
+    connection.execute("PRAGMA optimize")
+    connection.commit()
+
+
+def analyze(connection: sqlite3.Connection) -> None:
+    """
+    Gathers the query planner statistics of all tables and indexes.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+    """
+    connection.execute("ANALYZE")
+    connection.commit()
+
+
+def vacuum(connection: sqlite3.Connection) -> None:
+    """
+    Rebuilds the database file, which removes all free pages and fragmentation
+    and applies the configured auto vacuum mode. This rewrites the whole
+    database and locks it while doing so.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+    """
+    connection.commit()
+    connection.execute("VACUUM")
+
+
+class IdleMaintenance:  # pylint: disable=too-few-public-methods
+    """
+    Runs maintenance in small steps while the interface is idle.
+
+    Every step either frees up to `maintenance_step_pages` free pages, or,
+    once no free pages are left, refreshes the query planner statistics once
+    per session.
+
+    Attributes:
+        optimized (bool): Whether the statistics were refreshed in this session.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the IdleMaintenance without any steps run.
+        """
+        self.optimized = False
+
+    def step(self, connection: sqlite3.Connection) -> bool:
+        """
+        Runs a single maintenance step, unless the connection is in the middle
+        of a transaction.
+
+        Args:
+            connection (sqlite3.Connection): The connection to the database.
+
+        Returns:
+            bool: True if any maintenance was done, False otherwise.
+        """
+        if connection.in_transaction:
+            return False
+        if incremental_vacuum(connection, maintenance_step_pages()) > 0:
+            return True
+        if not self.optimized:
+            optimize(connection)
+            self.optimized = True
+            return True
+        return False
+
+
+IDLE_MAINTENANCE = IdleMaintenance()
@@ -2,17 +2,70 @@
 Handles database operations for password management.
 """
 
-import pickle
 import sqlite3
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import Optional
 
-from src.crypto.fernet import decrypt_fernet
-from src.crypto.key_derivation import scrypt_derive
+from src.config import entry_format
+from src.config import entry_page_size
+from src.crypto.aead import decrypt_record
+from src.crypto.decrypt_pool import DECRYPT_POOL
+from src.crypto.envelope import DATA_KEY_SALT
+from src.model.codec import decode_list
+from src.model.codec import decode_optional
+from src.model.codec import encode_list
+from src.model.codec import encode_optional
+from src.model.codec import MARKER
+from src.model.codec import is_encoded
 from src.model.metadata import EncryptedMetadata
+from src.model.metadata import Metadata
+from src.model.metadata import adapt_metadata
+from src.model.metadata import convert_metadata
 from src.model.password import Password
+from src.model.password import adapt_password
+from src.model.password import adapt_passwords
+from src.model.password import convert_password
+from src.model.password import convert_passwords
+from src.model.password_information import SEALED_ENTRY
 from src.model.password_information import PasswordInformation
+from src.model.sealed_entry import decrypt_summary
+from src.model.sealed_entry import open_entry_head
 from src.model.user import User
 
+PasswordRow = tuple[
+    int,
+    bytes,
+    bytes,
+    bytes,
+    bytes,
+    bytes,
+    bytes,
+    Optional[bytes],
+    Optional[bytes],
+    Optional[int],
+    Optional[bytes],
+]
+
+# Joins every entry with its current password, the last one of its history
+_SELECT_ENTRIES = """
+    SELECT
+        p.id, p.description, p.username, p.categories, p.note, p.metadata, p.salt,
+        p.entry, p.body, h.seq, h.password
+    FROM passwords p
+    LEFT JOIN password_history h ON h.entry = p.id AND h.seq = (
+        SELECT MAX(seq) FROM password_history WHERE entry = p.id
+    )
+    WHERE p.user = ?
+"""
+
+_SELECT_ALL = _SELECT_ENTRIES + "ORDER BY p.id"
+
+_SELECT_PAGE = _SELECT_ENTRIES + "AND p.id > ? ORDER BY p.id LIMIT ?"
+
+_SELECT_CHANGED = _SELECT_ENTRIES + "AND p.change_seq > ? ORDER BY p.id"
+
 
 def retrieve_password_information(
     cursor: sqlite3.Cursor, user: User
@@ -20,6 +73,10 @@ def retrieve_password_information(
     """
     Retrieves all password information for a given user from the database.
 
+    Only the description and username are decrypted up front, the remaining
+    fields are decrypted when they are first accessed. Of the password history,
+    only the current password is loaded, see `load_password_history`.
+
     Args:
         cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
         user (User): The user whose password information is to be retrieved.
@@ -27,40 +84,606 @@ def retrieve_password_information(
     Returns:
         List[PasswordInformation]: A list of `PasswordInformation` objects for the specified user.
     """
+    cursor.execute(_SELECT_ALL, (user.id,))
+    results: list[PasswordRow] = cursor.fetchall()
+    return _decrypt_summaries(
+        user, [_password_information_from_row(result, user) for result in results]
+    )
+
+
+def retrieve_password_information_page(
+    cursor: sqlite3.Cursor, user: User, after_id: int = 0, limit: Optional[int] = None
+) -> list[PasswordInformation]:
+    """
+    Retrieves a page of the password information of a user in id order.
+
+    Pages are addressed by the id of the last entry of the previous page, so
+    every page is a range scan of the primary key, no matter how far into
+    the vault it is. Entries are decrypted like in `retrieve_password_information`.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+        user (User): The user whose password information is to be retrieved.
+        after_id (int): The id after which the page starts, 0 for the first page.
+        limit (Optional[int]): The maximum number of entries of the page.
+        If not provided, the configured page size is used.
+
+    Returns:
+        list[PasswordInformation]: The entries of the page, empty after the last page.
+
+    Raises:
+        ValueError: If the limit is not positive.
+    """
+    if limit is None:
+        limit = entry_page_size()
+    if limit <= 0:
+        raise ValueError(f"Invalid page size {limit}")
+    cursor.execute(_SELECT_PAGE, (user.id, after_id, limit))
+    results: list[PasswordRow] = cursor.fetchall()
+    return _decrypt_summaries(
+        user, [_password_information_from_row(result, user) for result in results]
+    )
+
+
+def stream_password_information(
+    cursor: sqlite3.Cursor, user: User, limit: Optional[int] = None
+) -> Iterator[PasswordInformation]:
+    """
+    Yields the password information of a user in id order, one page at a time,
+    so that only a single page is held in memory.
+
+    Every page is read completely before its entries are yielded, so the
+    cursor can be used for other queries while iterating.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+        user (User): The user whose password information is to be retrieved.
+        limit (Optional[int]): The number of entries per page.
+        If not provided, the configured page size is used.
+
+    Yields:
+        PasswordInformation: The entries of the user.
+
+    Raises:
+        ValueError: If the limit is not positive.
+    """
+    if limit is None:
+        limit = entry_page_size()
+    after_id: Optional[int] = 0
+    while after_id is not None:
+        page = retrieve_password_information_page(cursor, user, after_id, limit)
+        yield from page
+        # A short page is the last one
+        after_id = page[-1].id if len(page) == limit else None
+
+
+def current_change_seq(cursor: sqlite3.Cursor) -> int:
+    """
+    Retrieves the current change sequence of the password entries. It is
+    incremented by every insert, update and deletion of an entry.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+
+    Returns:
+        int: The current change sequence.
+    """
+    cursor.execute("SELECT value FROM change_sequence")
+    change_seq: int = cursor.fetchone()[0]
+    return change_seq
+
+
+def retrieve_password_changes(
+    cursor: sqlite3.Cursor, user: User, since: int
+) -> tuple[list[PasswordInformation], list[int], int]:
+    """
+    Retrieves the password entries of a user that changed after the given
+    change sequence, and the ids of the entries deleted since.
+
+    The current sequence is read before the changes, so changes made while
+    reading are retrieved again by the next call, rather than missed.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+        user (User): The user whose changes are to be retrieved.
+        since (int): The change sequence of the last retrieval, see `current_change_seq`.
+
+    Returns:
+        tuple[list[PasswordInformation], list[int], int]: The inserted or updated
+        entries in id order, the ids of the deleted entries and the change
+        sequence to pass to the next call.
+    """
+    change_seq = current_change_seq(cursor)
+    cursor.execute(_SELECT_CHANGED, (user.id, since))
+    results: list[PasswordRow] = cursor.fetchall()
+    changed = _decrypt_summaries(
+        user, [_password_information_from_row(result, user) for result in results]
+    )
     cursor.execute(
         """
-        SELECT id, description, username, passwords, categories, note, metadata, salt
-        FROM passwords WHERE user=?
+        SELECT id FROM password_tombstones
+        WHERE user = ? AND change_seq > ? ORDER BY id
         """,
-        (user.username,),
-    )
-    results: list[tuple[int, bytes, bytes, bytes, bytes, bytes, bytes, bytes]] = (
-        cursor.fetchall()
+        (user.id, since),
     )
+    deleted: list[tuple[int]] = cursor.fetchall()
+    return changed, [result[0] for result in deleted], change_seq
+
+
+def _decrypt_summaries(
+    user: User, password_informations: list[PasswordInformation]
+) -> list[PasswordInformation]:
+    """
+    Decrypts the description and username of password information loaded
+    from the database. Keys derived per row are derived up front by
+    `_derive_keys`.
+
+    Args:
+        user (User): The user the entries belong to.
+        password_informations (list[PasswordInformation]): The encrypted entries.
+
+    Returns:
+        list[PasswordInformation]: The same entries with their summary applied.
+    """
+    _derive_keys(user, [pw_info.get_salt() for pw_info in password_informations])
+    for pw_info in password_informations:
+        pw_info.apply_summary(
+            *decrypt_summary(
+                pw_info.decryption_key(),
+                pw_info.sealed_entry,
+                pw_info.details.description,
+                pw_info.details.username,
+            )
+        )
+    return password_informations
+
 
-    password_informations: list[PasswordInformation] = []
-    for result in results:
-        password_id: int = result[0]
-        description: bytes = result[1]
-        username: Optional[bytes] = pickle.loads(result[2])
-        passwords: list[Password] = pickle.loads(result[3])
-        categories: list[bytes] = pickle.loads(result[4])
-        note: Optional[bytes] = pickle.loads(result[5])
-        metadata: EncryptedMetadata = pickle.loads(result[6])
-        salt: bytes = pickle.loads(result[7])
+def _password_information_from_row(
+    result: PasswordRow, user: User
+) -> PasswordInformation:
+    """
+    Creates an encrypted `PasswordInformation` object from a row of the passwords table.
 
+    Args:
+        result (PasswordRow): The row, containing id, description, username,
+        categories, note, metadata, salt, the sealed entry head and body and the
+        sequence number and value of the current password.
+        user (User): The user the password information belongs to.
+
+    Returns:
+        PasswordInformation: The still encrypted `PasswordInformation` object.
+    """
+    password_id: int = result[0]
+    salt = _decode_salt(result[6])
+    sealed_entry: Optional[bytes] = result[7]
+    # Entries sealed by older versions keep their passwords in the body
+    current = [] if result[10] is None else [convert_password(result[10])]
+    history_size = 0 if result[9] is None else result[9] + 1
+
+    if sealed_entry is not None:
+        pw_info = PasswordInformation.from_sealed_db(
+            salt, (sealed_entry, result[8]), user
+        )
+    else:
         pw_info = PasswordInformation.from_db(
             salt,
-            (description, username, categories, note),
-            passwords,
+            (
+                result[1],
+                decode_optional(result[2]),
+                decode_list(result[3]),
+                decode_optional(result[4]),
+            ),
+            current,
             user,
         )
-        pw_info.id = password_id
-        pw_info.metadata = metadata
+        metadata = convert_metadata(result[5])
+        if metadata is not None:
+            pw_info.metadata = metadata
+
+    pw_info.set_history(current, history_size)
+    pw_info.id = password_id
+    pw_info.mark_clean()
+    return pw_info
+
+
+def _decode_salt(data: bytes) -> bytes:
+    """
+    Decodes the salt column of a row.
+
+    Args:
+        data (bytes): The encoded salt.
+
+    Returns:
+        bytes: The salt.
+
+    Raises:
+        TypeError: If the column doesn't hold a salt.
+    """
+    salt = decode_optional(data)
+    if salt is None:
+        raise TypeError("Salt expected")
+    return salt
+
+
+def _encrypt_for_storage(password_information: PasswordInformation) -> None:
+    """
+    Encrypts the data and passwords of a password information before it is stored.
+
+    Args:
+        password_information (PasswordInformation): The `PasswordInformation` object.
+    """
+    if not password_information.data_is_encrypted:
+        password_information.encrypt_data()
+
+    password_information.encrypt_passwords()
+
+
+def _stored_metadata(pw_info: PasswordInformation) -> Optional[EncryptedMetadata]:
+    """
+    Returns the metadata column of a password information. Sealed entries
+    store an empty placeholder.
+
+    Args:
+        pw_info (PasswordInformation): The encrypted password information.
+
+    Returns:
+        Optional[EncryptedMetadata]: The encrypted metadata, or None for sealed entries.
+    """
+    if pw_info.sealed_entry is not None or isinstance(pw_info.metadata, Metadata):
+        return None
+    return pw_info.metadata
+
+
+_COLUMNS: dict[str, Callable[[PasswordInformation], object]] = {
+    "description": lambda pw_info: pw_info.details.description,
+    "username": lambda pw_info: encode_optional(pw_info.details.username),
+    "categories": lambda pw_info: encode_list(pw_info.details.categories),
+    "note": lambda pw_info: encode_optional(pw_info.details.note),
+    "user": lambda pw_info: pw_info.user.id,
+    "metadata": lambda pw_info: adapt_metadata(_stored_metadata(pw_info)),
+    "salt": lambda pw_info: encode_optional(pw_info.get_salt()),
+    "entry": lambda pw_info: pw_info.sealed_entry,
+    "body": lambda pw_info: pw_info.sealed_body,
+    "blind_index": lambda pw_info: pw_info.blind_index,
+}
+
+
+def _derive_keys(user: User, salts: list[bytes]) -> None:
+    """
+    Derives the keys of rows still encrypted with keys derived per row from
+    the master password in the worker processes of `DECRYPT_POOL`, so the
+    rows can then be decrypted without running scrypt one row at a time.
+    Rows encrypted with the data key need no derivation, so the data key
+    never leaves this process.
+
+    Args:
+        user (User): The user the rows belong to.
+        salts (list[bytes]): The salts the rows were encrypted with.
+    """
+    salts = [salt for salt in salts if salt != DATA_KEY_SALT]
+    if salts and user.has_clear_password():
+        DECRYPT_POOL.derive_keys(user.get_clear_password(), salts)
+
+
+def migrate_vault(cursor: sqlite3.Cursor, user: User) -> int:
+    """
+    Re-encrypts all password entries of a user that are still encrypted with
+    keys derived per row from the master password, or that are not stored
+    in the configured entry format, using the user's data key. Passwords of
+    entries sealed by older versions are moved to the password history.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+        user (User): The user whose password information is to be migrated.
+        The user's data key and clear password must be set.
+
+    Returns:
+        int: The amount of migrated password entries.
+    """
+    cursor.execute(_SELECT_ENTRIES, (user.id,))
+    results: list[PasswordRow] = cursor.fetchall()
+
+    sealed = entry_format() == SEALED_ENTRY
+    outdated = [
+        pw_info
+        for pw_info in (
+            _password_information_from_row(result, user) for result in results
+        )
+        if not _is_migrated(pw_info, sealed)
+    ]
+    for pw_info in outdated:
+        load_password_history(cursor, pw_info)
+    _derive_keys(
+        user,
+        [
+            salt
+            for pw_info in outdated
+            for salt in (
+                pw_info.get_salt(),
+                *(password.salt for password in pw_info.passwords if password.salt),
+            )
+        ],
+    )
+
+    migrated = 0
+    for pw_info in outdated:
         pw_info.decrypt_data()
-        password_informations.append(pw_info)
+        pw_info.decrypt_passwords()
+        pw_info.rewrite_history()
+        update_password_information(cursor, pw_info)
+        migrated += 1
+
+    _index_entries(cursor, user)
+    return migrated
+
+
+def _index_entries(cursor: sqlite3.Cursor, user: User) -> None:
+    """
+    Computes the blind index of the entries of a user that don't have one
+    yet, e.g. because they were stored by an older version. Entries that
+    would duplicate the index of another entry keep no index, so they are
+    still found by `validate_unique_password`.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+        user (User): The user whose entries are to be indexed.
+        The user's data key must be set.
+    """
+    cursor.execute(
+        """
+        SELECT description, username, salt, entry, id FROM passwords
+        WHERE user = ? AND blind_index IS NULL
+        """,
+        (user.id,),
+    )
+    results: list[tuple[bytes, bytes, bytes, Optional[bytes], int]] = cursor.fetchall()
+    cursor.executemany(
+        "UPDATE OR IGNORE passwords SET blind_index = ? WHERE id = ?",
+        [
+            (user.blind_index(*_decrypt_head(result[:4], user)), result[4])
+            for result in results
+        ],
+    )
 
-    return password_informations
+
+def _decrypt_head(
+    row: tuple[bytes, bytes, bytes, Optional[bytes]], user: User
+) -> tuple[bytes, Optional[bytes]]:
+    """
+    Decrypts the description and username of a row in either entry format.
+
+    Args:
+        row (tuple[bytes, bytes, bytes, Optional[bytes]]): The description,
+        username, salt and entry columns of the row.
+        user (User): The user who owns the row.
+
+    Returns:
+        tuple[bytes, Optional[bytes]]: The description and username.
+    """
+    description, username, salt, entry = row
+    key = user.resolve_key(_decode_salt(salt))
+    if entry is not None:
+        return open_entry_head(entry, key)
+    encrypted_username = decode_optional(username)
+    return (
+        decrypt_record(description, key),
+        decrypt_record(encrypted_username, key) if encrypted_username else None,
+    )
+
+
+_ENCODED_COLUMNS: dict[str, Callable[[bytes], bytes]] = {
+    "username": lambda data: encode_optional(decode_optional(data)),
+    "passwords": lambda data: adapt_passwords(convert_passwords(data)),
+    "categories": lambda data: encode_list(decode_list(data)),
+    "note": lambda data: encode_optional(decode_optional(data)),
+    "metadata": lambda data: adapt_metadata(convert_metadata(data)),
+    "salt": lambda data: encode_optional(_decode_salt(data)),
+}
+
+
+def migrate_password_encoding(cursor: sqlite3.Cursor) -> int:
+    """
+    Re-encodes all columns of the passwords table that were pickled by older
+    versions with `src.model.codec`. The encrypted data itself is copied as
+    it is, so no key is needed.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+
+    Returns:
+        int: The amount of migrated rows.
+    """
+    columns = ", ".join(_ENCODED_COLUMNS)
+    cursor.execute(
+        f"SELECT id, {columns} FROM passwords WHERE substr(salt, 1, 1) != ?",
+        (bytes([MARKER]),),
+    )
+    results: list[tuple[int, bytes, bytes, bytes, bytes, bytes, bytes]] = (
+        cursor.fetchall()
+    )
+
+    assignments = ", ".join(f"{column} = ?" for column in _ENCODED_COLUMNS)
+    for password_id, *values in results:
+        cursor.execute(
+            f"UPDATE passwords SET {assignments} WHERE id = ?",
+            (
+                *(
+                    value if is_encoded(value) else encode(value)
+                    for encode, value in zip(_ENCODED_COLUMNS.values(), values)
+                ),
+                password_id,
+            ),
+        )
+    return len(results)
+
+
+def _is_migrated(pw_info: PasswordInformation, sealed: bool) -> bool:
+    """
+    Checks if a password entry is encrypted with the data key, stored in the
+    configured entry format and keeps its passwords in the password history.
+
+    Args:
+        pw_info (PasswordInformation): The encrypted password information.
+        sealed (bool): Whether the configured entry format is the sealed one.
+
+    Returns:
+        bool: True if the entry doesn't need to be migrated, False otherwise.
+    """
+    if pw_info.sealed_entry is not None and pw_info.sealed_body is None:
+        return False
+    return (
+        pw_info.get_salt() == DATA_KEY_SALT
+        and all(password.salt == DATA_KEY_SALT for password in pw_info.passwords)
+        and (pw_info.sealed_entry is not None) == sealed
+        and pw_info.history_size > 0
+    )
+
+
+def migrate_password_history(cursor: sqlite3.Cursor) -> int:
+    """
+    Moves the passwords of all entries from the `passwords` column to the
+    password history. The encrypted passwords are copied as they are, so no
+    key is needed. Entries sealed by older versions keep their passwords in
+    the sealed body until `migrate_vault` moves them.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+
+    Returns:
+        int: The amount of moved passwords.
+    """
+    cursor.execute("SELECT id, passwords FROM passwords")
+    results: list[tuple[int, bytes]] = cursor.fetchall()
+    rows = [
+        (password_id, seq, adapt_password(password))
+        for password_id, passwords in results
+        for seq, password in enumerate(convert_passwords(passwords))
+    ]
+    cursor.executemany(
+        "INSERT INTO password_history (entry, seq, password) VALUES (?, ?, ?)", rows
+    )
+    return len(rows)
+
+
+def load_password_history(
+    cursor: sqlite3.Cursor, password_information: PasswordInformation
+) -> None:
+    """
+    Loads the passwords of the history that aren't loaded yet, e.g. to check
+    if a new password was used before.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+        password_information (PasswordInformation): The password information
+        whose history is to be loaded.
+    """
+    if password_information.history_loaded:
+        return
+    cursor.execute(
+        """
+        SELECT password FROM password_history
+        WHERE entry = ? AND seq < ? ORDER BY seq
+        """,
+        (password_information.id, password_information.history_start),
+    )
+    results: list[tuple[bytes]] = cursor.fetchall()
+    password_information.load_history(
+        [convert_password(result[0]) for result in results]
+    )
+
+
+def retrieve_password_history(
+    cursor: sqlite3.Cursor,
+    password_information: PasswordInformation,
+    page: int,
+    page_size: int,
+) -> list[Password]:
+    """
+    Retrieves a page of the password history, newest first, without loading
+    the rest of the history.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
+        password_information (PasswordInformation): The password information
+        whose history is to be retrieved.
+        page (int): The page to retrieve, 0 being the page of the current password.
+        page_size (int): The amount of passwords per page.
+
+    Returns:
+        list[Password]: The decrypted passwords of the page, newest first, or
+        an empty list if the page lies past the oldest password.
+    """
+    loaded_start = password_information.history_start
+    end = loaded_start + len(password_information.passwords) - page * page_size
+    if end <= 0:
+        return []
+    start = max(end - page_size, 0)
+
+    if start >= loaded_start:
+        passwords = password_information.passwords[
+            start - loaded_start : end - loaded_start
+        ]
+    else:
+        cursor.execute(
+            """
+            SELECT password FROM password_history
+            WHERE entry = ? AND seq >= ? AND seq < ? ORDER BY seq
+            """,
+            (password_information.id, start, end),
+        )
+        results: list[tuple[bytes]] = cursor.fetchall()
+        passwords = [convert_password(result[0]) for result in results]
+
+    for password in passwords:
+        password_information.decrypt_password(password)
+    return passwords[::-1]
+
+
+def _store_history(
+    cursor: sqlite3.Cursor, password_information: PasswordInformation
+) -> None:
+    """
+    Writes the appended passwords of a password information to the history,
+    or the whole history if it has to be rewritten.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+        password_information (PasswordInformation): The encrypted `PasswordInformation` object.
+    """
+    if "history" in password_information.dirty_fields:
+        cursor.execute(
+            "DELETE FROM password_history WHERE entry = ?",
+            (password_information.id,),
+        )
+    elif "passwords" not in password_information.dirty_fields:
+        return
+
+    cursor.executemany(_INSERT_HISTORY, _history_rows(password_information))
+
+
+_INSERT_HISTORY = "INSERT INTO password_history (entry, seq, password) VALUES (?, ?, ?)"
+
+
+def _history_rows(
+    password_information: PasswordInformation,
+) -> list[tuple[Optional[int], int, bytes]]:
+    """
+    Returns the history rows of the passwords that have to be written and
+    advances the stored history size of the password information accordingly.
+
+    Args:
+        password_information (PasswordInformation): The encrypted `PasswordInformation` object.
+
+    Returns:
+        list[tuple[Optional[int], int, bytes]]: The rows to insert into the history.
+    """
+    rows = [
+        (password_information.id, seq, adapt_password(password))
+        for seq, password in password_information.unstored_passwords()
+    ]
+    if rows:
+        password_information.history_size = rows[-1][1] + 1
+    return rows
 
 
 def count_password_information(cursor: sqlite3.Cursor, user: User) -> int:
@@ -78,7 +701,7 @@ def count_password_information(cursor: sqlite3.Cursor, user: User) -> int:
         """
     SELECT COUNT(user) FROM passwords WHERE user = ?
     """,
-        (user.username,),
+        (user.id,),
     )
     result: list[tuple[int]] = cursor.fetchall()
     return result[0][0]
@@ -90,40 +713,30 @@ def update_password_information(
     """
     Updates the details of an existing password entry in the database.
 
+    Only the columns of fields that changed since the entry was loaded are
+    encrypted and written, unchanged ciphertexts are kept as they are.
+    Appended passwords are inserted into the history.
+
     Args:
         cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
         password_information (PasswordInformation): The updated `PasswordInformation` object.
     """
-    if not password_information.data_is_encrypted:
-        password_information.encrypt_data()
-
-    password_information.encrypt_passwords()
-
-    cursor.execute(
-        """
-        UPDATE passwords
-        SET description = ?,
-            username = ?,
-            passwords = ?,
-            categories = ?,
-            note = ?,
-            user = ?,
-            metadata = ?,
-            salt = ?
-        WHERE id = ?
-        """,
-        (
-            password_information.details.description,
-            pickle.dumps(password_information.details.username),
-            pickle.dumps(password_information.passwords),
-            pickle.dumps(password_information.details.categories),
-            pickle.dumps(password_information.details.note),
-            password_information.user.username,
-            pickle.dumps(password_information.metadata),
-            pickle.dumps(password_information.get_salt()),
-            password_information.id,
-        ),
-    )
+    _encrypt_for_storage(password_information)
+
+    columns = [
+        column for column in _COLUMNS if column in password_information.dirty_fields
+    ]
+    if columns:
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        cursor.execute(
+            f"UPDATE passwords SET {assignments} WHERE id = ?",
+            (
+                *(_COLUMNS[column](password_information) for column in columns),
+                password_information.id,
+            ),
+        )
+    _store_history(cursor, password_information)
+    password_information.mark_clean()
 
 
 def validate_unique_password(
@@ -132,36 +745,43 @@ def validate_unique_password(
     """
     Checks if a password with the specified description and username is unique for the given user.
 
+    The check is a lookup of the blind index of the description and username.
+    Only entries without a blind index, which are indexed when the vault is
+    unlocked, have to be decrypted. Their blind index is compared as well, so
+    canonically equivalent spellings count as duplicates either way.
+
     Args:
         cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL queries.
         description (str): The description of the password.
         username (Optional[str]): The username associated with the password (can be None).
         user (User): The user who owns the password information.
+        The user's data key must be set.
 
     Returns:
         bool: True if the password description and username are unique, False otherwise.
     """
+    index = user.blind_index(
+        description.encode(), username.encode() if username else None
+    )
+
+    cursor.execute(
+        "SELECT 1 FROM passwords WHERE user = ? AND blind_index = ?",
+        (user.id, index),
+    )
+    if cursor.fetchone() is not None:
+        return False
+
     cursor.execute(
         """
-        SELECT description, username, salt FROM passwords
-        WHERE user = ?
+        SELECT description, username, salt, entry FROM passwords
+        WHERE user = ? AND blind_index IS NULL
         """,
-        (user.username,),
+        (user.id,),
+    )
+    results: list[tuple[bytes, bytes, bytes, Optional[bytes]]] = cursor.fetchall()
+    return all(
+        user.blind_index(*_decrypt_head(result, user)) != index for result in results
     )
-    results: list[tuple[bytes, bytes, bytes]] = cursor.fetchall()
-    for result in results:
-        salt: bytes = pickle.loads(result[2])
-        key, _ = scrypt_derive(user.get_clear_password().encode(), salt)
-        desc: bytes = decrypt_fernet(result[0], key)
-        uname: Optional[bytes] = pickle.loads(result[1])
-        uname = decrypt_fernet(uname, key) if uname else None
-
-        username_bytes = username.encode() if username is not None else None
-
-        if desc == description.encode() and uname == username_bytes:
-            return False
-
-    return True
 
 
 def delete_password_information(
@@ -174,6 +794,9 @@ def delete_password_information(
         cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
         password_information (PasswordInformation): The `PasswordInformation` object to be deleted.
     """
+    cursor.execute(
+        "DELETE FROM password_history WHERE entry = ?", (password_information.id,)
+    )
     cursor.execute(
         """
         DELETE FROM passwords WHERE id=?
@@ -190,19 +813,27 @@ def delete_password_information_of_user(cursor: sqlite3.Cursor, user: User) -> N
         cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
         user (User): The user whose password information is to be deleted.
     """
+    cursor.execute(
+        """
+        DELETE FROM password_history
+        WHERE entry IN (SELECT id FROM passwords WHERE user = ?)
+        """,
+        (user.id,),
+    )
     cursor.execute(
         """
         DELETE FROM passwords WHERE user=?
         """,
-        (user.username,),
+        (user.id,),
     )
+    cursor.execute("DELETE FROM password_tombstones WHERE user = ?", (user.id,))
 
 
 def insert_password_information(
     cursor: sqlite3.Cursor, password_information: PasswordInformation
 ) -> PasswordInformation:
     """
-    Inserts a new password entry into the database.
+    Inserts a new password entry and its password history into the database.
 
     Args:
         cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
@@ -211,29 +842,63 @@ def insert_password_information(
     Returns:
         PasswordInformation: The inserted `PasswordInformation` object with the new ID.
     """
-    if not password_information.data_is_encrypted:
-        password_information.encrypt_data()
+    return insert_many_password_information(cursor, [password_information])[0]
 
-    password_information.encrypt_passwords()
 
+def insert_many_password_information(
+    cursor: sqlite3.Cursor, password_informations: Iterable[PasswordInformation]
+) -> list[PasswordInformation]:
+    """
+    Inserts new password entries and their password histories into the database
+    with one statement per table.
+
+    The ids are assigned in bulk following the last id handed out by the
+    `passwords` table, which is why the inserts run in a write transaction.
+    If no transaction is open yet, one is started and left for the caller
+    to commit.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+        password_informations (Iterable[PasswordInformation]): The
+        `PasswordInformation` objects to be inserted.
+
+    Returns:
+        list[PasswordInformation]: The inserted `PasswordInformation` objects with their new IDs.
+    """
+    password_informations = list(password_informations)
+    if not password_informations:
+        return []
+    for password_information in password_informations:
+        _encrypt_for_storage(password_information)
+
+    if not cursor.connection.in_transaction:
+        cursor.execute("BEGIN IMMEDIATE")
     cursor.execute(
         """
-        INSERT INTO passwords(
-            description, username, passwords, categories, note, user, metadata, salt
-        ) VALUES(?, ?, ?, ?, ?, ?, ?, ?)
-        RETURNING id
+        SELECT MAX(
+            COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'passwords'), 0),
+            COALESCE((SELECT MAX(id) FROM passwords), 0)
+        )
+        """
+    )
+    last_id: int = cursor.fetchone()[0]
+    for offset, password_information in enumerate(password_informations, 1):
+        password_information.id = last_id + offset
+
+    cursor.executemany(
+        f"""
+        INSERT INTO passwords(id, {", ".join(_COLUMNS)})
+        VALUES(?, {", ".join("?" for _ in _COLUMNS)})
         """,
-        (
-            password_information.details.description,
-            pickle.dumps(password_information.details.username),
-            pickle.dumps(password_information.passwords),
-            pickle.dumps(password_information.details.categories),
-            pickle.dumps(password_information.details.note),
-            password_information.user.username,
-            pickle.dumps(password_information.metadata),
-            pickle.dumps(password_information.get_salt()),
-        ),
+        [
+            (pw_info.id, *(encode(pw_info) for encode in _COLUMNS.values()))
+            for pw_info in password_informations
+        ],
     )
-    result: list[tuple[int]] = cursor.fetchall()
-    password_information.id = result[0][0]
-    return password_information
+    cursor.executemany(
+        _INSERT_HISTORY,
+        [row for pw_info in password_informations for row in _history_rows(pw_info)],
+    )
+    for password_information in password_informations:
+        password_information.mark_clean()
+    return password_informations
@@ -0,0 +1,426 @@
+"""
+Handles the database schema and its migrations.
+
+The version of the schema is stored in `PRAGMA user_version`. Every migration
+upgrades the schema by one version, so opening a database runs exactly the
+migrations it is missing. Databases created before the schema was versioned
+have version 0. Since their columns may have been added at different times,
+the first migrations only create what is missing.
+"""
+
+import sqlite3
+from typing import Callable
+
+from src.controller.password import migrate_password_encoding
+from src.controller.password import migrate_password_history
+from src.controller.user import migrate_user_encoding
+
+
+def _create_tables(cursor: sqlite3.Cursor) -> None:
+    """
+    Creates the `passwords` and `users` tables and adds the columns that were
+    introduced after a table was created.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS passwords (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description BLOB NOT NULL,
+        username BLOB,
+        passwords BLOB NOT NULL,
+        categories BLOB,
+        note BLOB,
+        user BLOB NOT NULL,
+        metadata BLOB NOT NULL,
+        salt BLOB NOT NULL,
+        entry BLOB,
+        body BLOB,
+        FOREIGN KEY(user) REFERENCES users(username)
+    );
+        """
+    )
+    cursor.execute(
+        """
+    CREATE TABLE IF NOT EXISTS users (
+        username BLOB UNIQUE NOT NULL,
+        password password NOT NULL,
+        data_key BLOB,
+        kek_salt BLOB
+    );
+    """
+    )
+    _add_missing_column(cursor, "users", "data_key", "BLOB")
+    _add_missing_column(cursor, "users", "kek_salt", "BLOB")
+    _add_missing_column(cursor, "passwords", "entry", "BLOB")
+    _add_missing_column(cursor, "passwords", "body", "BLOB")
+
+
+def _add_missing_column(
+    cursor: sqlite3.Cursor, table: str, column: str, declaration: str
+) -> None:
+    """
+    Adds a column to an existing table if the table doesn't have it yet.
+
+    This is used to upgrade databases that were created before the column
+    was introduced.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+        table (str): The name of the table.
+        column (str): The name of the column to add.
+        declaration (str): The declared type of the column.
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    columns: list[tuple[int, str, str, int, object, int]] = cursor.fetchall()
+    if column not in (existing[1] for existing in columns):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def _encode_rows(cursor: sqlite3.Cursor) -> None:
+    """
+    Re-encodes the rows pickled by older versions, see `src.model.codec`.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    migrate_user_encoding(cursor)
+    migrate_password_encoding(cursor)
+
+
+def _index_passwords_by_user(cursor: sqlite3.Cursor) -> None:
+    """
+    Indexes the passwords by their user, since every query on the table is
+    restricted to a single user. Users are already indexed by their unique
+    username.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS passwords_by_user ON passwords (user)")
+
+
+def _create_password_history(cursor: sqlite3.Cursor) -> None:
+    """
+    Moves the passwords of every entry from a list in the `passwords` column
+    to a table with one row per password, keyed by the entry and the position
+    of the password in its history. The current password of an entry is the
+    one with the highest sequence number.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    cursor.execute(
+        """
+    CREATE TABLE password_history (
+        entry INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        password BLOB NOT NULL,
+        PRIMARY KEY (entry, seq),
+        FOREIGN KEY(entry) REFERENCES passwords(id)
+    ) WITHOUT ROWID;
+    """
+    )
+    migrate_password_history(cursor)
+    cursor.execute("ALTER TABLE passwords DROP COLUMN passwords")
+
+
+def _add_blind_index(cursor: sqlite3.Cursor) -> None:
+    """
+    Adds the blind index of the description and username, which is unique per
+    user. Existing entries are indexed when their vault is unlocked.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    cursor.execute("ALTER TABLE passwords ADD COLUMN blind_index BLOB")
+    cursor.execute(
+        """
+    CREATE UNIQUE INDEX passwords_by_blind_index ON passwords (user, blind_index)
+    """
+    )
+
+
+def _track_changes(cursor: sqlite3.Cursor) -> None:
+    """
+    Tracks changes to the passwords with a change sequence, so that readers
+    can retrieve only the entries changed since they last read them.
+
+    Triggers increment the sequence in `change_sequence` on every insert or
+    update of an entry and on every password added to its history, and store
+    it in the `change_seq` column of the entry. Deleted entries leave a
+    tombstone with the sequence of their deletion. Existing entries start
+    with their id as their sequence.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    cursor.execute(
+        "ALTER TABLE passwords ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0"
+    )
+    cursor.execute("UPDATE passwords SET change_seq = id")
+    cursor.execute("CREATE TABLE change_sequence (value INTEGER NOT NULL)")
+    cursor.execute(
+        "INSERT INTO change_sequence SELECT COALESCE(MAX(id), 0) FROM passwords"
+    )
+    cursor.execute(
+        """
+    CREATE TABLE password_tombstones (
+        id INTEGER PRIMARY KEY,
+        user BLOB NOT NULL,
+        change_seq INTEGER NOT NULL
+    );
+    """
+    )
+    cursor.execute("CREATE INDEX passwords_by_change ON passwords (user, change_seq)")
+    cursor.execute(
+        "CREATE INDEX tombstones_by_change ON password_tombstones (user, change_seq)"
+    )
+    _create_change_triggers(cursor)
+
+
+_BUMP_CHANGE_SEQ = """
+        UPDATE change_sequence SET value = value + 1;
+        UPDATE passwords SET change_seq = (SELECT value FROM change_sequence)
+"""
+
+
+def _create_change_triggers(cursor: sqlite3.Cursor) -> None:
+    """
+    Creates the triggers that track changes of the passwords and their
+    history, see `_track_changes`.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    cursor.execute(
+        f"""
+    CREATE TRIGGER passwords_inserted AFTER INSERT ON passwords
+    BEGIN
+        {_BUMP_CHANGE_SEQ} WHERE id = NEW.id;
+    END;
+    """
+    )
+    # Setting the sequence itself doesn't count as a change
+    cursor.execute(
+        f"""
+    CREATE TRIGGER passwords_updated AFTER UPDATE ON passwords
+    WHEN NEW.change_seq IS OLD.change_seq
+    BEGIN
+        {_BUMP_CHANGE_SEQ} WHERE id = NEW.id;
+    END;
+    """
+    )
+    cursor.execute(
+        f"""
+    CREATE TRIGGER password_history_inserted AFTER INSERT ON password_history
+    BEGIN
+        {_BUMP_CHANGE_SEQ} WHERE id = NEW.entry;
+    END;
+    """
+    )
+    cursor.execute(
+        """
+    CREATE TRIGGER passwords_deleted AFTER DELETE ON passwords
+    BEGIN
+        UPDATE change_sequence SET value = value + 1;
+        INSERT INTO password_tombstones (id, user, change_seq)
+        VALUES (OLD.id, OLD.user, (SELECT value FROM change_sequence));
+    END;
+    """
+    )
+
+
+def _add_user_ids(cursor: sqlite3.Cursor) -> None:
+    """
+    Gives every user an integer id and lets the password entries and their
+    tombstones reference it instead of the hashed username, so renaming a user
+    only updates its own row.
+
+    SQLite can't change the type or the foreign key of a column, so the
+    tables are rebuilt with the same columns, keeping the ids of the entries.
+    The ids of the users are their rowids and are never reused. Entries and
+    tombstones of users that no longer exist can't be mapped and are dropped.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+    """
+    cursor.execute(
+        """
+    CREATE TABLE users_by_id (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username BLOB UNIQUE NOT NULL,
+        password password NOT NULL,
+        data_key BLOB,
+        kek_salt BLOB
+    );
+    """
+    )
+    cursor.execute(
+        """
+    INSERT INTO users_by_id (id, username, password, data_key, kek_salt)
+    SELECT rowid, username, password, data_key, kek_salt FROM users
+    """
+    )
+
+    cursor.execute(
+        """
+    CREATE TABLE passwords_by_id (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description BLOB NOT NULL,
+        username BLOB,
+        categories BLOB,
+        note BLOB,
+        user INTEGER NOT NULL,
+        metadata BLOB NOT NULL,
+        salt BLOB NOT NULL,
+        entry BLOB,
+        body BLOB,
+        blind_index BLOB,
+        change_seq INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY(user) REFERENCES users(id)
+    );
+    """
+    )
+    cursor.execute(
+        """
+    INSERT INTO passwords_by_id (
+        id, description, username, categories, note, user, metadata, salt,
+        entry, body, blind_index, change_seq
+    )
+    SELECT
+        p.id, p.description, p.username, p.categories, p.note, u.id, p.metadata,
+        p.salt, p.entry, p.body, p.blind_index, p.change_seq
+    FROM passwords p
+    JOIN users_by_id u ON u.username = p.user
+    """
+    )
+    # Keeps the ids of deleted entries from being reused
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'passwords'")
+    sequence = cursor.fetchone()
+
+    cursor.execute(
+        """
+    CREATE TABLE tombstones_by_id (
+        id INTEGER PRIMARY KEY,
+        user INTEGER NOT NULL,
+        change_seq INTEGER NOT NULL
+    );
+    """
+    )
+    cursor.execute(
+        """
+    INSERT INTO tombstones_by_id (id, user, change_seq)
+    SELECT t.id, u.id, t.change_seq FROM password_tombstones t
+    JOIN users_by_id u ON u.username = t.user
+    """
+    )
+
+    # Renaming a table checks every trigger, which fails while passwords is missing
+    cursor.execute("DROP TRIGGER password_history_inserted")
+    for table, rebuilt in (
+        ("passwords", "passwords_by_id"),
+        ("password_tombstones", "tombstones_by_id"),
+        ("users", "users_by_id"),
+    ):
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {rebuilt} RENAME TO {table}")
+    cursor.execute(
+        "DELETE FROM password_history WHERE entry NOT IN (SELECT id FROM passwords)"
+    )
+    if sequence is not None:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'passwords'")
+        cursor.execute(
+            """
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'passwords', MAX(?, COALESCE(MAX(id), 0)) FROM passwords
+        """,
+            sequence,
+        )
+
+    cursor.execute("CREATE INDEX passwords_by_user ON passwords (user)")
+    cursor.execute(
+        "CREATE UNIQUE INDEX passwords_by_blind_index ON passwords (user, blind_index)"
+    )
+    cursor.execute("CREATE INDEX passwords_by_change ON passwords (user, change_seq)")
+    cursor.execute(
+        "CREATE INDEX tombstones_by_change ON password_tombstones (user, change_seq)"
+    )
+    _create_change_triggers(cursor)
+
+
+MIGRATIONS: list[Callable[[sqlite3.Cursor], None]] = [
+    _create_tables,
+    _encode_rows,
+    _index_passwords_by_user,
+    _create_password_history,
+    _add_blind_index,
+    _track_changes,
+    _add_user_ids,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(cursor: sqlite3.Cursor) -> int:
+    """
+    Retrieves the schema version of the database.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used for executing
+                                 SQL commands.
+
+    Returns:
+        int: The schema version, 0 for new databases and databases created
+        before the schema was versioned.
+    """
+    cursor.execute("PRAGMA user_version")
+    version: int = cursor.fetchone()[0]
+    return version
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """
+    Upgrades the database to `SCHEMA_VERSION`. Every migration is committed
+    together with the version it upgrades to, so an interrupted upgrade
+    continues with the failed migration. A failed migration is rolled back
+    before its error is raised.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+
+    Returns:
+        int: The amount of applied migrations.
+
+    Raises:
+        sqlite3.DatabaseError: If the database was created by a newer version.
+    """
+    cursor = connection.cursor()
+    version = schema_version(cursor)
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"Database schema version {version} is newer than {SCHEMA_VERSION}"
+        )
+
+    for target, migration in enumerate(MIGRATIONS[version:], version + 1):
+        # The sqlite3 module doesn't open transactions for DDL statements
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {target}")
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+    return SCHEMA_VERSION - version
@@ -0,0 +1,193 @@
+"""
+Provides a unit of work, which collects changes to password entries and users
+and writes them to the database in a single transaction.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from types import TracebackType
+from typing import Optional
+
+from src.controller.password import delete_password_information
+from src.controller.password import insert_many_password_information
+from src.controller.password import update_password_information
+from src.controller.user import update_user
+from src.model.password_information import PasswordInformation
+from src.model.user import User
+
+
+class UnitOfWork:
+    """
+    Collects inserts, updates and deletions of password entries and updates of
+    users, and flushes them in one transaction, which is committed once.
+
+    Used as a context manager, the work is committed when the block completes
+    and rolled back if it raises. Writes made through `cursor` inside the block,
+    e.g. by prompts, are part of the same transaction.
+
+    Attributes:
+        connection (sqlite3.Connection): The connection the work is written to.
+        cursor (sqlite3.Cursor): The cursor used for the writes.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        Initializes the UnitOfWork without any pending changes.
+
+        Args:
+            connection (sqlite3.Connection): The connection the work is written to.
+        """
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self._inserts: list[PasswordInformation] = []
+        self._updates: list[PasswordInformation] = []
+        self._deletes: list[PasswordInformation] = []
+        self._users: list[User] = []
+
+    def __enter__(self) -> UnitOfWork:
+        """
+        Returns the unit of work for the block.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """
+        Commits the work if the block completed, and rolls it back otherwise.
+        """
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def insert(self, password_information: PasswordInformation) -> None:
+        """
+        Registers a new password entry to be inserted. Its id is assigned when
+        the work is flushed.
+
+        Args:
+            password_information (PasswordInformation): The entry to insert.
+        """
+        self._inserts.append(password_information)
+
+    def update(self, password_information: PasswordInformation) -> None:
+        """
+        Registers a changed password entry to be updated. Registering an entry
+        more than once updates it once.
+
+        Args:
+            password_information (PasswordInformation): The entry to update.
+        """
+        if not _contains(self._inserts, password_information) and not _contains(
+            self._updates, password_information
+        ):
+            self._updates.append(password_information)
+
+    def delete(self, password_information: PasswordInformation) -> None:
+        """
+        Registers a password entry to be deleted. Pending inserts and updates
+        of the entry are dropped.
+
+        Args:
+            password_information (PasswordInformation): The entry to delete.
+        """
+        if _contains(self._inserts, password_information):
+            self._inserts = _without(self._inserts, password_information)
+            return
+        self._updates = _without(self._updates, password_information)
+        self._deletes.append(password_information)
+
+    def update_user(self, user: User) -> None:
+        """
+        Registers a changed user to be updated, see `update_user`.
+
+        Args:
+            user (User): The user to update.
+        """
+        self._users.append(user)
+
+    def flush(self) -> None:
+        """
+        Writes the pending changes in the current transaction, starting one if
+        needed, without committing it. Deletions are written first, then
+        updates, then all inserts at once, then the users. Without pending
+        changes no transaction is started, so the write lock isn't taken.
+        """
+        if not (self._deletes or self._updates or self._inserts or self._users):
+            return
+        if not self.connection.in_transaction:
+            self.cursor.execute("BEGIN IMMEDIATE")
+        for password_information in self._deletes:
+            delete_password_information(self.cursor, password_information)
+        for password_information in self._updates:
+            update_password_information(self.cursor, password_information)
+        insert_many_password_information(self.cursor, self._inserts)
+        for user in self._users:
+            update_user(self.cursor, user)
+        self._clear()
+
+    def commit(self) -> None:
+        """
+        Flushes the pending changes and commits the transaction.
+        """
+        self.flush()
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        """
+        Discards the pending changes and rolls back the transaction. Entries
+        that were already flushed keep the ids and state they got while
+        being written.
+        """
+        self._clear()
+        self.connection.rollback()
+
+    def _clear(self) -> None:
+        """
+        Forgets all pending changes.
+        """
+        self._inserts = []
+        self._updates = []
+        self._deletes = []
+        self._users = []
+
+
+def _contains(
+    password_informations: list[PasswordInformation],
+    password_information: PasswordInformation,
+) -> bool:
+    """
+    Checks if a list holds the given entry itself, rather than an equal one.
+
+    Args:
+        password_informations (list[PasswordInformation]): The entries to search.
+        password_information (PasswordInformation): The entry to find.
+
+    Returns:
+        bool: True if the entry is in the list, False otherwise.
+    """
+    return any(entry is password_information for entry in password_informations)
+
+
+def _without(
+    password_informations: list[PasswordInformation],
+    password_information: PasswordInformation,
+) -> list[PasswordInformation]:
+    """
+    Returns a list without the given entry itself.
+
+    Args:
+        password_informations (list[PasswordInformation]): The entries.
+        password_information (PasswordInformation): The entry to remove.
+
+    Returns:
+        list[PasswordInformation]: The remaining entries.
+    """
+    return [
+        entry for entry in password_informations if entry is not password_information
+    ]
@@ -4,8 +4,17 @@ Provides database operations for managing user authentication and account data.
 
 import sqlite3
 from typing import Optional
+
+from src.controller.password import migrate_vault
+from src.crypto.envelope import generate_data_key
+from src.crypto.envelope import unwrap_data_key
+from src.crypto.envelope import wrap_data_key
 from src.crypto.hashing import hash_sha256
+from src.crypto.key_derivation import KdfParameters
+from src.model.codec import MARKER
 from src.model.password import Password
+from src.model.password import adapt_password
+from src.model.password import convert_password
 from src.model.user import User
 
 
@@ -87,14 +96,16 @@ def retrieve_user_by_hash(cursor: sqlite3.Cursor, username_hash: bytes) -> User:
     Raises:
         ValueError: If no user or multiple users are found with the given hashed username.
     """
-    cursor.execute("SELECT * FROM users WHERE username=?", (username_hash,))
-    user: list[tuple[bytes, Password]] = cursor.fetchall()
+    cursor.execute(
+        "SELECT id, username, password FROM users WHERE username=?", (username_hash,)
+    )
+    user: list[tuple[int, bytes, Password]] = cursor.fetchall()
     if len(user) == 0:
         raise ValueError("User not found")
     if len(user) > 1:
         raise ValueError("Multiple users found")
 
-    return User(user[0][0], user[0][1])
+    return User(user[0][1], user[0][2], user[0][0])
 
 
 def delete_user(cursor: sqlite3.Cursor, user: User) -> None:
@@ -110,9 +121,9 @@ def delete_user(cursor: sqlite3.Cursor, user: User) -> None:
     """
     cursor.execute(
         """
-        DELETE FROM users WHERE username=?
+        DELETE FROM users WHERE id=?
         """,
-        (user.username,),
+        (user.id,),
     )
 
 
@@ -130,28 +141,25 @@ def retrieve_user_by_name(cursor: sqlite3.Cursor, username: str) -> User:
     return retrieve_user_by_hash(cursor, hash_sha256(username.encode()))
 
 
-def update_user(
-    cursor: sqlite3.Cursor, user: User, old_username: Optional[bytes] = None
-) -> None:
+def update_user(cursor: sqlite3.Cursor, user: User) -> None:
     """
     Updates the username and/or password of an existing user in the database.
 
+    The password entries reference the user by its id, so renaming a user
+    only updates its own row.
+
     Args:
         cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
         user (User): The `User` object with updated information.
-        old_username (Optional[bytes]):
-        The previous username of the user, if it needs to be updated.
     """
-    if old_username is None:
-        old_username = user.username
     cursor.execute(
         """
         UPDATE users
         SET username = ?,
             password = ?
-        WHERE username = ?
+        WHERE id = ?
         """,
-        (user.username, user.password, old_username),
+        (user.username, user.password, user.id),
     )
 
 
@@ -171,13 +179,105 @@ def insert_user(cursor: sqlite3.Cursor, user: User) -> User:
     """
     cursor.execute(
         """
-        INSERT INTO users (username, password) VALUES(?, ?) RETURNING *
+        INSERT INTO users (username, password) VALUES(?, ?)
+        RETURNING id, username, password
         """,
         (user.username, user.password),
     )
-    inserted_user: list[tuple[bytes, Password]] = cursor.fetchall()
+    inserted_user: list[tuple[int, bytes, Password]] = cursor.fetchall()
 
     if len(inserted_user) == 0:
         raise ValueError("Failed to insert user")
 
-    return User(inserted_user[0][0], inserted_user[0][1])
+    return User(inserted_user[0][1], inserted_user[0][2], inserted_user[0][0])
+
+
+def unlock_vault(cursor: sqlite3.Cursor, user: User) -> None:
+    """
+    Unwraps the data encryption key of a user and sets it on the user.
+
+    If the user has no data encryption key yet, a new one is generated and
+    stored. If the key was wrapped using outdated key derivation parameters,
+    it is wrapped again using the current ones. Any password entries still
+    encrypted with per-row derived keys or stored in another entry format
+    are migrated to the data encryption key and the configured entry format.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+        user (User): The user whose vault is to be unlocked.
+        The user's clear password must be set.
+
+    Raises:
+        EncryptionException: If the stored data key can't be unwrapped.
+    """
+    cursor.execute(
+        "SELECT id, data_key, kek_salt FROM users WHERE username=?", (user.username,)
+    )
+    result: list[tuple[int, Optional[bytes], Optional[bytes]]] = cursor.fetchall()
+    if len(result) == 0:
+        raise ValueError("User not found")
+
+    user.id, wrapped_key, kek_salt = result[0]
+    if wrapped_key is None or kek_salt is None:
+        user.set_data_key(generate_data_key())
+        store_data_key(cursor, user)
+    else:
+        user.set_data_key(
+            unwrap_data_key(wrapped_key, user.get_clear_password().view(), kek_salt)
+        )
+        if not KdfParameters.from_bytes(kek_salt).is_current():
+            store_data_key(cursor, user)
+
+    migrate_vault(cursor, user)
+
+
+def store_data_key(cursor: sqlite3.Cursor, user: User) -> None:
+    """
+    Wraps the data encryption key of a user with a key derived from the
+    user's clear password and stores it.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+        user (User): The user whose data key is to be stored.
+        The user's data key and clear password must be set.
+    """
+    wrapped_key, kek_salt = wrap_data_key(
+        user.get_data_key(), user.get_clear_password().view()
+    )
+    cursor.execute(
+        """
+        UPDATE users
+        SET data_key = ?,
+            kek_salt = ?
+        WHERE id = ?
+        """,
+        (wrapped_key, kek_salt, user.id),
+    )
+
+
+def migrate_user_encoding(cursor: sqlite3.Cursor) -> int:
+    """
+    Re-encodes all master passwords that were pickled by older versions with
+    `src.model.codec`.
+
+    Args:
+        cursor (sqlite3.Cursor): The SQLite cursor object used to execute SQL commands.
+
+    Returns:
+        int: The amount of migrated users.
+    """
+    # The cast skips the converter of the declared password type
+    cursor.execute(
+        """
+        SELECT username, CAST(password AS BLOB) FROM users
+        WHERE substr(password, 1, 1) != ?
+        """,
+        (bytes([MARKER]),),
+    )
+    results: list[tuple[bytes, bytes]] = cursor.fetchall()
+    for username, password in results:
+        cursor.execute(
+            "UPDATE users SET password = ? WHERE username = ?",
+            (adapt_password(convert_password(password)), username),
+        )
+    return len(results)
@@ -0,0 +1,115 @@
+"""
+Unlocks and loads a user's vault on a background thread right after login,
+so the overview can be drawn while the entries are being decrypted.
+"""
+
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Callable
+from typing import Optional
+
+from src.controller.connection import connect_to_db
+from src.controller.password import current_change_seq
+from src.controller.password import retrieve_password_information
+from src.controller.user import unlock_vault
+from src.model.password_information import PasswordInformation
+from src.model.user import User
+
+
+class VaultPrefetch:
+    """
+    Prefetches the password information of a single user.
+
+    The background thread uses its own database connection, since SQLite
+    connections can't be shared between threads. The result can be taken
+    exactly once, later loads read from the database again.
+
+    Attributes:
+        connect (Callable[[], sqlite3.Connection]): Opens the connection used
+        by the background thread.
+    """
+
+    def __init__(
+        self, connect: Callable[[], sqlite3.Connection] = connect_to_db
+    ) -> None:
+        """
+        Initializes the VaultPrefetch without starting a background thread.
+
+        Args:
+            connect (Callable[[], sqlite3.Connection]): Opens the connection
+            used by the background thread.
+        """
+        self.connect = connect
+        self._user: Optional[User] = None
+        self._thread: Optional[threading.Thread] = None
+        self._result: Optional[tuple[list[PasswordInformation], int]] = None
+        self._error: Optional[BaseException] = None
+
+    def start(self, user: User) -> None:
+        """
+        Starts unlocking and loading the vault of the given user in the background.
+
+        Args:
+            user (User): The logged-in user. The user's clear password must be set.
+        """
+        if self._thread is not None:
+            self._thread.join()
+        self._user = user
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, args=(user,), name="vault-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def take(self, user: User) -> Optional[tuple[list[PasswordInformation], int]]:
+        """
+        Waits for the prefetch of the given user to finish and returns its result.
+
+        Args:
+            user (User): The user whose password information is requested.
+
+        Returns:
+            Optional[tuple[list[PasswordInformation], int]]: The prefetched password
+            information and the change sequence it was read at, or None if no
+            prefetch was started for the user or it was already taken.
+
+        Raises:
+            Exception: Any error raised while unlocking or loading the vault.
+        """
+        if self._thread is None or self._user is not user:
+            return None
+
+        self._thread.join()
+        result, error = self._result, self._error
+        self._user = None
+        self._thread = None
+        self._result = None
+        self._error = None
+        if error is not None:
+            raise error
+        return result
+
+    def _run(self, user: User) -> None:
+        """
+        Unlocks the vault and retrieves the password information of the user.
+
+        Args:
+            user (User): The user whose vault is loaded.
+        """
+        try:
+            with closing(self.connect()) as connection:
+                cursor = connection.cursor()
+                unlock_vault(cursor, user)
+                connection.commit()
+                change_seq = current_change_seq(cursor)
+                self._result = (
+                    retrieve_password_information(cursor, user),
+                    change_seq,
+                )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._error = e
+
+
+VAULT_PREFETCH = VaultPrefetch()
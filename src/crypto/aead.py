@@ -0,0 +1,265 @@
+"""
+Provides a versioned, authenticated record format based on AES-256-GCM.
+
+A sealed record consists of a compact binary header followed by the
+ciphertext and authentication tag:
+
+    version (1 byte) | flags (1 byte) | nonce (12 bytes) | ciphertext + tag
+
+Data of at least `compression_threshold` bytes is compressed with zlib before
+it is encrypted, if that makes it smaller, which is marked by the
+`FLAG_COMPRESSED` flag. The header of a compressed record is authenticated
+along with the associated data, so the flag can't be altered. Records
+without flags are sealed exactly as before.
+
+Records written by older versions as Fernet tokens always start with the
+Fernet version byte encoded as base64 ("g"), so they can't be mistaken for
+a sealed record and are still decrypted by `decrypt_record`.
+
+Bulk operations should use a `RecordCipher` bound to the key, which sets up
+the cipher once and processes many records per call. `cipher_for` returns a
+shared handle for a key.
+"""
+
+import base64
+import functools
+import os
+import struct
+import zlib
+from typing import Iterable
+from typing import Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+from cryptography.fernet import InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from src.config import compression_threshold
+from src.exceptions.encryption_exception import EncryptionException
+
+RECORD_VERSION = 1
+NONCE_SIZE = 12
+FLAG_COMPRESSED = 0x01
+COMPRESSION_LEVEL = 6
+
+Buffer = bytes | bytearray | memoryview
+
+_HEADER = struct.Struct(">BB")
+
+
+class RecordCipher:
+    """
+    A cipher handle bound to a single key.
+
+    The AES-GCM cipher, and the Fernet cipher for records written by older
+    versions, are only set up once per handle instead of once per record.
+
+    Attributes:
+        key (bytes): The 32-byte key the handle is bound to.
+        compression_threshold (int): The size from which data is compressed,
+        0 disables compression.
+    """
+
+    def __init__(self, key: bytes, threshold: Optional[int] = None) -> None:
+        """
+        Initializes the RecordCipher with the given key.
+
+        Args:
+            key (bytes): The 32-byte key.
+            threshold (Optional[int]): The size from which data is compressed.
+            If None, the configured threshold is used.
+        """
+        self.key = key
+        self.compression_threshold = (
+            compression_threshold() if threshold is None else threshold
+        )
+        self._aead = AESGCM(key)
+        self._fernet: Optional[Fernet] = None
+
+    def seal(self, data: Buffer, associated_data: Optional[bytes] = None) -> bytes:
+        """
+        Encrypts and authenticates the given data in a single pass, compressing
+        it first if it is large enough.
+
+        Args:
+            data (Buffer): The data to be encrypted.
+            associated_data (Optional[bytes]): Additional data that is authenticated
+            but not encrypted. The same data has to be passed when opening the record.
+
+        Returns:
+            bytes: The sealed record, including header and nonce.
+        """
+        flags = 0
+        if 0 < self.compression_threshold <= len(data):
+            compressed = zlib.compress(data, COMPRESSION_LEVEL)
+            if len(compressed) < len(data):
+                data, flags = compressed, FLAG_COMPRESSED
+
+        nonce = os.urandom(NONCE_SIZE)
+        header = _HEADER.pack(RECORD_VERSION, flags)
+        if flags:
+            associated_data = header + (associated_data or b"")
+        return header + nonce + self._aead.encrypt(nonce, data, associated_data)
+
+    def open(self, record: Buffer, associated_data: Optional[bytes] = None) -> bytes:
+        """
+        Verifies and decrypts a sealed record.
+
+        Args:
+            record (Buffer): The sealed record.
+            associated_data (Optional[bytes]): The additional data the record was sealed with.
+
+        Returns:
+            bytes: The decrypted data.
+
+        Raises:
+            EncryptionException: If the record is malformed or fails authentication.
+        """
+        if not is_sealed(record):
+            raise EncryptionException("Unknown record format")
+        flags = record[1]
+        if flags & ~FLAG_COMPRESSED:
+            raise EncryptionException("Unknown record flags")
+        if flags:
+            associated_data = bytes(record[: _HEADER.size]) + (associated_data or b"")
+
+        nonce_end = _HEADER.size + NONCE_SIZE
+        nonce = record[_HEADER.size : nonce_end]
+        try:
+            data = self._aead.decrypt(nonce, record[nonce_end:], associated_data)
+        except InvalidTag as e:
+            raise EncryptionException("Record failed authentication") from e
+        if flags & FLAG_COMPRESSED:
+            return zlib.decompress(data)
+        return data
+
+    def decrypt(self, record: Buffer) -> bytes:
+        """
+        Decrypts a record, supporting both sealed records and Fernet tokens
+        written by older versions.
+
+        Args:
+            record (Buffer): The sealed record or Fernet token.
+
+        Returns:
+            bytes: The decrypted data.
+
+        Raises:
+            EncryptionException: If the record can't be decrypted with the key.
+        """
+        if is_sealed(record):
+            return self.open(record)
+        if self._fernet is None:
+            self._fernet = Fernet(base64.urlsafe_b64encode(self.key))
+        try:
+            return self._fernet.decrypt(bytes(record))
+        except InvalidToken as e:
+            raise EncryptionException("Record failed authentication") from e
+
+    def encrypt_many(self, buffers: Iterable[Buffer]) -> list[bytes]:
+        """
+        Seals every given buffer as a separate record.
+
+        Args:
+            buffers (Iterable[Buffer]): The data to be encrypted.
+
+        Returns:
+            list[bytes]: The sealed records, in the order of the buffers.
+        """
+        return [self.seal(buffer) for buffer in buffers]
+
+    def decrypt_many(self, records: Iterable[Buffer]) -> list[bytes]:
+        """
+        Decrypts every given record, see `decrypt`.
+
+        Args:
+            records (Iterable[Buffer]): The sealed records or Fernet tokens.
+
+        Returns:
+            list[bytes]: The decrypted data, in the order of the records.
+
+        Raises:
+            EncryptionException: If a record can't be decrypted with the key.
+        """
+        return [self.decrypt(record) for record in records]
+
+
+@functools.lru_cache(maxsize=16)
+def cipher_for(key: bytes) -> RecordCipher:
+    """
+    Returns a shared cipher handle for the given key.
+
+    Args:
+        key (bytes): The 32-byte key.
+
+    Returns:
+        RecordCipher: The cipher handle bound to the key.
+    """
+    return RecordCipher(key)
+
+
+def seal(data: bytes, key: bytes, associated_data: Optional[bytes] = None) -> bytes:
+    """
+    Encrypts and authenticates the given data in a single pass.
+
+    Args:
+        data (bytes): The data to be encrypted.
+        key (bytes): The 32-byte encryption key.
+        associated_data (Optional[bytes]): Additional data that is authenticated
+        but not encrypted. The same data has to be passed when opening the record.
+
+    Returns:
+        bytes: The sealed record, including header and nonce.
+    """
+    return cipher_for(key).seal(data, associated_data)
+
+
+def open_sealed(
+    record: bytes, key: bytes, associated_data: Optional[bytes] = None
+) -> bytes:
+    """
+    Verifies and decrypts a sealed record.
+
+    Args:
+        record (bytes): The sealed record.
+        key (bytes): The 32-byte decryption key.
+        associated_data (Optional[bytes]): The additional data the record was sealed with.
+
+    Returns:
+        bytes: The decrypted data.
+
+    Raises:
+        EncryptionException: If the record is malformed or fails authentication.
+    """
+    return cipher_for(key).open(record, associated_data)
+
+
+def is_sealed(record: Buffer) -> bool:
+    """
+    Checks if the given record uses the sealed record format.
+
+    Args:
+        record (Buffer): The record to check.
+
+    Returns:
+        bool: True if the record is a sealed record, False otherwise.
+    """
+    return len(record) > _HEADER.size + NONCE_SIZE and record[0] == RECORD_VERSION
+
+
+def decrypt_record(record: bytes, key: bytes) -> bytes:
+    """
+    Decrypts a record, supporting both sealed records and Fernet tokens
+    written by older versions.
+
+    Args:
+        record (bytes): The sealed record or Fernet token.
+        key (bytes): The 32-byte decryption key.
+
+    Returns:
+        bytes: The decrypted data.
+
+    Raises:
+        EncryptionException: If the record can't be decrypted with the given key.
+    """
+    return cipher_for(key).decrypt(record)
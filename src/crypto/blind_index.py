@@ -0,0 +1,67 @@
+"""
+Provides a keyed blind index for password entries.
+
+The blind index is an HMAC over the normalized description and username of an
+entry. It allows to look up entries by their description and username without
+decrypting them, while revealing nothing about them without the key. The key is
+derived from the user's data encryption key, so the index of an entry is only
+comparable within the vault of its user.
+"""
+
+import hashlib
+import hmac
+import struct
+import unicodedata
+from typing import Optional
+
+BLIND_INDEX_CONTEXT = b"python-pwm blind index v1"
+
+
+def blind_index_key(data_key: bytes) -> bytes:
+    """
+    Derives the blind index key from a data encryption key.
+
+    Args:
+        data_key (bytes): The data encryption key of the user.
+
+    Returns:
+        bytes: The 32-byte blind index key.
+    """
+    return hmac.digest(data_key, BLIND_INDEX_CONTEXT, hashlib.sha256)
+
+
+def normalize(value: bytes) -> bytes:
+    """
+    Normalizes a value to its NFC form, so that canonically equivalent
+    representations of the same text have the same index.
+
+    Args:
+        value (bytes): The UTF-8 encoded value.
+
+    Returns:
+        bytes: The normalized value.
+    """
+    text = value.decode("utf-8", errors="surrogateescape")
+    return unicodedata.normalize("NFC", text).encode("utf-8", errors="surrogateescape")
+
+
+def blind_index(key: bytes, description: bytes, username: Optional[bytes]) -> bytes:
+    """
+    Computes the blind index of a description and username. An empty username
+    is indexed like a missing one.
+
+    Args:
+        key (bytes): The blind index key, see `blind_index_key`.
+        description (bytes): The description of the entry.
+        username (Optional[bytes]): The username of the entry, if any.
+
+    Returns:
+        bytes: The 32-byte blind index.
+    """
+    description = normalize(description)
+    message = struct.pack(">I", len(description)) + description
+    if username:
+        message += b"\x01" + normalize(username)
+    else:
+        message += b"\x00"
+    return hmac.digest(key, message, hashlib.sha256)
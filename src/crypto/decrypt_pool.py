@@ -0,0 +1,140 @@
+"""
+Provides a persistent process pool for decrypting many records in parallel.
+
+Records encrypted with keys derived per record from the master password are
+dominated by the key derivation, so the pool derives their keys, while the
+records themselves are decrypted in the calling process.
+"""
+
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+from typing import Sequence
+from typing import TypeVar
+
+from src.config import decrypt_workers
+from src.config import parallel_decrypt_threshold
+from src.crypto.key_derivation import KEY_CACHE
+from src.crypto.key_derivation import derive_salted_key
+from src.crypto.secret import SecretBuffer
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class DecryptPool:
+    """
+    A persistent pool of worker processes for bulk decryption.
+
+    The worker processes are started on first use and kept alive until
+    `shutdown` is called, so repeated vault loads don't pay the startup cost
+    again. Work below the serial threshold is processed in the calling process.
+
+    Attributes:
+        workers (Optional[int]): The number of worker processes.
+        If None, the configured amount of workers is used.
+        serial_threshold (Optional[int]): The number of items from which work
+        is spread across the workers. If None, the configured threshold is used.
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, serial_threshold: Optional[int] = None
+    ) -> None:
+        """
+        Initializes the DecryptPool without starting any worker processes.
+
+        Args:
+            workers (Optional[int]): The number of worker processes.
+            serial_threshold (Optional[int]): The number of items from which
+            work is spread across the workers.
+        """
+        self.workers = workers
+        self.serial_threshold = serial_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def map(self, func: Callable[[T], R], items: Sequence[T]) -> list[R]:
+        """
+        Applies the function to all items, returning the results in the
+        original order.
+
+        The items are split into chunks, so every worker receives a few large
+        batches instead of many single items.
+
+        Args:
+            func (Callable[[T], R]): The function to apply. Must be a picklable
+            module level function.
+            items (Sequence[T]): The items to process. Must be picklable.
+
+        Returns:
+            list[R]: The results in the order of the given items.
+        """
+        workers = self.workers or decrypt_workers()
+        threshold = (
+            self.serial_threshold
+            if self.serial_threshold is not None
+            else parallel_decrypt_threshold()
+        )
+        if workers <= 1 or len(items) < threshold:
+            return [func(item) for item in items]
+
+        chunk_size = math.ceil(len(items) / (workers * 4))
+        return list(self._get_executor(workers).map(func, items, chunksize=chunk_size))
+
+    def derive_keys(self, pw: SecretBuffer, salts: Iterable[bytes]) -> None:
+        """
+        Derives the keys of the given salts that aren't in `KEY_CACHE` yet
+        and adds them to it, so the records encrypted with them can be
+        decrypted without deriving their keys one by one.
+
+        Every job carries its own copy of the password, which is wiped once
+        its key is derived.
+
+        Args:
+            pw (SecretBuffer): The password the keys are derived from.
+            salts (Iterable[bytes]): The salts of the keys.
+        """
+        missing = KEY_CACHE.missing(pw, salts)
+        if not missing:
+            return
+        jobs = [(bytearray(pw.view()), salt) for salt in missing]
+        try:
+            keys = self.map(derive_salted_key, jobs)
+        finally:
+            for password, _ in jobs:
+                password[:] = bytes(len(password))
+        for salt, key in zip(missing, keys):
+            KEY_CACHE.add(pw, salt, key)
+
+    def shutdown(self) -> None:
+        """
+        Stops all worker processes. The pool is restarted on next use.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """
+        Returns the running executor, starting it if necessary.
+
+        Args:
+            workers (int): The number of worker processes to start.
+
+        Returns:
+            ProcessPoolExecutor: The running executor.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+
+DECRYPT_POOL = DecryptPool()
@@ -0,0 +1,72 @@
+"""
+Provides envelope encryption helpers for the per-user data encryption key.
+
+The data encryption key (DEK) is a random key used to encrypt all rows of a
+user's vault. It is stored wrapped with a key encryption key (KEK), which is
+derived once per login from the master password.
+"""
+
+import os
+from typing import Optional
+
+from src.crypto.aead import Buffer
+from src.crypto.aead import decrypt_record
+from src.crypto.aead import seal
+from src.crypto.key_derivation import derive_key
+from src.exceptions.encryption_exception import EncryptionException
+
+DATA_KEY_SALT = b""
+
+
+def generate_data_key() -> bytes:
+    """
+    Generates a new random data encryption key.
+
+    Returns:
+        bytes: A random 32-byte data encryption key.
+    """
+    return os.urandom(32)
+
+
+def wrap_data_key(
+    data_key: bytes, pw: Buffer, salt: Optional[bytes] = None
+) -> tuple[bytes, bytes]:
+    """
+    Wraps the data encryption key with a key encryption key derived from the
+    given password.
+
+    Args:
+        data_key (bytes): The data encryption key to wrap.
+        pw (Buffer): The master password the key encryption key is derived from.
+        salt (Optional[bytes]): The encoded key derivation parameters to use.
+        If not provided, the current parameters and a new salt will be used.
+
+    Returns:
+        tuple[bytes, bytes]: A tuple containing the wrapped data key and the
+        encoded key derivation parameters used.
+    """
+    kek, salt = derive_key(pw, salt)
+    return seal(data_key, kek), salt
+
+
+def unwrap_data_key(wrapped_key: bytes, pw: Buffer, salt: bytes) -> bytes:
+    """
+    Unwraps a data encryption key with a key encryption key derived from the
+    given password.
+
+    Args:
+        wrapped_key (bytes): The wrapped data encryption key.
+        pw (Buffer): The master password the key encryption key is derived from.
+        salt (bytes): The encoded key derivation parameters used during key derivation.
+
+    Returns:
+        bytes: The unwrapped data encryption key.
+
+    Raises:
+        EncryptionException: If the data key can't be unwrapped with the given password.
+    """
+    kek, _ = derive_key(pw, salt)
+    try:
+        return decrypt_record(wrapped_key, kek)
+    except EncryptionException as e:
+        raise EncryptionException("Failed to unwrap data key") from e
@@ -0,0 +1,173 @@
+"""
+Provides the registry of key derivation backends.
+
+Every backend has an id, which is stored with the key derivation parameters
+of a record, so a record is always read with the backend it was written with.
+The backend used for new records is selected with `kdf_backend` in the config.
+
+Both Scrypt backends compute the same function and only differ in their
+per-call overhead. If the standard library lacks Scrypt, records of the
+"hashlib-scrypt" backend are derived with `cryptography` instead.
+"""
+
+import hashlib
+from typing import Callable
+
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+from src.config import pbkdf2_iterations
+from src.config import scrypt_parameters
+from src.crypto.aead import Buffer
+
+KEY_LENGTH = 32
+
+SCRYPT = 1
+HASHLIB_SCRYPT = 2
+PBKDF2_SHA256 = 3
+
+# `hashlib.scrypt` passes maxmem to OpenSSL as a C int.
+MAX_SCRYPT_MEMORY = 2**31 - 1
+
+
+def _cryptography_scrypt(pw: Buffer, salt: bytes, cost: tuple[int, int, int]) -> bytes:
+    """
+    Derives a key with the Scrypt implementation of `cryptography`.
+
+    Args:
+        pw (Buffer): The password to be derived.
+        salt (bytes): The salt to use for key derivation.
+        cost (tuple[int, int, int]): The cost parameters n, r and p.
+
+    Returns:
+        bytes: The derived key.
+    """
+    n, r, p = cost
+    return Scrypt(salt, KEY_LENGTH, n, r, p).derive(pw)
+
+
+def _hashlib_scrypt(pw: Buffer, salt: bytes, cost: tuple[int, int, int]) -> bytes:
+    """
+    Derives a key with the Scrypt implementation of `hashlib`.
+
+    Args:
+        pw (Buffer): The password to be derived.
+        salt (bytes): The salt to use for key derivation.
+        cost (tuple[int, int, int]): The cost parameters n, r and p.
+
+    Returns:
+        bytes: The derived key.
+    """
+    n, r, p = cost
+    maxmem = min(128 * r * (n + p + 2), MAX_SCRYPT_MEMORY)
+    return hashlib.scrypt(pw, salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=KEY_LENGTH)
+
+
+def _pbkdf2_sha256(pw: Buffer, salt: bytes, cost: tuple[int, int, int]) -> bytes:
+    """
+    Derives a key with PBKDF2-HMAC-SHA256.
+
+    Args:
+        pw (Buffer): The password to be derived.
+        salt (bytes): The salt to use for key derivation.
+        cost (tuple[int, int, int]): The number of iterations, r and p are unused.
+
+    Returns:
+        bytes: The derived key.
+    """
+    return hashlib.pbkdf2_hmac("sha256", pw, salt, cost[0], KEY_LENGTH)
+
+
+class KdfBackend:
+    """
+    A key derivation backend.
+
+    Attributes:
+        algorithm (int): The id stored with records derived by the backend.
+        name (str): The name used to select the backend in the config.
+    """
+
+    def __init__(
+        self,
+        algorithm: int,
+        name: str,
+        derive: Callable[[Buffer, bytes, tuple[int, int, int]], bytes],
+        default_cost: Callable[[], tuple[int, int, int]],
+    ) -> None:
+        """
+        Initializes the KdfBackend.
+
+        Args:
+            algorithm (int): The id stored with records derived by the backend.
+            name (str): The name used to select the backend in the config.
+            derive (Callable[[Buffer, bytes, tuple[int, int, int]], bytes]): The
+            derivation function.
+            default_cost (Callable[[], tuple[int, int, int]]): Returns the
+            configured cost parameters.
+        """
+        self.algorithm = algorithm
+        self.name = name
+        self._derive = derive
+        self._default_cost = default_cost
+
+    def derive(self, pw: Buffer, salt: bytes, cost: tuple[int, int, int]) -> bytes:
+        """
+        Derives a key from the given password.
+
+        Args:
+            pw (Buffer): The password to be derived.
+            salt (bytes): The salt to use for key derivation.
+            cost (tuple[int, int, int]): The cost parameters of the backend.
+
+        Returns:
+            bytes: The derived key.
+        """
+        return self._derive(pw, salt, cost)
+
+    def default_cost(self) -> tuple[int, int, int]:
+        """
+        Returns the configured cost parameters for new derivations.
+
+        Returns:
+            tuple[int, int, int]: The cost parameters of the backend.
+        """
+        return self._default_cost()
+
+
+KDF_BACKENDS: dict[int, KdfBackend] = {
+    backend.algorithm: backend
+    for backend in (
+        KdfBackend(SCRYPT, "scrypt", _cryptography_scrypt, scrypt_parameters),
+        KdfBackend(
+            HASHLIB_SCRYPT,
+            "hashlib-scrypt",
+            # hashlib only provides Scrypt if Python was built against OpenSSL 1.1+
+            _hashlib_scrypt if hasattr(hashlib, "scrypt") else _cryptography_scrypt,
+            scrypt_parameters,
+        ),
+        KdfBackend(
+            PBKDF2_SHA256,
+            "pbkdf2-sha256",
+            _pbkdf2_sha256,
+            lambda: (pbkdf2_iterations(), 0, 0),
+        ),
+    )
+}
+
+
+def backend_by_name(name: str) -> KdfBackend:
+    """
+    Looks up a key derivation backend by its name.
+
+    Args:
+        name (str): The name of the backend.
+
+    Returns:
+        KdfBackend: The backend.
+
+    Raises:
+        ValueError: If there is no backend with the given name.
+    """
+    for backend in KDF_BACKENDS.values():
+        if backend.name == name:
+            return backend
+    raise ValueError(f"Unknown key derivation backend {name}")
@@ -1,29 +1,61 @@
 """
 Provides functions for key derivation and verification using the Scrypt algorithm.
+
+Salts stored next to encrypted records are encoded `KdfParameters`, so the
+backend and cost used for a record are known when it is read again, see
+`src.crypto.kdf_backend` for the available backends. Raw
+16-byte salts written before the parameters were stored are read with the
+legacy parameters.
 """
 
+from __future__ import annotations
+
+import math
 import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
 from typing import Optional
 
 from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from cryptography.exceptions import InvalidKey
 
+from src.config import kdf_backend
+from src.config import key_cache_size
+from src.crypto.aead import Buffer
+from src.crypto.kdf_backend import KDF_BACKENDS
+from src.crypto.kdf_backend import SCRYPT
+from src.crypto.kdf_backend import backend_by_name
+from src.crypto.secret import SecretBuffer
+from src.crypto.secret import fingerprint
+
+_LEGACY_SALT_LENGTH = 16
+_HEADER = struct.Struct(">BBBHH")
+_HEADER_VERSION = 1
 
-def scrypt_derive(pw: bytes, salt: Optional[bytes] = None) -> tuple[bytes, bytes]:
+
+def scrypt_derive(
+    pw: Buffer, salt: Optional[bytes] = None, *, n: int = 2**14, r: int = 8, p: int = 1
+) -> tuple[bytes, bytes]:
     """
     Derives a key from the given password using the Scrypt key derivation function.
 
     Args:
-        pw (bytes): The password to be derived.
+        pw (Buffer): The password to be derived.
         salt (Optional[bytes]): The salt to use for key derivation.
         If not provided, a new salt will be generated.
+        n (int): The CPU/memory cost parameter, must be a power of two.
+        r (int): The block size parameter.
+        p (int): The parallelization parameter.
 
     Returns:
         tuple[bytes, bytes]: A tuple containing the derived key and the salt used.
     """
     if salt is None:
         salt = os.urandom(16)
-    kdf = Scrypt(salt, 32, 2**14, 8, 1)
+    kdf = Scrypt(salt, 32, n, r, p)
     return kdf.derive(pw), salt
 
 
@@ -45,3 +77,323 @@ def scrypt_verify(pw: bytes, derived_key: bytes, salt: bytes) -> bool:
         return True
     except InvalidKey:
         return False
+
+
+class KdfParameters:
+    """
+    The backend, cost parameters and salt used to derive a key.
+
+    Attributes:
+        algorithm (int): The id of the key derivation backend.
+        n (int): The CPU/memory cost parameter, or the PBKDF2 iteration count.
+        Always a power of two.
+        r (int): The block size parameter, unused by PBKDF2.
+        p (int): The parallelization parameter, unused by PBKDF2.
+        salt (bytes): The salt used for key derivation.
+    """
+
+    def __init__(self, algorithm: int, cost: tuple[int, int, int], salt: bytes) -> None:
+        """
+        Initializes KdfParameters with the given values.
+
+        Args:
+            algorithm (int): The id of the key derivation backend.
+            cost (tuple[int, int, int]): The cost parameters n, r and p.
+            salt (bytes): The salt used for key derivation.
+
+        Raises:
+            ValueError: If the algorithm is unknown or n is not a power of two.
+        """
+        n, r, p = cost
+        if algorithm not in KDF_BACKENDS:
+            raise ValueError(f"Unknown key derivation algorithm {algorithm}")
+        if n < 2 or n & (n - 1) != 0:
+            raise ValueError("n must be a power of two")
+        self.algorithm = algorithm
+        self.n = n
+        self.r = r
+        self.p = p
+        self.salt = salt
+
+    @classmethod
+    def current(cls, salt: Optional[bytes] = None) -> KdfParameters:
+        """
+        Creates KdfParameters with the currently configured backend and cost parameters.
+
+        Args:
+            salt (Optional[bytes]): The salt to use.
+            If not provided, a new salt will be generated.
+
+        Returns:
+            KdfParameters: The current parameters.
+        """
+        backend = backend_by_name(kdf_backend())
+        return cls(
+            backend.algorithm,
+            backend.default_cost(),
+            salt if salt is not None else os.urandom(16),
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> KdfParameters:
+        """
+        Decodes KdfParameters stored next to a record.
+
+        Args:
+            data (bytes): The encoded parameters or a raw legacy salt.
+
+        Returns:
+            KdfParameters: The decoded parameters.
+
+        Raises:
+            ValueError: If the data can't be decoded.
+        """
+        if len(data) == _LEGACY_SALT_LENGTH:
+            return cls(SCRYPT, (2**14, 8, 1), data)
+        if len(data) < _HEADER.size:
+            raise ValueError("Invalid key derivation parameters")
+        version, algorithm, log_n, r, p = _HEADER.unpack_from(data)
+        if version != _HEADER_VERSION:
+            raise ValueError(f"Unknown key derivation parameter version {version}")
+        return cls(algorithm, (2**log_n, r, p), data[_HEADER.size :])
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the parameters to be stored next to a record.
+
+        Returns:
+            bytes: The encoded parameters.
+        """
+        return (
+            _HEADER.pack(
+                _HEADER_VERSION, self.algorithm, int(math.log2(self.n)), self.r, self.p
+            )
+            + self.salt
+        )
+
+    def is_current(self) -> bool:
+        """
+        Checks if the parameters match the currently configured ones.
+
+        Returns:
+            bool: True if the parameters are current, False otherwise.
+        """
+        backend = backend_by_name(kdf_backend())
+        return (self.algorithm, self.n, self.r, self.p) == (
+            backend.algorithm,
+            *backend.default_cost(),
+        )
+
+    def derive(self, pw: Buffer) -> bytes:
+        """
+        Derives a key from the given password using these parameters.
+
+        Args:
+            pw (Buffer): The password to be derived.
+
+        Returns:
+            bytes: The derived key.
+        """
+        return KDF_BACKENDS[self.algorithm].derive(
+            pw, self.salt, (self.n, self.r, self.p)
+        )
+
+
+def derive_key(pw: Buffer, salt: Optional[bytes] = None) -> tuple[bytes, bytes]:
+    """
+    Derives a key from the given password using the parameters encoded in the salt.
+
+    Args:
+        pw (Buffer): The password to be derived.
+        salt (Optional[bytes]): The encoded `KdfParameters` or a raw legacy salt.
+        If not provided, the current parameters and a new salt will be used.
+
+    Returns:
+        tuple[bytes, bytes]: A tuple containing the derived key and the encoded
+        parameters used.
+    """
+    params = KdfParameters.current() if salt is None else KdfParameters.from_bytes(salt)
+    return params.derive(pw), salt if salt is not None else params.to_bytes()
+
+
+def derive_salted_key(job: tuple[bytearray, bytes]) -> bytes:
+    """
+    Derives the key of a salt from a copy of the password, which is wiped
+    once the key is derived.
+
+    This is a module level function, so it can be sent to the worker
+    processes of a `DecryptPool`.
+
+    Args:
+        job (tuple[bytearray, bytes]): The copy of the password and the salt.
+
+    Returns:
+        bytes: The derived key.
+    """
+    password, salt = job
+    try:
+        key, _ = derive_key(password, salt)
+        return key
+    finally:
+        password[:] = bytes(len(password))
+
+
+def calibrate_scrypt(
+    target_ms: float, *, r: int = 8, p: int = 1, max_n: int = 2**18
+) -> tuple[int, int, int]:
+    """
+    Benchmarks Scrypt on this host and picks the largest cost parameter n
+    whose derivation time stays within the target latency.
+
+    The result never falls below the legacy cost of n=2**14.
+
+    Args:
+        target_ms (float): The target latency of a single derivation in milliseconds.
+        r (int): The block size parameter to calibrate with.
+        p (int): The parallelization parameter to calibrate with.
+        max_n (int): The largest cost parameter to consider.
+
+    Returns:
+        tuple[int, int, int]: The calibrated parameters n, r and p.
+    """
+    n = 2**14
+    salt = os.urandom(16)
+    while n < max_n:
+        start = time.perf_counter()
+        scrypt_derive(b"calibration", salt, n=n * 2, r=r, p=p)
+        if (time.perf_counter() - start) * 1000 > target_ms:
+            break
+        n *= 2
+    return n, r, p
+
+
+def _digest(pw: Buffer | SecretBuffer) -> bytes:
+    """
+    Returns the fingerprint a password is cached under.
+    """
+    return pw.fingerprint if isinstance(pw, SecretBuffer) else fingerprint(pw)
+
+
+class DerivedKeyCache:
+    """
+    A bounded, salt-keyed LRU cache for keys derived with `derive_key`.
+
+    Entries are keyed by the salt and the fingerprint of the password, so
+    the cache never holds a copy of the password itself. The cache is meant
+    to live for the duration of a logged-in session and has to be wiped with
+    `clear` once the session ends.
+
+    Attributes:
+        hits (int): The number of derivations answered from the cache.
+        misses (int): The number of derivations that had to run Scrypt.
+    """
+
+    def __init__(self, max_size: Optional[int] = None) -> None:
+        """
+        Initializes an empty DerivedKeyCache.
+
+        Args:
+            max_size (Optional[int]): The maximum number of cached keys.
+            If not provided, the configured key cache size is used.
+        """
+        self._max_size = max_size
+        self._keys: OrderedDict[tuple[bytes, bytes], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self) -> int:
+        """
+        The maximum number of keys held by the cache.
+        """
+        return self._max_size if self._max_size is not None else key_cache_size()
+
+    def derive(
+        self, pw: Buffer | SecretBuffer, salt: Optional[bytes] = None
+    ) -> tuple[bytes, bytes]:
+        """
+        Derives a key from the given password, reusing previously derived
+        keys for the same password and salt.
+
+        Args:
+            pw (Buffer | SecretBuffer): The password to be derived.
+            salt (Optional[bytes]): The encoded `KdfParameters` or a raw legacy salt.
+            If not provided, the current parameters and a new salt will be used.
+
+        Returns:
+            tuple[bytes, bytes]: A tuple containing the derived key and the encoded
+            parameters used.
+        """
+        digest = _digest(pw)
+        if salt is not None:
+            with self._lock:
+                key = self._keys.get((salt, digest))
+                if key is not None:
+                    self._keys.move_to_end((salt, digest))
+                    self.hits += 1
+                    return key, salt
+
+        key, salt = derive_key(pw.view() if isinstance(pw, SecretBuffer) else pw, salt)
+        self.add(pw, salt, key)
+        return key, salt
+
+    def add(self, pw: Buffer | SecretBuffer, salt: bytes, key: bytes) -> None:
+        """
+        Adds a key that was derived elsewhere, e.g. by `derive_salted_key` in
+        a worker process. It is counted as a miss.
+
+        Args:
+            pw (Buffer | SecretBuffer): The password the key was derived from.
+            salt (bytes): The salt the key was derived with.
+            key (bytes): The derived key.
+        """
+        digest = _digest(pw)
+        with self._lock:
+            self.misses += 1
+            self._keys[(salt, digest)] = key
+            self._keys.move_to_end((salt, digest))
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+
+    def missing(self, pw: Buffer | SecretBuffer, salts: Iterable[bytes]) -> list[bytes]:
+        """
+        Returns the salts whose keys for the given password aren't cached yet,
+        without duplicates and at most as many as the cache holds.
+
+        Args:
+            pw (Buffer | SecretBuffer): The password the keys are derived from.
+            salts (Iterable[bytes]): The salts to check.
+
+        Returns:
+            list[bytes]: The salts of the missing keys, in the given order.
+        """
+        digest = _digest(pw)
+        with self._lock:
+            missing = [
+                salt
+                for salt in dict.fromkeys(salts)
+                if (salt, digest) not in self._keys
+            ]
+        return missing[: self.max_size]
+
+    def clear(self) -> None:
+        """
+        Wipes all cached keys and resets the hit and miss counters.
+        """
+        with self._lock:
+            self._keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of cached keys.
+
+        Returns:
+            int: The number of cached keys.
+        """
+        return len(self._keys)
+
+
+KEY_CACHE = DerivedKeyCache()
@@ -0,0 +1,117 @@
+"""
+Provides a wipeable in-memory container for secrets such as the master password.
+
+The secret is kept in a single `bytearray` and handed out as a read-only
+`memoryview`, so key derivation and cipher calls read it without creating
+new copies. `wipe` overwrites the buffer with zeros once it is no longer needed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+
+from src.crypto.aead import Buffer
+
+_FINGERPRINT_KEY = os.urandom(32)
+
+
+def fingerprint(data: Buffer) -> bytes:
+    """
+    Returns a keyed digest of the given data.
+
+    The key is generated once per process, so the digest can be used to look
+    up values derived from a secret without keeping the secret itself around.
+
+    Args:
+        data (Buffer): The secret to fingerprint.
+
+    Returns:
+        bytes: The 32-byte digest.
+    """
+    return hashlib.blake2b(data, key=_FINGERPRINT_KEY, digest_size=32).digest()
+
+
+class SecretBuffer:
+    """
+    A secret held in a mutable buffer that can be wiped in place.
+
+    Attributes:
+        fingerprint (bytes): The keyed digest of the secret, see `fingerprint`.
+    """
+
+    def __init__(self, secret: str | Buffer) -> None:
+        """
+        Initializes the SecretBuffer with a copy of the given secret.
+
+        Args:
+            secret (str | Buffer): The secret. Strings are stored UTF-8 encoded.
+        """
+        self._buffer = bytearray(secret.encode() if isinstance(secret, str) else secret)
+        self._wiped = False
+        self.fingerprint = fingerprint(self._buffer)
+
+    def view(self) -> memoryview:
+        """
+        Returns a read-only view of the secret, without copying it.
+
+        Returns:
+            memoryview: The view of the secret.
+
+        Raises:
+            ValueError: If the secret has already been wiped.
+        """
+        if self._wiped:
+            raise ValueError("Secret has been wiped")
+        return memoryview(self._buffer).toreadonly()
+
+    def wipe(self) -> None:
+        """
+        Overwrites the secret with zeros. The buffer can't be used afterwards.
+        """
+        self._buffer[:] = bytes(len(self._buffer))
+        self._wiped = True
+
+    @property
+    def is_wiped(self) -> bool:
+        """
+        Whether the secret has been wiped.
+        """
+        return self._wiped
+
+    def __len__(self) -> int:
+        """
+        Returns the length of the secret in bytes.
+
+        Returns:
+            int: The length of the secret.
+        """
+        return len(self._buffer)
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Compares two secrets in constant time.
+
+        Args:
+            other (object): The object to compare with.
+
+        Returns:
+            bool: True if both secrets are equal and neither has been wiped.
+        """
+        if not isinstance(other, SecretBuffer):
+            return NotImplemented
+        if self._wiped or other.is_wiped:
+            return False
+        return hmac.compare_digest(self._buffer, other.view())
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """
+        Returns a representation of the buffer that doesn't reveal the secret.
+
+        Returns:
+            str: The masked representation.
+        """
+        return "SecretBuffer(<wiped>)" if self._wiped else "SecretBuffer(***)"
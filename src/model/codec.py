@@ -0,0 +1,395 @@
+"""
+Provides the binary encoding of values stored in the database.
+
+Encoded values start with a two byte header, a marker and the codec version,
+followed by the fields of the value:
+
+    marker (1 byte) | version (1 byte) | fields
+
+Fields are single bytes, or byte strings prefixed with their 4-byte length.
+A length of 0xFFFFFFFF marks a missing optional byte string. Lists of byte
+strings start with the number of their items and the lengths of all items,
+followed by the items themselves, so they are decoded with a single unpack.
+
+Columns holding a single optional byte string are written by
+`encode_optional` as the header, a presence byte and the byte string.
+
+Values written by older versions are pickled. They always start with the
+pickle protocol marker, so they can't be mistaken for an encoded value, and
+are loaded with `load_legacy`, which only accepts the classes stored by
+older versions.
+"""
+
+import functools
+import io
+import pickle
+import struct
+from typing import Any
+from typing import Optional
+
+MARKER = 0xC0
+CODEC_VERSION = 1
+
+_HEADER = struct.Struct(">BB")
+_HEADER_BYTES = _HEADER.pack(MARKER, CODEC_VERSION)
+_BYTE = struct.Struct(">B")
+_LENGTH = struct.Struct(">I")
+_MISSING = 0xFFFFFFFF
+_PRESENT_BYTES = _HEADER_BYTES + b"\x01"
+_ABSENT_BYTES = _HEADER_BYTES + b"\x00"
+
+_LEGACY_CLASSES = {
+    ("datetime", "datetime"),
+    ("src.model.metadata", "EncryptedMetadata"),
+    ("src.model.metadata", "Metadata"),
+    ("src.model.password", "Password"),
+}
+
+
+class Encoder:
+    """
+    Encodes the fields of a value, see the module documentation for the format.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the Encoder with the header of the encoded value.
+        """
+        self._parts: list[bytes] = [_HEADER.pack(MARKER, CODEC_VERSION)]
+
+    def write_byte(self, value: int) -> None:
+        """
+        Writes a single byte.
+
+        Args:
+            value (int): The value of the byte, between 0 and 255.
+        """
+        self._parts.append(_BYTE.pack(value))
+
+    def write_bytes(self, value: bytes) -> None:
+        """
+        Writes a byte string.
+
+        Args:
+            value (bytes): The byte string.
+        """
+        self._parts.append(_LENGTH.pack(len(value)))
+        self._parts.append(value)
+
+    def write_optional(self, value: Optional[bytes]) -> None:
+        """
+        Writes a byte string that may be missing.
+
+        Args:
+            value (Optional[bytes]): The byte string, or None.
+        """
+        if value is None:
+            self._parts.append(_LENGTH.pack(_MISSING))
+        else:
+            self.write_bytes(value)
+
+    def write_list(self, values: list[bytes]) -> None:
+        """
+        Writes a list of byte strings.
+
+        Args:
+            values (list[bytes]): The byte strings.
+        """
+        self._parts.append(_LENGTH.pack(len(values)))
+        self._parts.append(struct.pack(f">{len(values)}I", *map(len, values)))
+        self._parts.extend(values)
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the encoded value.
+
+        Returns:
+            bytes: The encoded value, including its header.
+        """
+        return b"".join(self._parts)
+
+
+class Decoder:
+    """
+    Decodes the fields of a value written by an `Encoder`, in the order they
+    were written.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        """
+        Initializes the Decoder and checks the header of the encoded value.
+
+        Args:
+            data (bytes): The encoded value.
+
+        Raises:
+            ValueError: If the data isn't an encoded value or has an unknown version.
+        """
+        if data[:2] != _HEADER_BYTES:
+            raise _header_error(data)
+        self._data = data
+        self._offset = _HEADER.size
+
+    def read_byte(self) -> int:
+        """
+        Reads a single byte.
+
+        Returns:
+            int: The value of the byte.
+
+        Raises:
+            ValueError: If the value is truncated.
+        """
+        try:
+            value = self._data[self._offset]
+        except IndexError as e:
+            raise ValueError("Truncated value") from e
+        self._offset += 1
+        return value
+
+    def read_bytes(self) -> bytes:
+        """
+        Reads a byte string.
+
+        Returns:
+            bytes: The byte string.
+
+        Raises:
+            ValueError: If the byte string is missing or truncated.
+        """
+        value = self.read_optional()
+        if value is None:
+            raise ValueError("Missing value")
+        return value
+
+    def read_optional(self) -> Optional[bytes]:
+        """
+        Reads a byte string that may be missing.
+
+        Returns:
+            Optional[bytes]: The byte string, or None.
+
+        Raises:
+            ValueError: If the byte string is truncated.
+        """
+        try:
+            length: int = _LENGTH.unpack_from(self._data, self._offset)[0]
+        except struct.error as e:
+            raise ValueError("Truncated value") from e
+        self._offset += _LENGTH.size
+        if length == _MISSING:
+            return None
+        start = self._offset
+        end = start + length
+        if end > len(self._data):
+            raise ValueError("Truncated value")
+        self._offset = end
+        return self._data[start:end]
+
+    def read_list(self) -> list[bytes]:
+        """
+        Reads a list of byte strings.
+
+        Returns:
+            list[bytes]: The byte strings.
+
+        Raises:
+            ValueError: If the list is truncated.
+        """
+        values, self._offset = _read_list(self._data, self._offset)
+        return values
+
+
+def _header_error(data: bytes) -> ValueError:
+    """
+    Describes why the header of the given data doesn't match the codec.
+
+    Args:
+        data (bytes): The data with a mismatched header.
+
+    Returns:
+        ValueError: The error to raise.
+    """
+    if is_encoded(data):
+        return ValueError(f"Unknown codec version {data[1]}")
+    return ValueError("Value is not encoded")
+
+
+@functools.lru_cache(maxsize=1024)
+def _items(lengths: bytes) -> struct.Struct:
+    """
+    Returns the struct holding the items of a list, so all items are sliced
+    by a single unpack. Lists of the same shape, such as the encrypted
+    timestamps of all entries, share their struct.
+
+    Args:
+        lengths (bytes): The encoded lengths of the items.
+
+    Returns:
+        struct.Struct: The struct of the items.
+    """
+    count = len(lengths) // _LENGTH.size
+    return struct.Struct(
+        "".join(f"{length}s" for length in struct.unpack(f">{count}I", lengths))
+    )
+
+
+def _read_list(data: bytes, offset: int) -> tuple[list[bytes], int]:
+    """
+    Reads a list of byte strings, see `Decoder.read_list`.
+
+    Args:
+        data (bytes): The encoded value.
+        offset (int): The offset of the list within the value.
+
+    Returns:
+        tuple[list[bytes], int]: The byte strings and the offset after the list.
+
+    Raises:
+        ValueError: If the list is truncated.
+    """
+    try:
+        start = offset + _LENGTH.size
+        end = start + _LENGTH.size * _LENGTH.unpack_from(data, offset)[0]
+        items = _items(data[start:end])
+        return list(items.unpack_from(data, end)), end + items.size
+    except struct.error as e:
+        raise ValueError("Truncated value") from e
+
+
+def is_encoded(data: bytes) -> bool:
+    """
+    Checks if the given data is an encoded value rather than a pickle written
+    by older versions.
+
+    Args:
+        data (bytes): The data to check.
+
+    Returns:
+        bool: True if the data is an encoded value, False otherwise.
+    """
+    return len(data) >= _HEADER.size and data[0] == MARKER
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    """
+    An unpickler that only loads the classes stored by older versions.
+    """
+
+    def find_class(self, module: str, name: str) -> Any:
+        """
+        Looks up a class referenced by the pickle.
+
+        Args:
+            module (str): The module of the class.
+            name (str): The name of the class.
+
+        Returns:
+            Any: The class.
+
+        Raises:
+            pickle.UnpicklingError: If the class isn't stored by older versions.
+        """
+        if (module, name) not in _LEGACY_CLASSES:
+            raise pickle.UnpicklingError(f"Refusing to load {module}.{name}")
+        return super().find_class(module, name)
+
+
+def load_legacy(data: bytes) -> Any:
+    """
+    Loads a value pickled by older versions.
+
+    Args:
+        data (bytes): The pickled value.
+
+    Returns:
+        Any: The loaded value.
+
+    Raises:
+        pickle.UnpicklingError: If the pickle references a class that isn't
+        stored by older versions.
+    """
+    return _LegacyUnpickler(io.BytesIO(data)).load()
+
+
+def encode_optional(value: Optional[bytes]) -> bytes:
+    """
+    Encodes a byte string that may be missing as a column value.
+
+    Args:
+        value (Optional[bytes]): The byte string, or None.
+
+    Returns:
+        bytes: The encoded value.
+    """
+    if value is None:
+        return _ABSENT_BYTES
+    return _PRESENT_BYTES + value
+
+
+def decode_optional(data: bytes) -> Optional[bytes]:
+    """
+    Decodes a byte string encoded by `encode_optional`, or pickled by older versions.
+
+    Args:
+        data (bytes): The encoded value.
+
+    Returns:
+        Optional[bytes]: The byte string, or None.
+
+    Raises:
+        ValueError: If the value has an unknown version or presence byte.
+        TypeError: If a pickled value isn't a byte string.
+    """
+    if data.startswith(_PRESENT_BYTES):
+        return data[len(_PRESENT_BYTES) :]
+    if data == _ABSENT_BYTES:
+        return None
+    if data[:2] == _HEADER_BYTES:
+        raise ValueError("Invalid optional value")
+    if is_encoded(data):
+        raise _header_error(data)
+    value = load_legacy(data)
+    if value is not None and not isinstance(value, bytes):
+        raise TypeError("Bytes expected")
+    return value
+
+
+def encode_list(values: list[bytes]) -> bytes:
+    """
+    Encodes a list of byte strings.
+
+    Args:
+        values (list[bytes]): The byte strings.
+
+    Returns:
+        bytes: The encoded value.
+    """
+    encoder = Encoder()
+    encoder.write_list(values)
+    return encoder.to_bytes()
+
+
+def decode_list(data: bytes) -> list[bytes]:
+    """
+    Decodes a list of byte strings encoded by `encode_list`, or pickled by older versions.
+
+    Args:
+        data (bytes): The encoded value.
+
+    Returns:
+        list[bytes]: The byte strings.
+
+    Raises:
+        TypeError: If a pickled value isn't a list of byte strings.
+    """
+    if data[:2] == _HEADER_BYTES:
+        return _read_list(data, _HEADER.size)[0]
+    if is_encoded(data):
+        raise _header_error(data)
+    values = load_legacy(data)
+    if not isinstance(values, list) or not all(
+        isinstance(value, bytes) for value in values
+    ):
+        raise TypeError("List of bytes expected")
+    return values
@@ -6,10 +6,13 @@ functionalities.
 from __future__ import annotations
 
 import datetime
-import pickle
+from typing import Optional
 
-from src.crypto.fernet import decrypt_fernet
-from src.crypto.fernet import encrypt_fernet
+from src.crypto.aead import cipher_for
+from src.model.codec import decode_list
+from src.model.codec import encode_list
+from src.model.codec import is_encoded
+from src.model.codec import load_legacy
 
 
 class Metadata:
@@ -65,9 +68,13 @@ class EncryptedMetadata:
             metadata (Metadata): The Metadata instance to be encrypted.
             key (bytes): The encryption key.
         """
-        self.created_at: bytes = encrypt_fernet(pickle.dumps(metadata.created_at), key)
-        self.modified_at: bytes = encrypt_fernet(
-            pickle.dumps(metadata.last_modified), key
+        self.created_at: bytes
+        self.modified_at: bytes
+        self.created_at, self.modified_at = cipher_for(key).encrypt_many(
+            [
+                encode_timestamp(metadata.created_at),
+                encode_timestamp(metadata.last_modified),
+            ]
         )
 
     def access(self) -> None:
@@ -100,7 +107,89 @@ class EncryptedMetadata:
         Returns:
             Metadata: An instance of Metadata with the decrypted data.
         """
+        created_at, modified_at = cipher_for(key).decrypt_many(
+            [self.created_at, self.modified_at]
+        )
         metadata = Metadata()
-        metadata.created_at = pickle.loads(decrypt_fernet(self.created_at, key))
-        metadata.last_modified = pickle.loads(decrypt_fernet(self.modified_at, key))
+        metadata.created_at = decode_timestamp(created_at)
+        metadata.last_modified = decode_timestamp(modified_at)
         return metadata
+
+
+def encode_timestamp(timestamp: datetime.datetime) -> bytes:
+    """
+    Serializes a timestamp in ISO 8601 format.
+
+    Args:
+        timestamp (datetime.datetime): The timestamp to be serialized.
+
+    Returns:
+        bytes: The serialized timestamp.
+    """
+    return timestamp.isoformat().encode()
+
+
+def decode_timestamp(data: bytes) -> datetime.datetime:
+    """
+    Deserializes a timestamp serialized by `encode_timestamp`, or pickled by
+    older versions.
+
+    Args:
+        data (bytes): The serialized timestamp.
+
+    Returns:
+        datetime.datetime: The timestamp.
+
+    Raises:
+        TypeError: If the data doesn't hold a timestamp.
+    """
+    if data[:1] != b"\x80":
+        return datetime.datetime.fromisoformat(data.decode())
+    timestamp = load_legacy(data)
+    if not isinstance(timestamp, datetime.datetime):
+        raise TypeError("Timestamp expected")
+    return timestamp
+
+
+def adapt_metadata(metadata: Optional[EncryptedMetadata]) -> bytes:
+    """
+    Serializes the encrypted metadata of a password entry to a bytes object.
+
+    Args:
+        metadata (Optional[EncryptedMetadata]): The encrypted metadata, or None
+        for entries that store their metadata elsewhere.
+
+    Returns:
+        bytes: The serialized metadata.
+    """
+    return encode_list(
+        [] if metadata is None else [metadata.created_at, metadata.modified_at]
+    )
+
+
+def convert_metadata(data: bytes) -> Optional[EncryptedMetadata]:
+    """
+    Deserializes encrypted metadata serialized by `adapt_metadata`, or pickled
+    by older versions.
+
+    Args:
+        data (bytes): The serialized metadata.
+
+    Returns:
+        Optional[EncryptedMetadata]: The encrypted metadata, or None.
+
+    Raises:
+        TypeError: If the data doesn't hold encrypted metadata.
+    """
+    if not is_encoded(data):
+        legacy = load_legacy(data)
+        if legacy is not None and not isinstance(legacy, EncryptedMetadata):
+            raise TypeError("EncryptedMetadata expected")
+        return legacy
+
+    timestamps = decode_list(data)
+    if not timestamps:
+        return None
+    metadata = EncryptedMetadata.__new__(EncryptedMetadata)
+    metadata.created_at, metadata.modified_at = timestamps
+    return metadata
@@ -4,14 +4,31 @@ and SHA-256, with functionality to mark a password as a master
 password and serialize/deserialize password instances.
 """
 
-import pickle
+from __future__ import annotations
+
+import struct
 from typing import Optional
 
+from src.crypto.aead import cipher_for
 from src.crypto.aes256 import decrypt_aes
-from src.crypto.aes256 import encrypt_aes
 from src.crypto.hashing import hash_sha256
-from src.crypto.key_derivation import scrypt_derive
+from src.crypto.key_derivation import KEY_CACHE
+from src.crypto.secret import SecretBuffer
 from src.exceptions.encryption_exception import EncryptionException
+from src.model.codec import decode_list
+from src.model.codec import decode_optional
+from src.model.codec import encode_list
+from src.model.codec import encode_optional
+from src.model.codec import is_encoded
+from src.model.codec import load_legacy
+
+AES_CBC_FORMAT = 0
+SEALED_FORMAT = 1
+
+_ENCRYPTED_FLAG = 1
+_MASTER_FLAG = 2
+_MISSING_SALT = 0xFFFF
+_ENCODED_HEADER = struct.Struct(">BBH")
 
 
 class Password:
@@ -29,8 +46,13 @@ class Password:
         password_bytes (bytes): The password stored in bytes format.
         salt (Optional[bytes]): The salt used for encryption, if any.
         is_master (bool): Indicates if the password is a master password.
+        record_format (int): The format the encrypted password is stored in.
+        Passwords stored by older versions don't have the attribute set and
+        fall back to AES-CBC.
     """
 
+    record_format: int = AES_CBC_FORMAT
+
     def __init__(self, password: str):
         """
         Initializes a new Password instance.
@@ -42,13 +64,14 @@ class Password:
         self.password_bytes: bytes = password.encode()
         self.salt: Optional[bytes] = None
         self.is_master = False
+        self.record_format = SEALED_FORMAT
 
-    def encrypt(self, password: str) -> None:
+    def encrypt(self, password: SecretBuffer) -> None:
         """
-        Encrypts the password using the provided key.
+        Encrypts the password with a key derived from the given master password.
 
         Args:
-            key (bytes): The encryption key.
+            password (SecretBuffer): The master password.
 
         Raises:
             EncryptionException: If the password is a master password or is
@@ -61,12 +84,12 @@ class Password:
         self.is_encrypted = True
         self._encrypt_password(password)
 
-    def decrypt(self, password: str) -> None:
+    def decrypt(self, password: SecretBuffer) -> None:
         """
-        Decrypts the password using the provided key.
+        Decrypts the password with a key derived from the given master password.
 
         Args:
-            key (bytes): The decryption key.
+            password (SecretBuffer): The master password.
 
         Raises:
             EncryptionException: If the password is a master password or is not
@@ -79,22 +102,76 @@ class Password:
         self.is_encrypted = False
         self._decrypt_password(password)
 
-    def _encrypt_password(self, password: str) -> None:
+    def encrypt_with_key(self, key: bytes, salt: bytes) -> None:
+        """
+        Encrypts the password using an already resolved key.
+
+        Args:
+            key (bytes): The encryption key.
+            salt (bytes): The salt to store with the password, identifying the key.
+
+        Raises:
+            EncryptionException: If the password is a master password.
+        """
+        if self.is_master:
+            raise EncryptionException("Master password can't be encrypted")
+        if self.is_encrypted:
+            return
+        self.is_encrypted = True
+        self.salt = salt
+        self._seal_password(key)
+
+    def decrypt_with_key(self, key: bytes) -> None:
+        """
+        Decrypts the password using an already resolved key.
+
+        Args:
+            key (bytes): The decryption key.
+
+        Raises:
+            EncryptionException: If the password is a master password.
+        """
+        if self.is_master:
+            raise EncryptionException("Master password can't be decrypted")
+        if not self.is_encrypted:
+            return
+        self.is_encrypted = False
+        self.salt = None
+        self._open_password(key)
+
+    def _encrypt_password(self, password: SecretBuffer) -> None:
         """
         Performs the actual encryption of the password.
         """
-        key, self.salt = scrypt_derive(password.encode())
-        self.password_bytes = encrypt_aes(self.password_bytes, key)
+        key, self.salt = KEY_CACHE.derive(password)
+        self._seal_password(key)
 
-    def _decrypt_password(self, password: str) -> None:
+    def _decrypt_password(self, password: SecretBuffer) -> None:
         """
         Performs the actual decryption of the password.
         """
         if self.salt is None:
             raise EncryptionException("No Salt found")
-        key, _ = scrypt_derive(password.encode(), self.salt)
+        key, _ = KEY_CACHE.derive(password, self.salt)
         self.salt = None
-        self.password_bytes = decrypt_aes(self.password_bytes, key)
+        self._open_password(key)
+
+    def _seal_password(self, key: bytes) -> None:
+        """
+        Encrypts the password bytes as a sealed record.
+        """
+        self.password_bytes = cipher_for(key).seal(self.password_bytes)
+        self.record_format = SEALED_FORMAT
+
+    def _open_password(self, key: bytes) -> None:
+        """
+        Decrypts the password bytes according to the record format.
+        """
+        if self.record_format == SEALED_FORMAT:
+            self.password_bytes = cipher_for(key).open(self.password_bytes)
+        else:
+            self.password_bytes = decrypt_aes(self.password_bytes, key)
+        self.record_format = SEALED_FORMAT
 
     def make_master(self) -> None:
         """
@@ -112,6 +189,55 @@ class Password:
         self.password_bytes = hash_sha256(self.password_bytes)
         self.is_master = True
 
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the password, including its flags and salt.
+
+        Returns:
+            bytes: The serialized password.
+        """
+        return (
+            _ENCODED_HEADER.pack(
+                (_ENCRYPTED_FLAG if self.is_encrypted else 0)
+                | (_MASTER_FLAG if self.is_master else 0),
+                self.record_format,
+                _MISSING_SALT if self.salt is None else len(self.salt),
+            )
+            + (self.salt or b"")
+            + self.password_bytes
+        )
+
+    @staticmethod
+    def from_bytes(data: bytes) -> Password:
+        """
+        Deserializes a password serialized by `to_bytes`.
+
+        Args:
+            data (bytes): The serialized password.
+
+        Returns:
+            Password: The deserialized password.
+
+        Raises:
+            ValueError: If the data is truncated.
+        """
+        try:
+            flags, record_format, salt_length = _ENCODED_HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ValueError("Truncated password") from e
+        password = Password.__new__(Password)
+        password.is_encrypted = bool(flags & _ENCRYPTED_FLAG)
+        password.is_master = bool(flags & _MASTER_FLAG)
+        password.record_format = record_format
+        if salt_length == _MISSING_SALT:
+            password.salt = None
+            password.password_bytes = data[_ENCODED_HEADER.size :]
+        else:
+            end = _ENCODED_HEADER.size + salt_length
+            password.salt = data[_ENCODED_HEADER.size : end]
+            password.password_bytes = data[end:]
+        return password
+
     def __call__(self) -> bytes:
         """
         Returns the current password value.
@@ -139,7 +265,7 @@ def adapt_password(password: Password) -> bytes:
     if not password.is_encrypted and not password.is_master:
         raise TypeError("Password is not encrypted")
 
-    return pickle.dumps(password)
+    return encode_optional(password.to_bytes())
 
 
 def convert_password(password: bytes) -> Password:
@@ -147,7 +273,8 @@ def convert_password(password: bytes) -> Password:
     Deserializes a bytes object to a Password instance.
 
     Args:
-        password (bytes): The serialized Password instance.
+        password (bytes): The serialized Password instance, or a Password
+        instance pickled by older versions.
 
     Returns:
         Password: The deserialized Password instance.
@@ -155,7 +282,56 @@ def convert_password(password: bytes) -> Password:
     Raises:
         TypeError: If the deserialized object is not a Password instance.
     """
-    retrieved_password: Password = pickle.loads(password)
+    if is_encoded(password):
+        data = decode_optional(password)
+        if data is None:
+            raise TypeError("Password expected")
+        return Password.from_bytes(data)
+
+    retrieved_password: Password = load_legacy(password)
     if not isinstance(retrieved_password, Password):
         raise TypeError("Password expected")
     return retrieved_password
+
+
+def adapt_passwords(passwords: list[Password]) -> bytes:
+    """
+    Serializes a list of encrypted Password instances to a bytes object.
+
+    Args:
+        passwords (list[Password]): The Password instances to be serialized.
+
+    Returns:
+        bytes: The serialized list.
+
+    Raises:
+        TypeError: If a Password instance is neither encrypted nor a master
+        password.
+    """
+    if any(
+        not password.is_encrypted and not password.is_master for password in passwords
+    ):
+        raise TypeError("Password is not encrypted")
+    return encode_list([password.to_bytes() for password in passwords])
+
+
+def convert_passwords(passwords: bytes) -> list[Password]:
+    """
+    Deserializes a bytes object to a list of Password instances.
+
+    Args:
+        passwords (bytes): The serialized list, or a list pickled by older versions.
+
+    Returns:
+        list[Password]: The deserialized Password instances.
+
+    Raises:
+        TypeError: If the deserialized object is not a list of Password instances.
+    """
+    if is_encoded(passwords):
+        return [Password.from_bytes(password) for password in decode_list(passwords)]
+
+    retrieved_passwords: list[Password] = load_legacy(passwords)
+    if not all(isinstance(password, Password) for password in retrieved_passwords):
+        raise TypeError("Password expected")
+    return retrieved_passwords
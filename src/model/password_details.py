@@ -0,0 +1,205 @@
+"""
+Provides the details of a password entry: its description, username,
+categories and note, with batched encryption and decryption.
+"""
+
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+from src.crypto.aead import cipher_for
+
+DETAIL_FIELDS = ("description", "username", "categories", "note")
+
+
+class PasswordDetails:  # pylint: disable=too-many-instance-attributes
+    """
+    A class to store details related to a password.
+
+    Attributes:
+        description (bytes): A description of the password details.
+        username (Optional[bytes]): The username associated with the password.
+        categories (list[bytes]): A list of categories for the password.
+        note (Optional[bytes]): An optional note associated with the password.
+        dirty_fields (set[str]): The fields that were replaced since the
+        details were last decrypted.
+    """
+
+    def __init__(
+        self,
+        description: bytes,
+        username: Optional[bytes],
+        categories: list[bytes],
+        note: Optional[bytes],
+    ):
+        """
+        Initializes PasswordDetails with given details.
+
+        Args:
+            description (bytes): A description of the password details.
+            username (Optional[bytes]): The username associated with the password.
+            categories (list[bytes]): A list of categories for the password.
+            note (Optional[bytes]): An optional note associated with the password.
+        """
+        self.dirty_fields: set[str] = set()
+        self._ciphertexts: dict[str, object] = {}
+        self._loader: Optional[Callable[[], None]] = None
+        self.description = description
+        self.username = username
+        self.categories = categories
+        self.note = note
+
+    def __setattr__(self, name: str, value: object) -> None:
+        """
+        Marks a field as dirty when it is replaced.
+        """
+        if name in DETAIL_FIELDS:
+            self.__dict__.setdefault("dirty_fields", set()).add(name)
+        super().__setattr__(name, value)
+
+    @property
+    def categories(self) -> list[bytes]:
+        """
+        The categories, loaded on first access if they were deferred.
+        """
+        self._load()
+        return self._categories
+
+    @categories.setter
+    def categories(self, categories: list[bytes]) -> None:
+        self._load()
+        self._categories = categories
+
+    @property
+    def note(self) -> Optional[bytes]:
+        """
+        The note, loaded on first access if it was deferred.
+        """
+        self._load()
+        return self._note
+
+    @note.setter
+    def note(self, note: Optional[bytes]) -> None:
+        self._load()
+        self._note = note
+
+    def defer(self, loader: Optional[Callable[[], None]]) -> None:
+        """
+        Defers loading the categories and note until they are first accessed.
+
+        Args:
+            loader (Optional[Callable[[], None]]): Called once on first access,
+            to load the deferred fields. None cancels a deferred load.
+        """
+        self._loader = loader
+
+    def _load(self) -> None:
+        """
+        Runs the deferred loader, if any.
+        """
+        loader = self.__dict__.get("_loader")
+        if loader is not None:
+            self._loader = None
+            loader()
+
+    def fill(self, categories: list[bytes], note: Optional[bytes]) -> None:
+        """
+        Sets the deferred categories and note without marking them as dirty.
+
+        Args:
+            categories (list[bytes]): The decrypted categories.
+            note (Optional[bytes]): The decrypted note.
+        """
+        self._categories = categories
+        self._note = note
+
+    def encrypt(self, key: bytes) -> None:
+        """
+        Encrypts the password details using the provided key.
+
+        Fields that weren't replaced since the details were decrypted get
+        their previous ciphertext back instead of being encrypted again.
+
+        Args:
+            key (bytes): The encryption key.
+        """
+        stale = [
+            field
+            for field in DETAIL_FIELDS
+            if field in self.dirty_fields or field not in self._ciphertexts
+        ]
+        self._transform(cipher_for(key).encrypt_many, stale)
+        for field in DETAIL_FIELDS:
+            if field not in stale:
+                self._set(field, self._ciphertexts[field])
+        self._ciphertexts = {}
+        self._loader = None
+        self.dirty_fields.clear()
+
+    def decrypt(self, key: bytes) -> None:
+        """
+        Decrypts the password details using the provided key.
+
+        Args:
+            key (bytes): The decryption key.
+        """
+        self._ciphertexts = {field: getattr(self, field) for field in DETAIL_FIELDS}
+        self._transform(cipher_for(key).decrypt_many, DETAIL_FIELDS)
+        self.dirty_fields.clear()
+
+    def apply_summary(self, description: bytes, username: Optional[bytes]) -> None:
+        """
+        Replaces the encrypted description and username with decrypted ones,
+        leaving the categories and note encrypted until `decrypt_remaining`.
+
+        Args:
+            description (bytes): The decrypted description.
+            username (Optional[bytes]): The decrypted username.
+        """
+        self._ciphertexts = {field: getattr(self, field) for field in DETAIL_FIELDS}
+        self._set("description", description)
+        self._set("username", username)
+
+    def decrypt_remaining(self, key: bytes) -> None:
+        """
+        Decrypts the categories and note left encrypted by `apply_summary`.
+
+        Args:
+            key (bytes): The decryption key.
+        """
+        self._transform(cipher_for(key).decrypt_many, ("categories", "note"))
+
+    def _set(self, field: str, value: object) -> None:
+        """
+        Sets a field without marking it as dirty or loading deferred fields.
+        """
+        super().__setattr__(
+            f"_{field}" if field in ("categories", "note") else field, value
+        )
+
+    def _transform(
+        self, transform: Callable[[list[bytes]], list[bytes]], fields: Iterable[str]
+    ) -> None:
+        """
+        Replaces the given fields with the result of a single batched call.
+
+        Args:
+            transform (Callable[[list[bytes]], list[bytes]]): The batch operation,
+            returning one result per value in the same order.
+            fields (Iterable[str]): The names of the fields to transform.
+        """
+        present = [field for field in fields if getattr(self, field) is not None]
+        values: list[bytes] = []
+        for field in present:
+            if field == "categories":
+                values.extend(self.categories)
+            else:
+                values.append(getattr(self, field))
+
+        results = iter(transform(values))
+        for field in present:
+            if field == "categories":
+                value: object = [next(results) for _ in self.categories]
+            else:
+                value = next(results)
+            self._set(field, value)
@@ -12,28 +12,60 @@ from typing import Iterable
 from typing import Optional
 
 from src.api.pawned import check_password
-from src.crypto.fernet import decrypt_fernet
-from src.crypto.fernet import encrypt_fernet
-from src.crypto.key_derivation import scrypt_derive
+from src.config import entry_format
+from src.crypto.aead import cipher_for
+from src.crypto.envelope import DATA_KEY_SALT
+from src.crypto.key_derivation import KEY_CACHE
+from src.crypto.key_derivation import KdfParameters
+from src.crypto.secret import SecretBuffer
 from src.exceptions.encryption_exception import EncryptionException
 from src.import_export.password_dict import PasswordInformationDict
 from src.model.metadata import EncryptedMetadata
 from src.model.metadata import Metadata
 from src.model.password import Password
+from src.model.password_details import DETAIL_FIELDS
+from src.model.password_details import PasswordDetails
+from src.model.sealed_entry import entry_body
+from src.model.sealed_entry import entry_head
+from src.model.sealed_entry import open_entry_body
+from src.model.sealed_entry import open_entry_head
 from src.model.user import User
 
+FIELD_ENTRY = "fields"
+SEALED_ENTRY = "sealed"
+HEAD_FIELDS = ("description", "username")
+BODY_FIELDS = ("categories", "note", "metadata")
+ENTRY_FIELDS = (*HEAD_FIELDS, *BODY_FIELDS)
+ENTRY_COLUMNS = (*ENTRY_FIELDS, "passwords", "user", "salt", "entry", "body")
 
-class PasswordInformation:
+
+class PasswordInformation:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """
     A class to store and manage information related to a password.
 
     Attributes:
         user (User): The user associated with this password information.
-        passwords (list[Password]): A list of passwords related to this information.
+        passwords (list[Password]): The loaded passwords, oldest first. Entries
+        loaded from the database only hold their current password until the
+        rest of their history is loaded with `load_history`.
+        history_size (int): The amount of passwords stored in the password
+        history of the database. Entries sealed by older versions store their
+        passwords in the sealed body instead and have a history size of 0.
         description (bytes): A description of the password information.
         details (PasswordDetails): Details about the password information.
         metadata (Metadata | EncryptedMetadata): Metadata about the password information.
         data_is_encrypted (bool): Flag indicating whether the data is encrypted.
+        sealed_entry (Optional[bytes]): The sealed description and username,
+        if the data is encrypted in the sealed entry format.
+        sealed_body (Optional[bytes]): The sealed remainder of the entry, including
+        metadata and passwords. Entries sealed by older versions don't have a
+        body and hold the whole entry in `sealed_entry`.
+        dirty_fields (set[str]): The columns that changed since the entry was
+        last loaded or stored. Changes to the details are merged in on encryption.
+        "passwords" marks appended passwords, "history" marks a history that
+        has to be rewritten as a whole.
+        blind_index (Optional[bytes]): The blind index of the description and
+        username, computed when they change. See `User.blind_index`.
         id (Optional[int]): An optional identifier for the password information.
     """
 
@@ -53,17 +85,151 @@ class PasswordInformation:
             description (str): A description of the password information.
             username (Optional[str]): The username associated with the password, if any.
         """
-        self.passwords: list[Password] = [password]
+        self._pending: Optional[EncryptedMetadata | bytes] = None
+        self.dirty_fields: set[str] = set(ENTRY_COLUMNS)
+        self.history_size = 0
+        self._history_start = 0
+        self._passwords_in_body = False
+        self.passwords = [password]
         username_bytes: Optional[bytes] = (
             username.encode() if username is not None else None
         )
         self.details = PasswordDetails(description.encode(), username_bytes, [], None)
         self.user: User = user
-        self.metadata: Metadata | EncryptedMetadata = Metadata()
-        self._salt: Optional[bytes]
+        self.metadata = Metadata()
+        self._salt: Optional[bytes] = None
         self.data_is_encrypted = False
+        self.sealed_entry: Optional[bytes] = None
+        self.sealed_body: Optional[bytes] = None
+        self._stored_format: Optional[str] = None
+        self._stored_metadata: Optional[EncryptedMetadata] = None
+        self._stored_entry: Optional[bytes] = None
+        self._stored_body: Optional[bytes] = None
+        self.blind_index: Optional[bytes] = None
         self.id: Optional[int] = None
 
+    def __setattr__(self, name: str, value: object) -> None:
+        """
+        Marks the user and passwords as dirty when they are replaced. Replacing
+        the passwords replaces the whole history.
+        """
+        if name in ("user", "passwords"):
+            self.__dict__.setdefault("dirty_fields", set()).add(name)
+        if name == "passwords":
+            self.dirty_fields.add("history")
+        super().__setattr__(name, value)
+
+    @property
+    def metadata(self) -> Metadata | EncryptedMetadata:
+        """
+        The metadata, decrypted on first access after `apply_summary`.
+        """
+        self._load_pending()
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata: Metadata | EncryptedMetadata) -> None:
+        self._load_pending()
+        self._metadata = metadata
+
+    @property
+    def passwords(self) -> list[Password]:
+        """
+        The loaded passwords, oldest first. Passwords of an entry sealed by
+        older versions are decrypted on first access after `apply_summary`.
+        """
+        self._load_pending()
+        return self._passwords
+
+    @passwords.setter
+    def passwords(self, passwords: list[Password]) -> None:
+        self._load_pending()
+        self._passwords = passwords
+        self._history_start = 0
+
+    @property
+    def history_start(self) -> int:
+        """
+        The position of the first loaded password in the history.
+        """
+        return self._history_start
+
+    @property
+    def history_loaded(self) -> bool:
+        """
+        Whether all passwords of the history are loaded.
+        """
+        return self._history_start == 0
+
+    def set_history(self, passwords: list[Password], history_size: int) -> None:
+        """
+        Sets the most recent passwords of the stored history, e.g. when the
+        entry is loaded, without marking them as dirty.
+
+        Args:
+            passwords (list[Password]): The most recent passwords, oldest first.
+            history_size (int): The amount of passwords stored in the history.
+        """
+        self._passwords = passwords
+        self.history_size = history_size
+        self._history_start = history_size - len(passwords)
+
+    def load_history(self, older_passwords: list[Password]) -> None:
+        """
+        Prepends the older passwords of the history to the loaded passwords.
+
+        Args:
+            older_passwords (list[Password]): The passwords stored before the
+            loaded ones, oldest first.
+
+        Raises:
+            ValueError: If the passwords don't complete the history.
+        """
+        if len(older_passwords) != self._history_start:
+            raise ValueError("Incomplete password history")
+        self._passwords = older_passwords + self.passwords
+        self._history_start = 0
+
+    def unstored_passwords(self) -> list[tuple[int, Password]]:
+        """
+        Returns the passwords that have to be written to the history, with
+        their position in the history. These are the appended passwords, or
+        all passwords if the history has to be rewritten.
+
+        Returns:
+            list[tuple[int, Password]]: The positions and passwords, oldest first.
+
+        Raises:
+            ValueError: If the history has to be rewritten but isn't fully loaded.
+        """
+        if "history" in self.dirty_fields and not self.history_loaded:
+            raise ValueError("Password history needs to be loaded for rewriting")
+        first = 0 if "history" in self.dirty_fields else self.history_size
+        return [
+            (position, password)
+            for position, password in enumerate(self.passwords, self._history_start)
+            if position >= first
+        ]
+
+    def rewrite_history(self) -> None:
+        """
+        Marks the whole history to be written again, e.g. after its passwords
+        were encrypted with another key.
+
+        Raises:
+            ValueError: If the history isn't fully loaded.
+        """
+        if not self.history_loaded:
+            raise ValueError("Password history needs to be loaded for rewriting")
+        self.dirty_fields.update(("passwords", "history"))
+
+    def mark_clean(self) -> None:
+        """
+        Marks all fields as unchanged, e.g. after they have been stored.
+        """
+        self.dirty_fields.clear()
+        self.details.dirty_fields.clear()
+
     def set_note(self, note: str) -> None:
         """
         Sets or updates the note associated with this password information.
@@ -77,7 +243,7 @@ class PasswordInformation:
         if self.data_is_encrypted:
             raise EncryptionException("Can't add note while encrypted")
         self.details.note = note.encode()
-        self.metadata.modify()
+        self.modify()
 
     def add_password(self, password: Password) -> None:
         """
@@ -92,7 +258,8 @@ class PasswordInformation:
         if self.data_is_encrypted:
             raise EncryptionException("Can't add password while encrypted")
         self.passwords.append(password)
-        self.metadata.modify()
+        self.dirty_fields.add("passwords")
+        self.modify()
 
     def add_category(self, category: str) -> None:
         """
@@ -113,7 +280,8 @@ class PasswordInformation:
         if category.encode() in self.details.categories:
             raise ValueError("Category already exists")
         self.details.categories.append(category.encode())
-        self.metadata.modify()
+        self.details.dirty_fields.add("categories")
+        self.modify()
 
     def add_categories(self, categories: Iterable[str]) -> None:
         """
@@ -136,89 +304,338 @@ class PasswordInformation:
                 raise ValueError("Category already exists")
 
         self.details.categories.extend([category.encode() for category in categories])
-        self.metadata.modify()
+        self.details.dirty_fields.add("categories")
+        self.modify()
 
     def modify(self) -> None:
         """
         Updates the metadata last modified timestamp.
         """
         self.metadata.modify()
+        self.dirty_fields.add("metadata")
 
-    def encrypt_data(self, *, user_password: Optional[str] = None) -> None:
+    def encrypt_data(self, *, user_password: Optional[SecretBuffer] = None) -> None:
         """
         Encrypts the data using the provided key.
 
+        Depending on the configured entry format, either every field is
+        encrypted on its own, or the entry is sealed as two records: the
+        description and username, and the remainder including metadata and
+        passwords. If the entry is encrypted with the same data key and format
+        it was loaded with, only dirty fields are encrypted again and the
+        loaded ciphertexts are kept.
+
         Args:
-            key (Optional[str]): The encryption key. If not provided, the user's
-            clear password is used.
+            user_password (Optional[SecretBuffer]): The password to derive the key from.
+            If not provided, the user's data key is used, falling back to the
+            user's clear password.
 
         Raises:
-            EncryptionException: If metadata is already encrypted.
+            EncryptionException: If the data is already encrypted.
         """
-        if user_password is None:
-            user_password = self.user.get_clear_password()
-
-        if isinstance(self.metadata, EncryptedMetadata):
+        if self.data_is_encrypted:
             raise EncryptionException("Metadata is already encrypted")
 
-        key, self._salt = scrypt_derive(user_password.encode())
-
-        self.metadata = self.metadata.encrypt(key)
-        self.details.encrypt(key)
+        if (self.dirty_fields | self.details.dirty_fields) & set(HEAD_FIELDS):
+            self._update_blind_index()
 
+        previous_salt = self._salt
+        key, self._salt = self._encryption_key(user_password=user_password)
+        fmt = entry_format()
+        reset = (
+            fmt != self._stored_format
+            or self._salt != DATA_KEY_SALT
+            or previous_salt != DATA_KEY_SALT
+        )
+        if reset:
+            self.dirty_fields.update(ENTRY_COLUMNS)
+            self.details.dirty_fields.update(DETAIL_FIELDS)
+            self._stored_metadata = None
+            self._stored_entry = None
+            self._stored_body = None
+        self.dirty_fields |= self.details.dirty_fields
+
+        if fmt == SEALED_ENTRY:
+            self._seal_data(key, reset)
+        else:
+            if "metadata" in self.dirty_fields or self._stored_metadata is None:
+                metadata = self.metadata
+                if isinstance(metadata, EncryptedMetadata):
+                    raise EncryptionException("Metadata is already encrypted")
+                self._metadata = metadata.encrypt(key)
+            else:
+                self._metadata = self._stored_metadata
+            self.details.encrypt(key)
+
+        self._pending = None
+        self._stored_format = fmt
         self.data_is_encrypted = True
 
-    def decrypt_data(self, *, user_password: Optional[str] = None) -> None:
+    def _update_blind_index(self) -> None:
+        """
+        Computes the blind index of the clear description and username. It
+        is only computed with a data key, entries of users without one are
+        indexed once their vault is unlocked.
+        """
+        if self.user.has_data_key():
+            self.blind_index = self.user.blind_index(
+                self.details.description, self.details.username
+            )
+            self.dirty_fields.add("blind_index")
+
+    def _seal_data(self, key: bytes, reset: bool) -> None:
         """
-        Decrypts the data using the provided key.
+        Seals the head and the body of the entry, unless they are unchanged
+        since the entry was loaded. The passwords are stored in the history
+        and encrypted on their own.
+
+        Args:
+            key (bytes): The encryption key.
+            reset (bool): Whether all columns are written, e.g. after a format change.
+        """
+        cipher = cipher_for(key)
+        if self._stored_entry is None or self.dirty_fields & set(HEAD_FIELDS):
+            self.sealed_entry = cipher.seal(
+                entry_head(self.details.description, self.details.username)
+            )
+            self.dirty_fields.add("entry")
+        else:
+            self.sealed_entry = self._stored_entry
+
+        if self._stored_body is None or self.dirty_fields & {*BODY_FIELDS, "history"}:
+            self.sealed_body = cipher.seal(
+                entry_body((self.details.categories, self.details.note), self.metadata)
+            )
+            if self._passwords_in_body:
+                # Passwords of entries sealed by older versions move from the
+                # body to the history
+                self._passwords_in_body = False
+                self.dirty_fields.add("passwords")
+            self.dirty_fields.add("body")
+        else:
+            self.sealed_body = self._stored_body
+
+        self._pending = None
+        self.details = PasswordDetails(b"", None, [], None)
+        if not reset:
+            self.dirty_fields.difference_update(ENTRY_FIELDS)
+
+    def decrypt_data(self, *, user_password: Optional[SecretBuffer] = None) -> None:
+        """
+        Decrypts all data using the provided key.
 
         Args:
-            user_password (Optional[str]): The decryption key.
-            If not provided, the user's clear password is used.
+            user_password (Optional[SecretBuffer]): The decryption key.
+            If not provided, the key is resolved by the user.
 
         Raises:
             EncryptionException: If metadata is not encrypted or if salt is missing.
         """
-        if self._salt is None:
-            raise EncryptionException("No Salt found")
-        if user_password is None:
-            user_password = self.user.get_clear_password()
-        if isinstance(self.metadata, Metadata):
+        if self.sealed_entry is not None:
+            key = self.decryption_key(user_password=user_password)
+            self._apply_decrypted_data(
+                *open_entry(self.sealed_entry, self.sealed_body, key)
+            )
+            return
+
+        metadata = self._metadata
+        if not self.data_is_encrypted or not isinstance(metadata, EncryptedMetadata):
             raise EncryptionException("Metadata is not encrypted")
 
-        key, _ = scrypt_derive(user_password.encode(), self._salt)
+        key = self.decryption_key(user_password=user_password)
 
-        self.metadata = self.metadata.decrypt(key)
         self.details.decrypt(key)
+        self._apply_decrypted_data(self.details, metadata.decrypt(key))
+
+    def apply_summary(self, description: bytes, username: Optional[bytes]) -> None:
+        """
+        Replaces the encrypted description and username with the given ones,
+        decrypted elsewhere, e.g. by `decrypt_summary`.
+
+        The remaining fields are decrypted on first access, so listing
+        entries only pays for the fields that are shown.
+
+        Args:
+            description (bytes): The decrypted description.
+            username (Optional[bytes]): The decrypted username.
+        """
+        if self.sealed_entry is not None:
+            self._stored_format = SEALED_ENTRY
+            self._stored_entry, self._stored_body = self.sealed_entry, self.sealed_body
+            self._pending = self.sealed_body or self.sealed_entry
+            self.details = PasswordDetails(description, username, [], None)
+        elif isinstance(self._metadata, EncryptedMetadata):
+            self._stored_format = FIELD_ENTRY
+            self._stored_metadata = self._pending = self._metadata
+            self.details.apply_summary(description, username)
+        self.details.defer(self._load_pending)
+
+        self.sealed_entry = None
+        self.sealed_body = None
+        self.data_is_encrypted = False
+        self.mark_clean()
+
+    def _load_pending(self) -> None:
+        """
+        Decrypts the fields that were left encrypted by `apply_summary`.
+        """
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        self.details.defer(None)
+
+        key = self.decryption_key()
+        if isinstance(pending, EncryptedMetadata):
+            self.details.decrypt_remaining(key)
+            self._metadata = pending.decrypt(key)
+        else:
+            categories, note, self._metadata, passwords = open_entry_body(pending, key)
+            self.details.fill(categories, note)
+            if passwords and self.history_size == 0:
+                self._passwords = passwords
+                self._passwords_in_body = True
+
+    def _encryption_key(
+        self, *, user_password: Optional[SecretBuffer] = None
+    ) -> tuple[bytes, bytes]:
+        """
+        Resolves the key to encrypt the data with.
+
+        The salt of a key derived from the password is reused, as long as its
+        parameters are current, so the derived key is served by the key cache.
+
+        Args:
+            user_password (Optional[SecretBuffer]): The password to derive the key from.
+            If not provided, the user's data key is used, falling back to the
+            user's clear password.
 
+        Returns:
+            tuple[bytes, bytes]: The key and the salt identifying it.
+        """
+        if user_password is None and self.user.has_data_key():
+            return self.user.get_data_key(), DATA_KEY_SALT
+        if user_password is None:
+            user_password = self.user.get_clear_password()
+
+        salt = self._salt
+        if not salt or not KdfParameters.from_bytes(salt).is_current():
+            salt = None
+        return KEY_CACHE.derive(user_password, salt)
+
+    def decryption_key(self, *, user_password: Optional[SecretBuffer] = None) -> bytes:
+        """
+        Resolves the key the data was encrypted with.
+
+        Args:
+            user_password (Optional[SecretBuffer]): The password the key was derived from.
+            If not provided, the key is resolved by the user.
+
+        Returns:
+            bytes: The key to decrypt the data with.
+
+        Raises:
+            EncryptionException: If salt is missing.
+        """
+        if self._salt is None:
+            raise EncryptionException("No Salt found")
+        if user_password is None or self._salt == DATA_KEY_SALT:
+            return self.user.resolve_key(self._salt)
+        key, _ = KEY_CACHE.derive(user_password, self._salt)
+        return key
+
+    def _apply_decrypted_data(
+        self,
+        details: PasswordDetails,
+        metadata: Metadata,
+        passwords: Optional[list[Password]] = None,
+    ) -> None:
+        """
+        Replaces the encrypted data with decrypted data.
+
+        Args:
+            details (PasswordDetails): The decrypted details.
+            metadata (Metadata): The decrypted metadata.
+            passwords (Optional[list[Password]]): The decrypted passwords,
+            if they were part of an entry sealed by older versions.
+        """
+        if self.sealed_entry is not None:
+            self._stored_format = SEALED_ENTRY
+            self._stored_entry, self._stored_body = self.sealed_entry, self.sealed_body
+        elif isinstance(self._metadata, EncryptedMetadata):
+            self._stored_format, self._stored_metadata = FIELD_ENTRY, self._metadata
+
+        self._pending = None
+        self.details = details
+        self._metadata = metadata
+        if passwords and self.history_size == 0:
+            self._passwords = passwords
+            self._passwords_in_body = True
+        self.sealed_entry = None
+        self.sealed_body = None
         self.data_is_encrypted = False
+        self.mark_clean()
 
-    def encrypt_passwords(self, *, user_password: Optional[str] = None) -> None:
+    def encrypt_passwords(
+        self, *, user_password: Optional[SecretBuffer] = None
+    ) -> None:
         """
         Encrypts the passwords using the provided key.
 
         Args:
-            user_password (Optional[str]): The encryption key.
-            If not provided, the user's clear password is used.
+            user_password (Optional[SecretBuffer]): The encryption key.
+            If not provided, the user's data key is used, falling back
+            to the user's clear password.
         """
+        if any(not password.is_encrypted for password in self.passwords):
+            self.dirty_fields.add("passwords")
+
+        if user_password is None and self.user.has_data_key():
+            for password in self.passwords:
+                password.encrypt_with_key(self.user.get_data_key(), DATA_KEY_SALT)
+            return
+
         if user_password is None:
             user_password = self.user.get_clear_password()
 
         for password in self.passwords:
             password.encrypt(user_password)
 
-    def decrypt_passwords(self, *, user_password: Optional[str] = None) -> None:
+    def decrypt_passwords(
+        self, *, user_password: Optional[SecretBuffer] = None
+    ) -> None:
         """
         Decrypts the passwords using the provided key.
 
         Args:
-            user_password (Optional[str]): The decryption key.
-            If not provided, the user's clear password is used.
+            user_password (Optional[SecretBuffer]): The decryption key.
+            If not provided, the key is resolved by the user.
         """
-        if user_password is None:
-            user_password = self.user.get_clear_password()
-
         for password in self.passwords:
+            self.decrypt_password(password, user_password=user_password)
+
+    def decrypt_password(
+        self, password: Password, *, user_password: Optional[SecretBuffer] = None
+    ) -> None:
+        """
+        Decrypts a single password of this password information, e.g. one of
+        its history.
+
+        Args:
+            password (Password): The password to decrypt.
+            user_password (Optional[SecretBuffer]): The decryption key.
+            If not provided, the key is resolved by the user.
+
+        Raises:
+            EncryptionException: If the password is encrypted but has no salt.
+        """
+        if not password.is_encrypted:
+            return
+        if password.salt is None:
+            raise EncryptionException("No Salt found")
+        if user_password is None or password.salt == DATA_KEY_SALT:
+            password.decrypt_with_key(self.user.resolve_key(password.salt))
+        else:
             password.decrypt(user_password)
 
     def get_salt(self) -> bytes:
@@ -235,23 +652,21 @@ class PasswordInformation:
             raise ValueError("Salt not found")
         return self._salt
 
-    async def check_pwned_status(self, *, user_password: Optional[str] = None) -> int:
+    async def check_pwned_status(
+        self, *, user_password: Optional[SecretBuffer] = None
+    ) -> int:
         """
         Checks if the latest password has been compromised in a known data breach.
 
         Args:
-            user_password (Optional[str]): The decryption key.
-            If not provided, the user's clear password is used.
+            user_password (Optional[SecretBuffer]): The decryption key.
+            If not provided, the key is resolved by the user.
 
         Returns:
             int: The number of times the password has been found in a breach.
         """
-        if user_password is None:
-            user_password = self.user.get_clear_password()
-
         latest_password = self.passwords[-1]
-        if latest_password.is_encrypted:
-            latest_password.decrypt(user_password)
+        self.decrypt_password(latest_password, user_password=user_password)
         return await check_password(latest_password.password_bytes)
 
     def to_dict(self) -> PasswordInformationDict:
@@ -365,6 +780,37 @@ class PasswordInformation:
         password_information.details.categories = details[2]
         password_information.details.note = details[3]
         password_information.data_is_encrypted = True
+        password_information.mark_clean()
+        return password_information
+
+    @classmethod
+    def from_sealed_db(
+        cls,
+        salt: bytes,
+        sealed_entry: tuple[bytes, Optional[bytes]],
+        user: User,
+    ) -> PasswordInformation:
+        """
+        Creates a PasswordInformation instance from a sealed entry stored in the database.
+
+        Args:
+            salt (bytes): The salt used for encryption.
+            sealed_entry (tuple[bytes, Optional[bytes]]): The sealed head and body
+            of the entry. Entries sealed by older versions have no body.
+            user (User): The user associated with this password information.
+
+        Returns:
+            PasswordInformation: An encrypted instance of PasswordInformation,
+            holding only the sealed entry.
+        """
+        password_information = cls(user, Password(""), "")
+        password_information._salt = salt
+        password_information.passwords = []
+        password_information.sealed_entry, password_information.sealed_body = (
+            sealed_entry
+        )
+        password_information.data_is_encrypted = True
+        password_information.mark_clean()
         return password_information
 
     @staticmethod
@@ -397,72 +843,24 @@ class PasswordInformation:
         return filter_passwords
 
 
-class PasswordDetails:
-    """
-    A class to store details related to a password.
-
-    Attributes:
-        description (bytes): A description of the password details.
-        username (Optional[bytes]): The username associated with the password.
-        categories (list[bytes]): A list of categories for the password.
-        note (Optional[bytes]): An optional note associated with the password.
+def open_entry(
+    sealed_entry: bytes, sealed_body: Optional[bytes], key: bytes
+) -> tuple[PasswordDetails, Metadata, list[Password]]:
     """
+    Opens a whole sealed entry.
 
-    def __init__(
-        self,
-        description: bytes,
-        username: Optional[bytes],
-        categories: list[bytes],
-        note: Optional[bytes],
-    ):
-        """
-        Initializes PasswordDetails with given details.
+    Args:
+        sealed_entry (bytes): The sealed head, or the whole entry for entries
+        sealed by older versions.
+        sealed_body (Optional[bytes]): The sealed body, if any.
+        key (bytes): The decryption key.
 
-        Args:
-            description (bytes): A description of the password details.
-            username (Optional[bytes]): The username associated with the password.
-            categories (list[bytes]): A list of categories for the password.
-            note (Optional[bytes]): An optional note associated with the password.
-        """
-        self.description = description
-        self.username = username
-        self.categories = categories
-        self.note = note
-
-    def encrypt(self, key: bytes) -> None:
-        """
-        Encrypts the password details using the provided key.
-
-        Args:
-            key (bytes): The encryption key.
-        """
-        _ = key
-        self.description = encrypt_fernet(self.description, key)
-        if self.username is not None:
-            self.username = encrypt_fernet(self.username, key)
-
-        if self.note is not None:
-            self.note = encrypt_fernet(self.note, key)
-
-        self.categories = [
-            encrypt_fernet(category, key) for category in self.categories
-        ]
-
-    def decrypt(self, key: bytes) -> None:
-        """
-        Decrypts the password details using the provided key.
-
-        Args:
-            key (bytes): The decryption key.
-        """
-        _ = key
-        self.description = decrypt_fernet(self.description, key)
-        if self.username is not None:
-            self.username = decrypt_fernet(self.username, key)
-
-        if self.note is not None:
-            self.note = decrypt_fernet(self.note, key)
-
-        self.categories = [
-            decrypt_fernet(category, key) for category in self.categories
-        ]
+    Returns:
+        tuple[PasswordDetails, Metadata, list[Password]]: The decrypted details,
+        metadata and passwords.
+    """
+    description, username = open_entry_head(sealed_entry, key)
+    categories, note, metadata, passwords = open_entry_body(
+        sealed_body or sealed_entry, key
+    )
+    return PasswordDetails(description, username, categories, note), metadata, passwords
@@ -0,0 +1,191 @@
+"""
+Serializes password entries stored in the sealed entry format.
+
+A sealed entry consists of two records: the head, holding the description
+and username shown in lists, and the body, holding the remaining details and
+the metadata. Both are encoded with `src.model.codec`. The passwords are
+stored in the password history and encrypted on their own.
+
+Bodies of layout 3 and older also hold the passwords. Entries sealed by
+older versions are pickled. Entries of layout 1 hold the whole entry in a
+single record, which serves as both head and body.
+"""
+
+from typing import Any
+from typing import Optional
+
+from src.crypto.aead import cipher_for
+from src.exceptions.encryption_exception import EncryptionException
+from src.model.codec import Decoder
+from src.model.codec import Encoder
+from src.model.codec import is_encoded
+from src.model.codec import load_legacy
+from src.model.metadata import EncryptedMetadata
+from src.model.metadata import Metadata
+from src.model.metadata import decode_timestamp
+from src.model.metadata import encode_timestamp
+from src.model.password import Password
+
+ENTRY_LAYOUT = 4
+_PASSWORDS_LAYOUT = 3
+
+
+def entry_head(description: bytes, username: Optional[bytes]) -> bytes:
+    """
+    Serializes the head of a sealed entry, holding the fields shown in lists.
+
+    Args:
+        description (bytes): The decrypted description.
+        username (Optional[bytes]): The decrypted username.
+
+    Returns:
+        bytes: The serialized head.
+    """
+    encoder = Encoder()
+    encoder.write_byte(ENTRY_LAYOUT)
+    encoder.write_bytes(description)
+    encoder.write_optional(username)
+    return encoder.to_bytes()
+
+
+def entry_body(
+    details: tuple[list[bytes], Optional[bytes]],
+    metadata: Metadata | EncryptedMetadata,
+) -> bytes:
+    """
+    Serializes the body of a sealed entry.
+
+    Args:
+        details (tuple[list[bytes], Optional[bytes]]): The decrypted categories and note.
+        metadata (Metadata | EncryptedMetadata): The decrypted metadata.
+
+    Returns:
+        bytes: The serialized body.
+
+    Raises:
+        EncryptionException: If the metadata is still encrypted.
+    """
+    if not isinstance(metadata, Metadata):
+        raise EncryptionException("Metadata is encrypted")
+
+    categories, note = details
+    encoder = Encoder()
+    encoder.write_byte(ENTRY_LAYOUT)
+    encoder.write_list(categories)
+    encoder.write_optional(note)
+    encoder.write_bytes(encode_timestamp(metadata.created_at))
+    encoder.write_bytes(encode_timestamp(metadata.last_modified))
+    return encoder.to_bytes()
+
+
+def _open_record(record: bytes, key: bytes) -> tuple[int, Decoder] | tuple[Any, ...]:
+    """
+    Decrypts a record of a sealed entry.
+
+    Args:
+        record (bytes): The sealed record.
+        key (bytes): The decryption key.
+
+    Returns:
+        tuple[int, Decoder] | tuple[Any, ...]: The layout and a decoder positioned
+        after it, or the unpickled record of older versions, starting with its layout.
+
+    Raises:
+        EncryptionException: If the record can't be decrypted or has an unknown layout.
+    """
+    data = cipher_for(key).decrypt(record)
+    if is_encoded(data):
+        decoder = Decoder(data)
+        layout = decoder.read_byte()
+        if layout not in (_PASSWORDS_LAYOUT, ENTRY_LAYOUT):
+            raise EncryptionException("Unknown entry layout")
+        return layout, decoder
+
+    entry: tuple[Any, ...] = load_legacy(data)
+    if entry[0] not in (1, 2):
+        raise EncryptionException("Unknown entry layout")
+    return entry
+
+
+def open_entry_head(sealed_entry: bytes, key: bytes) -> tuple[bytes, Optional[bytes]]:
+    """
+    Opens the head of a sealed entry.
+
+    Args:
+        sealed_entry (bytes): The sealed head, or the whole entry for entries
+        sealed by older versions.
+        key (bytes): The decryption key.
+
+    Returns:
+        tuple[bytes, Optional[bytes]]: The decrypted description and username.
+    """
+    entry = _open_record(sealed_entry, key)
+    if isinstance(entry[1], Decoder):
+        decoder = entry[1]
+        return decoder.read_bytes(), decoder.read_optional()
+    return entry[1], entry[2]
+
+
+def open_entry_body(
+    sealed_body: bytes, key: bytes
+) -> tuple[list[bytes], Optional[bytes], Metadata, list[Password]]:
+    """
+    Opens the body of a sealed entry.
+
+    Args:
+        sealed_body (bytes): The sealed body, or the whole entry for entries
+        sealed by older versions.
+        key (bytes): The decryption key.
+
+    Returns:
+        tuple[list[bytes], Optional[bytes], Metadata, list[Password]]: The decrypted
+        categories, note, metadata and passwords. The passwords are empty for
+        bodies of the current layout, which store them in the password history.
+    """
+    entry = _open_record(sealed_body, key)
+    metadata = Metadata()
+    if isinstance(entry[1], Decoder):
+        layout, decoder = entry
+        categories = decoder.read_list()
+        note = decoder.read_optional()
+        metadata.created_at = decode_timestamp(decoder.read_bytes())
+        metadata.last_modified = decode_timestamp(decoder.read_bytes())
+        passwords = decoder.read_list() if layout == _PASSWORDS_LAYOUT else []
+    else:
+        categories, note, metadata.created_at, metadata.last_modified, passwords = (
+            entry[3:] if entry[0] == 1 else entry[1:]
+        )
+
+    return (
+        categories,
+        note,
+        metadata,
+        [Password(password.decode()) for password in passwords],
+    )
+
+
+def decrypt_summary(
+    key: bytes,
+    sealed_entry: Optional[bytes],
+    description: bytes,
+    username: Optional[bytes],
+) -> tuple[bytes, Optional[bytes]]:
+    """
+    Decrypts the description and username of a password information,
+    either from its sealed entry or from its encrypted fields.
+
+    Args:
+        key (bytes): The decryption key.
+        sealed_entry (Optional[bytes]): The sealed entry, if any.
+        description (bytes): The encrypted description.
+        username (Optional[bytes]): The encrypted username, if any.
+
+    Returns:
+        tuple[bytes, Optional[bytes]]: The decrypted description and username.
+    """
+    if sealed_entry is not None:
+        return open_entry_head(sealed_entry, key)
+    if username is None:
+        return cipher_for(key).decrypt(description), None
+    description, username = cipher_for(key).decrypt_many([description, username])
+    return description, username
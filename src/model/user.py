@@ -9,7 +9,12 @@ from __future__ import annotations
 import os
 from typing import Optional
 
+from src.crypto.blind_index import blind_index
+from src.crypto.blind_index import blind_index_key
+from src.crypto.envelope import DATA_KEY_SALT
 from src.crypto.hashing import hash_sha256
+from src.crypto.key_derivation import KEY_CACHE
+from src.crypto.secret import SecretBuffer
 from src.model.password import Password
 
 
@@ -18,17 +23,21 @@ class User:
     A class representing a user with a hashed username and a password.
 
     Attributes:
+        id (Optional[int]): The id of the user in the database, which the password
+        entries of the user reference. None until the user is stored or retrieved.
         username (bytes): The hashed username of the user.
         password (Password): The Password instance associated with the user.
         iv (bytes): Initialization vector used for encryption.
-        _clear_password (Optional[str]): The plaintext password of the user, if set.
+        _clear_password (Optional[SecretBuffer]): The plaintext password of the user, if set.
         _clear_username (Optional[str]): The plaintext username of the user, if set.
+        _data_key (Optional[bytes]): The unwrapped data encryption key of the user, if set.
     """
 
     def __init__(
         self,
         hashed_username: bytes,
         password: Password,
+        user_id: Optional[int] = None,
     ):
         """
         Initializes a new User instance.
@@ -36,33 +45,40 @@ class User:
         Args:
             hashed_username (bytes): The hashed username of the user.
             password (Password): The Password instance for the user.
+            user_id (Optional[int]): The id of the user in the database, if known.
 
         Raises:
             ValueError: If the provided password is not a master password.
         """
+        self.id = user_id
         self.username = hashed_username
         self.password = password
         self.iv = os.urandom(16)
-        self._clear_password: Optional[str] = None
+        self._clear_password: Optional[SecretBuffer] = None
         self._clear_username: Optional[str] = None
+        self._data_key: Optional[bytes] = None
         if not password.is_master:
             password.make_master()
 
-    def set_clear_password(self, password: str) -> None:
+    def set_clear_password(self, password: str | SecretBuffer) -> None:
         """
-        Sets the plaintext password for the user.
+        Sets the plaintext password for the user. A previously set password is wiped.
 
         Args:
-            password (str): The plaintext password to set.
+            password (str | SecretBuffer): The plaintext password to set.
         """
+        if not isinstance(password, SecretBuffer):
+            password = SecretBuffer(password)
+        if self._clear_password is not None and self._clear_password is not password:
+            self._clear_password.wipe()
         self._clear_password = password
 
-    def get_clear_password(self) -> str:
+    def get_clear_password(self) -> SecretBuffer:
         """
         Retrieves the plaintext password for the user.
 
         Returns:
-            str: The plaintext password.
+            SecretBuffer: The plaintext password.
 
         Raises:
             ValueError: If the plaintext password has not been set.
@@ -72,6 +88,14 @@ class User:
 
         return self._clear_password
 
+    def wipe_clear_password(self) -> None:
+        """
+        Wipes the plaintext password from memory, e.g. once the user logs out.
+        """
+        if self._clear_password is not None:
+            self._clear_password.wipe()
+            self._clear_password = None
+
     def set_clear_username(self, username: str) -> None:
         """
         Sets the plaintext username for the user.
@@ -114,6 +138,75 @@ class User:
         """
         return self._clear_username is not None
 
+    def set_data_key(self, data_key: bytes) -> None:
+        """
+        Sets the unwrapped data encryption key for the user.
+
+        Args:
+            data_key (bytes): The data encryption key to set.
+        """
+        self._data_key = data_key
+
+    def get_data_key(self) -> bytes:
+        """
+        Retrieves the unwrapped data encryption key for the user.
+
+        Returns:
+            bytes: The data encryption key.
+
+        Raises:
+            ValueError: If the data encryption key has not been set.
+        """
+        if self._data_key is None:
+            raise ValueError("Data key not set")
+
+        return self._data_key
+
+    def has_data_key(self) -> bool:
+        """
+        Checks if the data encryption key has been set.
+
+        Returns:
+            bool: True if the data encryption key is set, False otherwise.
+        """
+        return self._data_key is not None
+
+    def resolve_key(self, salt: bytes) -> bytes:
+        """
+        Resolves the key a record was encrypted with.
+
+        Records encrypted with the data encryption key are marked with an
+        empty salt, all other records use a key derived from the plaintext
+        password and the given salt.
+
+        Args:
+            salt (bytes): The salt stored with the record.
+
+        Returns:
+            bytes: The key to decrypt the record with.
+        """
+        if salt == DATA_KEY_SALT:
+            return self.get_data_key()
+        key, _ = KEY_CACHE.derive(self.get_clear_password(), salt)
+        return key
+
+    def blind_index(self, description: bytes, username: Optional[bytes]) -> bytes:
+        """
+        Computes the blind index of a password entry of this user, see
+        `src.crypto.blind_index`.
+
+        Args:
+            description (bytes): The description of the entry.
+            username (Optional[bytes]): The username of the entry, if any.
+
+        Returns:
+            bytes: The blind index.
+
+        Raises:
+            ValueError: If the data encryption key has not been set.
+        """
+        return blind_index(blind_index_key(self.get_data_key()), description, username)
+
     @staticmethod
     def new(username: str, password: str) -> User:
         """
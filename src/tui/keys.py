@@ -20,6 +20,7 @@ class Keys(enum.IntEnum):
         STAR: Asterisk character (42).
         QUESTION_MARK: Question mark character (63).
         A: Uppercase 'A' (65).
+        B: Uppercase 'B' (66).
         C: Uppercase 'C' (67).
         D: Uppercase 'D' (68).
         E: Uppercase 'E' (69).
@@ -31,6 +32,7 @@ class Keys(enum.IntEnum):
         S: Uppercase 'S' (83).
         U: Uppercase 'U' (85).
         A_LOWER: Lowercase 'a' (97).
+        B_LOWER: Lowercase 'b' (98).
         C_LOWER: Lowercase 'c' (99).
         D_LOWER: Lowercase 'd' (100).
         E_LOWER: Lowercase 'e' (101).
@@ -56,6 +58,7 @@ class Keys(enum.IntEnum):
     STAR = 42
     QUESTION_MARK = 63
     A = 65
+    B = 66
     C = 67
     D = 68
     E = 69
@@ -67,6 +70,7 @@ class Keys(enum.IntEnum):
     S = 83
     U = 85
     A_LOWER = 97
+    B_LOWER = 98
     C_LOWER = 99
     D_LOWER = 100
     E_LOWER = 101
@@ -8,7 +8,8 @@ import asyncio
 import sqlite3
 from typing import TYPE_CHECKING
 
-from src.controller.connection import connect_to_db
+from src.controller.backup_scheduler import BACKUP_SCHEDULER
+from src.controller.connection_pool import CONNECTION_POOL
 from .util import init_tui
 from .util import validate_size
 from .views.login import show_login
@@ -29,15 +30,20 @@ else:
 
 def main(stdscr: CursesWindow) -> None:
     """
-    Entry point for the application. Initializes the TUI (Text User Interface) and establishes
-    a database connection. Starts the asynchronous event loop to run the TUI interface.
+    Entry point for the application. Initializes the TUI (Text User Interface) and opens
+    the connection pool, whose writer is used by the interface, and the backup scheduler.
+    Starts the asynchronous event loop to run the TUI interface.
 
     Args:
         stdscr (CursesWindow): The standard curses window object used for drawing
                                the user interface.
     """
-    with connect_to_db() as connection:
-        asyncio.run(run_tui(stdscr, connection, connection.cursor()))
+    with CONNECTION_POOL.open() as pool:
+        BACKUP_SCHEDULER.start()
+        try:
+            asyncio.run(run_tui(stdscr, pool.writer, pool.writer.cursor()))
+        finally:
+            BACKUP_SCHEDULER.stop()
 
 
 async def run_tui(
@@ -9,6 +9,7 @@ from curses.textpad import Textbox
 
 from src.controller.user import retrieve_user_by_name
 from src.controller.user import validate_login
+from src.controller.vault_prefetch import VAULT_PREFETCH
 from src.model.user import User
 from ..input_validator import InputValidator
 from ..popup import create_centered_popup
@@ -21,6 +22,9 @@ def show_login(window: Window, cursor: sqlite3.Cursor) -> User:
     Displays the login screen, handles user input for username and password,
     and validates the login credentials.
 
+    Once the credentials are valid, the vault is unlocked and loaded in the
+    background, see `VaultPrefetch`.
+
     Args:
         window (Window): The Window object used for displaying the login screen.
         cursor (sqlite3.Cursor): The database cursor for executing queries.
@@ -65,6 +69,7 @@ def show_login(window: Window, cursor: sqlite3.Cursor) -> User:
             user = retrieve_user_by_name(cursor, username)
             user.set_clear_password(password_str)
             user.set_clear_username(username)
+            VAULT_PREFETCH.start(user)
             return user
 
         show_failed_login(input_window)
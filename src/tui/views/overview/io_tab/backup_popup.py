@@ -0,0 +1,91 @@
+"""
+Module for displaying a popup that starts a database backup and shows its progress.
+
+The backup runs on the background thread of the backup scheduler, so the popup
+can be dismissed at any time without interrupting it.
+"""
+
+import curses
+
+from src.controller.backup_scheduler import BACKUP_SCHEDULER
+from src.tui.keys import Keys
+from src.tui.panel import Panel
+from src.tui.util import shorten_str
+from src.tui.views.overview.components.prompt import SimplePrompt
+
+REFRESH_INTERVAL = 100
+TEXT_WIDTH = 46
+
+
+class BackupPopup(SimplePrompt):
+    """
+    Class to display a popup that requests a backup and follows its progress.
+
+    This class inherits from `SimplePrompt`. The popup polls the backup scheduler
+    until the requested backup is done and then shows where it was saved, or why
+    it failed.
+    """
+
+    def __init__(self, parent: Panel):
+        """
+        Initializes the BackupPopup class.
+
+        Args:
+            parent (Panel): The parent panel where the popup will be displayed.
+        """
+        super().__init__(parent, (7, TEXT_WIDTH + 4))
+
+    def run(self) -> None:
+        """
+        Requests a backup and displays its progress until the user dismisses
+        the popup.
+        """
+        started = BACKUP_SCHEDULER.completed
+        BACKUP_SCHEDULER.request()
+        self.popup().timeout(REFRESH_INTERVAL)
+        try:
+            while True:
+                self._show_state(BACKUP_SCHEDULER.completed > started)
+                if self.popup().getch() == Keys.ESCAPE:
+                    self.break_out()
+                    break
+        finally:
+            self.popup().timeout(-1)
+
+    def _show_state(self, done: bool) -> None:
+        """
+        Displays the progress or the result of the backup.
+
+        Args:
+            done (bool): Whether the requested backup is done.
+        """
+        self.popup().clear()
+        self.popup().box()
+        self.popup().addstr(0, 0, "Backup", curses.A_BOLD | curses.color_pair(3))
+        self.popup.write_bottom_center_text("- ESC Dismiss -", (-1, 0))
+
+        if not done:
+            progress = BACKUP_SCHEDULER.progress or 0.0
+            self.popup().addstr(2, 2, f"Backing up the database... {progress:.0%}")
+        elif BACKUP_SCHEDULER.last_error is not None:
+            self.popup().addstr(2, 2, "Backup failed:", curses.color_pair(2))
+            self.popup().addstr(3, 2, _fit(str(BACKUP_SCHEDULER.last_error)))
+        else:
+            self.popup().addstr(2, 2, "Backup saved to:", curses.A_BOLD)
+            self.popup().addstr(3, 2, _fit(str(BACKUP_SCHEDULER.last_backup)))
+        self.popup().refresh()
+
+
+def _fit(text: str) -> str:
+    """
+    Shortens a text to the width of the popup, if it is too long.
+
+    Args:
+        text (str): The text to display.
+
+    Returns:
+        str: The text fitting into the popup.
+    """
+    if len(text) > TEXT_WIDTH:
+        return shorten_str(text, TEXT_WIDTH)
+    return text
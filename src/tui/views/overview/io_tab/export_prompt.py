@@ -5,9 +5,12 @@ class which extends IoPrompt to manage the export process and user interactions.
 
 import curses
 import sqlite3
+from typing import Iterator
 
-from src.controller.password import retrieve_password_information
+from src.controller.password import load_password_history
+from src.controller.password import stream_password_information
 from src.import_export.export_data import export_to_json
+from src.model.password_information import PasswordInformation
 from src.model.user import User
 from src.tui.panel import Panel
 from src.tui.views.overview.io_tab.io_prompt import IoPrompt
@@ -48,7 +51,7 @@ class ExportPrompt(IoPrompt):
             return
 
         self._reset_prompt(self.title)
-        file = export_to_json(retrieve_password_information(self.cursor, self.user))
+        file = export_to_json(self._with_history())
 
         self.prompt_window.write_centered_text(
             f'Succesfully exported to "{file}"', (-1, 0), curses.A_BOLD
@@ -59,3 +62,15 @@ class ExportPrompt(IoPrompt):
         # File?
 
         self._enter_dismiss_loop()
+
+    def _with_history(self) -> Iterator[PasswordInformation]:
+        """
+        Streams the password information of the user with their complete
+        password history, which is part of the export.
+
+        Yields:
+            PasswordInformation: The entries of the user.
+        """
+        for password in stream_password_information(self.cursor, self.user):
+            load_password_history(self.cursor, password)
+            yield password
@@ -7,7 +7,7 @@ import curses
 import os
 import sqlite3
 
-from src.controller.password import insert_password_information
+from src.controller.password import insert_many_password_information
 from src.controller.password import validate_unique_password
 from src.exceptions.exit_from_textbox_exception import ExitFromTextBoxException
 from src.exceptions.import_exception import ImportException
@@ -91,24 +91,33 @@ class ImportPrompt(IoPrompt):
             self.prompt_window.write_bottom_center_text("- ↩ Continue -", (-1, 0))
             self.prompt_window().refresh()
 
+        # Keyed on the blind index, which treats equivalent spellings as equal
+        seen: set[bytes] = set()
         for password in passwords:
+            index = self.user.blind_index(
+                password.details.description, password.details.username
+            )
+            description = password.details.description.decode()
             username = (
                 password.details.username.decode()
                 if password.details.username
                 else None
             )
-            if not validate_unique_password(
-                self.cursor, password.details.description.decode(), username, self.user
+            if index in seen or not validate_unique_password(
+                self.cursor, description, username, self.user
             ):
-                self.prompt_window.write_centered_text(
-                    "File contains passwords that are/would be duplicate",
-                    (-1, 0),
-                    curses.A_BOLD | curses.color_pair(2),
-                )
+                self._write_duplicate_error()
                 passwords = []
                 break
+            seen.add(index)
 
-            insert_password_information(self.cursor, password)
+        try:
+            insert_many_password_information(self.cursor, passwords)
+        except sqlite3.IntegrityError:
+            # Discards the entries of the batch inserted before the duplicate
+            self.cursor.connection.rollback()
+            self._write_duplicate_error()
+            passwords = []
 
         if len(passwords) > 0:
             self._reset_prompt(self.title)
@@ -134,6 +143,16 @@ class ImportPrompt(IoPrompt):
         self._enter_dismiss_loop()
         return passwords
 
+    def _write_duplicate_error(self) -> None:
+        """
+        Writes the error shown when the imported passwords contain duplicates.
+        """
+        self.prompt_window.write_centered_text(
+            "File contains passwords that are/would be duplicate",
+            (-1, 0),
+            curses.A_BOLD | curses.color_pair(2),
+        )
+
     def _enter_target_file(self) -> str:
         """
         Prompts the user to enter the file path for the passwords to import.
@@ -6,10 +6,13 @@ Includes the IoTab class for managing import/export operations and menu controls
 import sqlite3
 import sys
 
+from src.controller.connection_pool import CONNECTION_POOL
+from src.controller.unit_of_work import UnitOfWork
 from src.model.user import User
 from src.tui.keys import Keys
 from src.tui.views.overview.components.controls_popup import ControlsPrompt
 from src.tui.views.overview.components.tab_interface import TabInterface
+from src.tui.views.overview.io_tab.backup_popup import BackupPopup
 from src.tui.views.overview.io_tab.export_prompt import ExportPrompt
 from src.tui.views.overview.io_tab.import_export_menu import ImportExportMenu
 from src.tui.views.overview.io_tab.import_prompt import ImportPrompt
@@ -17,6 +20,7 @@ from src.tui.views.overview.io_tab.import_prompt import ImportPrompt
 CONTROLS: dict["str", "str"] = {
     "↑↓": "Navigate Menu",
     "↩": "Select Option",
+    "b": "Backup Database",
 }
 
 
@@ -72,6 +76,9 @@ class IoTab(TabInterface):
                 self.menu.down_action()
             case Keys.ENTER:
                 self._handle_enter_input()
+            case Keys.B | Keys.B_LOWER:
+                BackupPopup(self.tab).run()
+                self.refresh()
             case Keys.QUESTION_MARK:
                 ControlsPrompt(self.tab, self.controls).run()
                 self.refresh()
@@ -82,14 +89,21 @@ class IoTab(TabInterface):
         Triggers import or export operations or raises an error for invalid choices.
         """
         if self.menu.get_choice() == 1:
-            imported_passwords = ImportPrompt(self.tab, self.user, self.cursor).run()
+            with UnitOfWork(self.connection) as work:
+                imported_passwords = ImportPrompt(
+                    self.tab, self.user, work.cursor
+                ).run()
             if len(imported_passwords) > 0:
-                self.connection.commit()
                 sys.exit(0)
-            else:
-                self.connection.rollback()
         elif self.menu.get_choice() == 2:
-            ExportPrompt(self.tab, self.user, self.cursor).run()
+            # The export reads every page and history in one read transaction,
+            # so it sees a single snapshot without holding the writer
+            with CONNECTION_POOL.reader() as reader:
+                reader.execute("BEGIN")
+                try:
+                    ExportPrompt(self.tab, self.user, reader.cursor()).run()
+                finally:
+                    reader.rollback()
         else:
             raise ValueError("Invalid Menu Option")
 
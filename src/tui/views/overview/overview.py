@@ -10,6 +10,10 @@ from typing import Optional
 
 import _curses
 
+from src.controller.maintenance import IDLE_MAINTENANCE
+from src.crypto.aead import cipher_for
+from src.crypto.decrypt_pool import DECRYPT_POOL
+from src.crypto.key_derivation import KEY_CACHE
 from src.model.user import User
 from src.tui.keys import Keys
 from src.tui.util import generate_control_str
@@ -52,9 +56,10 @@ async def show_overview(
     window_size = screen_size[0] - y_start - 1, screen_size[1] - 2
 
     try:
-        password_tab = PasswordTab(window_size, y_start, user, connection)
+        # The password tab is set up last, as it waits for the vault prefetch
         user_tab = UserTab(window_size, y_start, user, connection)
         io_tab = IoTab(window_size, y_start, user, connection)
+        password_tab = PasswordTab(window_size, y_start, user, connection)
     except _curses.error:
         return 0
 
@@ -80,10 +85,15 @@ async def show_overview(
         window().timeout(-1)
         match input_key:
             case -1:
-                pass
+                # Nothing was pressed for a second
+                IDLE_MAINTENANCE.step(connection)
             case Keys.TAB:
                 tabbar.next_tab()
             case Keys.Q | Keys.Q_LOWER:
+                user.wipe_clear_password()
+                KEY_CACHE.clear()
+                cipher_for.cache_clear()
+                DECRYPT_POOL.shutdown()
                 sys.exit(0)
             case _:
                 current_tab = tabbar.selected
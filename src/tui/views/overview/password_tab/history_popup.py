@@ -1,31 +1,43 @@
 """
 Module for displaying a popup that shows the history of recent passwords.
 
-This module provides functionality to display a popup window showing the last 10 passwords
-for a given password information object.
+This module provides functionality to display a popup window that pages through
+the password history of a given password information object, 10 passwords at a time.
 """
 
 import curses
+import sqlite3
 
+from src.controller.password import retrieve_password_history
 from src.model.password_information import PasswordInformation
+from src.tui.keys import Keys
 from src.tui.panel import Panel
+from src.tui.util import shorten_str
 from src.tui.views.overview.components.prompt import SimplePrompt
 
+PAGE_SIZE = 10
+PASSWORD_WIDTH = 40
+
 
 class HistoryPopup(SimplePrompt):
     """
-    Class to display a popup with the history of the last 10 passwords.
+    Class to display a popup with the history of passwords, one page at a time.
 
-    This class inherits from `SimplePrompt` and is used to create a popup that shows the most
-    recent 10 passwords from the given `PasswordInformation` object. It includes functionality
-    to display these passwords and handle user dismissal of the popup.
+    This class inherits from `SimplePrompt` and is used to create a popup that shows the
+    passwords of the given `PasswordInformation` object, newest first. Older pages are
+    only retrieved from the database when the user pages to them.
 
     Attributes:
         password (PasswordInformation):
         The password information object whose history is to be displayed.
+        cursor (sqlite3.Cursor): The database cursor used to retrieve the history.
+        page (int): The displayed page, 0 being the page of the current password.
+        page_count (int): The amount of pages in the history.
     """
 
-    def __init__(self, parent: Panel, password: PasswordInformation):
+    def __init__(
+        self, parent: Panel, password: PasswordInformation, cursor: sqlite3.Cursor
+    ):
         """
         Initializes the HistoryPopup class.
 
@@ -33,39 +45,59 @@ class HistoryPopup(SimplePrompt):
             parent (Panel): The parent panel where the popup will be displayed.
             password (PasswordInformation):
             The password information object containing the password history.
+            cursor (sqlite3.Cursor): The database cursor used to retrieve the history.
         """
         self.password = password
-        height = len(self.password.passwords[-10:]) + 7
-        self.password.decrypt_passwords()
-        width = (
-            max(
-                (
-                    len(password.password_bytes.decode())
-                    for password in self.password.passwords
-                )
-            )
-            + 10
-        )
-        super().__init__(parent, (height, width))
+        self.cursor = cursor
+        self.page = 0
+        history_size = password.history_start + len(password.passwords)
+        self.page_count = max(-(-history_size // PAGE_SIZE), 1)
+        height = min(history_size, PAGE_SIZE) + 7
+        super().__init__(parent, (height, PASSWORD_WIDTH + 10))
 
     def run(self) -> None:
         """
-        Displays the popup and shows the history of the last 10 passwords.
+        Displays the popup and shows the history one page at a time.
+
+        The up and down arrow keys page through the history until the user
+        dismisses the popup.
+        """
+        while True:
+            self._show_page()
+            key_input = self.popup().getch()
+            if key_input == Keys.ESCAPE:
+                self.break_out()
+                break
+            if key_input == Keys.DOWN and self.page + 1 < self.page_count:
+                self.page += 1
+            elif key_input == Keys.UP and self.page > 0:
+                self.page -= 1
 
-        This method sets up the popup window, displays the title, hint, and the list of the last
-        10 passwords. It then enters a loop to wait for user input to dismiss the popup.
+    def _show_page(self) -> None:
         """
+        Retrieves and displays the current page of the history.
+        """
+        passwords = retrieve_password_history(
+            self.cursor, self.password, self.page, PAGE_SIZE
+        )
+        self.popup().clear()
         self.popup().box()
         self.popup().addstr(
-            0, 0, "Last 10 Passwords", curses.A_BOLD | curses.color_pair(3)
+            0,
+            0,
+            f"Password History ({self.page + 1}/{self.page_count})",
+            curses.A_BOLD | curses.color_pair(3),
         )
-        self.popup.write_bottom_center_text("- ESC Dismiss -", (-1, 0))
+        self.popup.write_bottom_center_text("- ↑↓ Page - ESC Dismiss -", (-1, 0))
         self.popup.write_bottom_center_text(
             "Hint: 1 is the latest", (-2, 0), curses.A_ITALIC
         )
 
-        for i, password in enumerate(reversed(self.password.passwords[-10:])):
-            self.popup().addstr(i + 2, 2, f"{i + 1}")
-            self.popup().addstr(i + 2, 5, password.password_bytes.decode())
-
-        self.enter_dismiss_loop()
+        for i, password in enumerate(passwords):
+            number = self.page * PAGE_SIZE + i + 1
+            text = password.password_bytes.decode()
+            if len(text) > PASSWORD_WIDTH:
+                text = shorten_str(text, PASSWORD_WIDTH)
+            self.popup().addstr(i + 2, 2, f"{number}")
+            self.popup().addstr(i + 2, 6, text)
+        self.popup().refresh()
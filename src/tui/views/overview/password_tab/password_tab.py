@@ -8,9 +8,12 @@ from typing import Optional
 
 import requests
 
-from src.controller.password import insert_password_information
+from src.controller.password import current_change_seq
+from src.controller.password import load_password_history
+from src.controller.password import retrieve_password_changes
 from src.controller.password import retrieve_password_information
-from src.controller.password import update_password_information
+from src.controller.unit_of_work import UnitOfWork
+from src.controller.vault_prefetch import VAULT_PREFETCH
 from src.model.password import Password
 from src.model.password_information import PasswordInformation
 from src.model.user import User
@@ -50,7 +53,7 @@ CONTROLS: dict["str", "str"] = {
 }
 
 
-class PasswordTab(TabInterface):
+class PasswordTab(TabInterface):  # pylint: disable=too-many-instance-attributes
     """
     A class representing a tab in the user interface for managing passwords.
 
@@ -66,6 +69,8 @@ class PasswordTab(TabInterface):
         controls (dict[str, str]): Dictionary of controls and their descriptions.
         list_window (Window): The window where the list of passwords is displayed.
         password_list (PasswordList): The PasswordList object managing the list of passwords.
+        passwords (list[PasswordInformation]): All loaded passwords of the user, in id order.
+        change_seq (int): The change sequence the loaded passwords are up to date with.
     """
 
     def __init__(
@@ -100,9 +105,15 @@ class PasswordTab(TabInterface):
         )
         self.tab().box()
 
-        self.password_list = PasswordList(
-            self.list_window, retrieve_password_information(self.cursor, self.user)
-        )
+        prefetched = VAULT_PREFETCH.take(self.user)
+        if prefetched is None:
+            change_seq = current_change_seq(self.cursor)
+            prefetched = (
+                retrieve_password_information(self.cursor, self.user),
+                change_seq,
+            )
+        self.passwords, self.change_seq = prefetched
+        self.password_list = PasswordList(self.list_window, self.passwords)
         self._init_table_headings()
 
     def _init_table_headings(self) -> None:
@@ -142,7 +153,9 @@ class PasswordTab(TabInterface):
             case Keys.E | Keys.E_LOWER:
                 self._handle_edit_input()
             case Keys.H | Keys.H_LOWER:
-                HistoryPopup(self.tab, self.password_list.get_selected()).run()
+                HistoryPopup(
+                    self.tab, self.password_list.get_selected(), self.cursor
+                ).run()
                 self.refresh()
             case Keys.C_LOWER:
                 try:
@@ -186,12 +199,14 @@ class PasswordTab(TabInterface):
         password list and database if successful.
         """
         password_information = self.password_list.get_selected()
+        # The prompt rejects passwords that were used before
+        load_password_history(self.cursor, password_information)
         new_password = show_add_password_prompt(self.tab, password_information)
         if new_password is not None:
             password_information.add_password(Password(new_password))
-            update_password_information(self.cursor, password_information)
+            with UnitOfWork(self.connection) as work:
+                work.update(password_information)
             password_information.decrypt_data()
-            self.connection.commit()
             self.reload_passwords()
 
         self.refresh()
@@ -205,8 +220,8 @@ class PasswordTab(TabInterface):
         """
         new_password = PasswordCreationPrompt(self.tab, self.user, self.cursor).run()
         if new_password is not None:
-            new_password = insert_password_information(self.cursor, new_password)
-            self.connection.commit()
+            with UnitOfWork(self.connection) as work:
+                work.insert(new_password)
             new_password.decrypt_data()
             self.password_list.add_item(new_password)
             self.reload_passwords()
@@ -227,8 +242,8 @@ class PasswordTab(TabInterface):
             self.refresh()
             return
 
-        update_password_information(self.cursor, updated_password)
-        self.connection.commit()
+        with UnitOfWork(self.connection) as work:
+            work.update(updated_password)
         updated_password.decrypt_data()
         self.password_list.refresh_selected()
         self.reload_passwords()
@@ -259,9 +274,11 @@ class PasswordTab(TabInterface):
         from the list and database if confirmed.
         """
         password = self.password_list.get_selected()
-        deleted = DeletePasswordPrompt(self.tab, self.user, password, self.cursor).run()
+        with UnitOfWork(self.connection) as work:
+            deleted = DeletePasswordPrompt(
+                self.tab, self.user, password, work.cursor
+            ).run()
         if deleted:
-            self.connection.commit()
             self.reload_passwords()
             self.refresh()
         else:
@@ -295,12 +312,27 @@ class PasswordTab(TabInterface):
 
     def reload_passwords(self, search_string: Optional[str] = None) -> None:
         """
-        Reloads the password list from the database and optionally filters by a search string.
+        Reloads the password list and optionally filters by a search string.
+
+        Only the passwords changed since the last reload are retrieved from the
+        database, the others are kept as they are.
 
         Args:
             search_string (Optional[str]): An optional search term to filter the password list.
         """
-        passwords = retrieve_password_information(self.cursor, self.user)
+        changed, deleted, self.change_seq = retrieve_password_changes(
+            self.cursor, self.user, self.change_seq
+        )
+        if changed or deleted:
+            by_id = {password.id: password for password in self.passwords}
+            for password_id in deleted:
+                by_id.pop(password_id, None)
+            by_id.update((password.id, password) for password in changed)
+            self.passwords = sorted(
+                by_id.values(), key=lambda password: password.id or 0
+            )
+
+        passwords = self.passwords
         if search_string is not None:
             passwords = list(
                 filter(
@@ -0,0 +1,111 @@
+"""
+Module for displaying a popup with storage statistics of the database.
+
+This module provides a popup that shows how many entries and passwords the user
+stores, how large and fragmented the database is and how large the user's
+encrypted entries are. It also allows to free unused pages right away.
+"""
+
+import curses
+import sqlite3
+
+from src.controller.maintenance import AUTO_VACUUM_MODES
+from src.controller.maintenance import blob_size_histograms
+from src.controller.maintenance import incremental_vacuum
+from src.controller.maintenance import optimize
+from src.controller.maintenance import page_statistics
+from src.controller.maintenance import user_row_counts
+from src.model.user import User
+from src.tui.keys import Keys
+from src.tui.panel import Panel
+from src.tui.util import shorten_str
+from src.tui.views.overview.components.prompt import SimplePrompt
+
+LABEL_WIDTH = 20
+TEXT_WIDTH = 56
+
+
+class StoragePopup(SimplePrompt):
+    """
+    Class to display a popup with storage statistics of the database.
+
+    This class inherits from `SimplePrompt`. Only the entries of the logged-in
+    user are counted, the page statistics cover the whole database.
+
+    Attributes:
+        user (User): The logged-in user.
+        connection (sqlite3.Connection): The connection the statistics are read
+        from and maintenance is run on.
+    """
+
+    def __init__(self, parent: Panel, user: User, connection: sqlite3.Connection):
+        """
+        Initializes the StoragePopup class.
+
+        Args:
+            parent (Panel): The parent panel where the popup will be displayed.
+            user (User): The logged-in user.
+            connection (sqlite3.Connection): The connection the statistics are
+            read from and maintenance is run on.
+        """
+        self.user = user
+        self.connection = connection
+        super().__init__(parent, (13, TEXT_WIDTH + 4))
+
+    def run(self) -> None:
+        """
+        Displays the statistics until the user dismisses the popup. Enter frees
+        all unused pages and refreshes the query planner statistics.
+        """
+        message = ""
+        while True:
+            self._show_statistics(message)
+            key_input = self.popup().getch()
+            if key_input == Keys.ESCAPE:
+                self.break_out()
+                break
+            if key_input == Keys.ENTER:
+                freed = incremental_vacuum(self.connection)
+                optimize(self.connection)
+                message = f"Freed {freed} pages"
+
+    def _show_statistics(self, message: str) -> None:
+        """
+        Retrieves and displays the statistics.
+
+        Args:
+            message (str): The result of the last maintenance run, if any.
+        """
+        cursor = self.connection.cursor()
+        pages = page_statistics(cursor)
+        _, entries, passwords = user_row_counts(cursor, self.user.id)[0]
+        bodies = blob_size_histograms(cursor, self.user.id)["body"]
+        size = pages["page_count"] * pages["page_size"]
+        free_share = pages["freelist_count"] / max(pages["page_count"], 1)
+
+        rows = {
+            "Entries": str(entries),
+            "Stored passwords": str(passwords),
+            "Database size": f"{size / 2**20:.2f} MiB ({pages['page_count']} pages)",
+            "Free pages": f"{pages['freelist_count']} ({free_share:.1%})",
+            "Auto vacuum": AUTO_VACUUM_MODES.get(pages["auto_vacuum"], "unknown"),
+            "Entry sizes": ", ".join(
+                f"<= {bucket} B: {count}" for bucket, count in bodies.items()
+            )
+            or "-",
+        }
+
+        self.popup().clear()
+        self.popup().box()
+        self.popup().addstr(0, 0, "Storage", curses.A_BOLD | curses.color_pair(3))
+        for i, (label, value) in enumerate(rows.items()):
+            if len(value) > TEXT_WIDTH - LABEL_WIDTH:
+                value = shorten_str(value, TEXT_WIDTH - LABEL_WIDTH)
+            self.popup().addstr(i + 2, 2, label)
+            self.popup().addstr(i + 2, 2 + LABEL_WIDTH, value)
+        if message:
+            self.popup().addstr(len(rows) + 3, 2, message, curses.A_ITALIC)
+        self.popup.write_bottom_center_text(
+            "- ↩ Free Pages & Optimize - ESC Dismiss -", (-1, 0)
+        )
+        self.popup().refresh()
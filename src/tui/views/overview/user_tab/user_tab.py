@@ -6,13 +6,12 @@ import curses
 import sqlite3
 import sys
 
-from src.controller.password import (
-    count_password_information,
-    retrieve_password_information,
-)
-from src.controller.password import update_password_information
-from src.controller.user import update_user
+from src.controller.password import count_password_information
+from src.controller.unit_of_work import UnitOfWork
+from src.controller.user import store_data_key
+from src.crypto.aead import cipher_for
 from src.crypto.hashing import hash_sha256
+from src.crypto.key_derivation import KEY_CACHE
 from src.model.password import Password
 from src.model.user import User
 from src.tui.keys import Keys
@@ -21,6 +20,7 @@ from src.tui.util import percentage_of
 from src.tui.views.overview.components.controls_popup import ControlsPrompt
 from src.tui.views.overview.components.tab_interface import TabInterface
 from src.tui.views.overview.user_tab.delete_user_prompt import DeleteUserPrompt
+from src.tui.views.overview.user_tab.storage_popup import StoragePopup
 from src.tui.views.overview.user_tab.update_password_prompt import (
     show_update_password_prompt,
 )
@@ -30,6 +30,7 @@ CONTROLS: dict["str", "str"] = {
     "u": "Change Username",
     "p": "Change Password",
     "d": "Delete User",
+    "s": "Storage Statistics",
 }
 
 
@@ -91,6 +92,9 @@ class UserTab(TabInterface):
                 self._handle_update_pw_input()
             case Keys.U | Keys.U_LOWER:
                 self._handle_update_uname_input()
+            case Keys.S | Keys.S_LOWER:
+                StoragePopup(self.tab, self.user, self.connection).run()
+                self.refresh()
             case Keys.QUESTION_MARK:
                 ControlsPrompt(self.tab, self.controls).run()
                 self.refresh()
@@ -101,30 +105,18 @@ class UserTab(TabInterface):
 
         Prompts the user to enter a new username, validates it,
         updates the username in the database,
-        and refreshes the tab. If the new username is valid,
-        it updates all related password information
-        to reflect the new username.
+        and refreshes the tab. The password entries reference the user
+        by its id, so they are left untouched.
         """
         new_username = UpdateUsernamePrompt(self.tab, self.cursor, self.user).run()
         if new_username is None:
             return
 
-        password_infos = retrieve_password_information(self.cursor, self.user)
-        for pw_info in password_infos:
-            if pw_info.data_is_encrypted:
-                pw_info.decrypt_data()
-
-        old_username = self.user.username
         self.user.username = hash_sha256(new_username.encode())
+        with UnitOfWork(self.connection) as work:
+            work.update_user(self.user)
 
-        for pw_info in password_infos:
-            pw_info.user = self.user
-            update_password_information(self.cursor, pw_info)
-            pw_info.decrypt_passwords()
-
-        update_user(self.cursor, self.user, old_username)
         self.user.set_clear_username(new_username)
-        self.connection.commit()
         self.refresh()
 
     def _handle_update_pw_input(self) -> None:
@@ -132,30 +124,23 @@ class UserTab(TabInterface):
         Handles the process of updating the user's password.
 
         Prompts the user to enter and confirm a new password, validates it, updates the password in
-        the database, and refreshes the tab. If the new password is valid, it updates all related
-        password information to reflect the new password.
+        the database, and refreshes the tab. If the new password is valid, the user's data key
+        is wrapped with the new password, so the password entries don't need to be re-encrypted.
         """
         new_password_str = show_update_password_prompt(self.tab, self.user)
         if new_password_str is None:
             return
 
-        password_infos = retrieve_password_information(self.cursor, self.user)
-        for pw_info in password_infos:
-            if pw_info.data_is_encrypted:
-                pw_info.decrypt_data()
-            pw_info.decrypt_passwords()
-
         new_password = Password(new_password_str)
         new_password.make_master()
         self.user.password = new_password
         self.user.set_clear_password(new_password_str)
 
-        for pw_info in password_infos:
-            pw_info.user = self.user
-            update_password_information(self.cursor, pw_info)
-
-        update_user(self.cursor, self.user)
-        self.connection.commit()
+        with UnitOfWork(self.connection) as work:
+            work.update_user(self.user)
+            work.flush()
+            store_data_key(work.cursor, self.user)
+        KEY_CACHE.clear()
 
     def _handle_delete_user_input(self) -> None:
         """
@@ -164,9 +149,12 @@ class UserTab(TabInterface):
         Prompts the user for confirmation and, if confirmed,
         deletes the user and exits the application.
         """
-        deleted = DeleteUserPrompt(self.tab, self.user, self.cursor).run()
+        with UnitOfWork(self.connection) as work:
+            deleted = DeleteUserPrompt(self.tab, self.user, work.cursor).run()
         if deleted:
-            self.connection.commit()
+            self.user.wipe_clear_password()
+            KEY_CACHE.clear()
+            cipher_for.cache_clear()
             sys.exit(0)
         self.refresh()
 
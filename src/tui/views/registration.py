@@ -7,7 +7,9 @@ import curses
 import sqlite3
 from curses.textpad import Textbox
 
+from src.controller.unit_of_work import UnitOfWork
 from src.controller.user import insert_user
+from src.controller.user import unlock_vault
 from src.controller.user import validate_unique_user
 from src.crypto.password_util import validate_password_safety
 from src.model.user import User
@@ -117,12 +119,13 @@ def _finalize_user(
     Raises:
         ValueError: If there is an error while inserting the user into the database.
     """
-    inserted_user = insert_user(connection.cursor(), User.new(username, password_str))
-    connection.commit()
-    if not isinstance(inserted_user, User):
-        raise ValueError("Error while inserting User")
-    inserted_user.set_clear_password(password_str)
-    inserted_user.set_clear_username(username)
+    with UnitOfWork(connection) as work:
+        inserted_user = insert_user(work.cursor, User.new(username, password_str))
+        if not isinstance(inserted_user, User):
+            raise ValueError("Error while inserting User")
+        inserted_user.set_clear_password(password_str)
+        inserted_user.set_clear_username(username)
+        unlock_vault(work.cursor, inserted_user)
     return inserted_user
 
 
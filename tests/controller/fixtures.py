@@ -0,0 +1,47 @@
+# pylint: disable=C
+import sqlite3
+from typing import Optional
+
+from src.controller.schema import migrate
+from src.controller.user import insert_user
+from src.crypto.envelope import generate_data_key
+from src.model.password import Password
+from src.model.password import adapt_password
+from src.model.password import convert_password
+from src.model.password_information import PasswordInformation
+from src.model.user import User
+
+sqlite3.register_converter("password", convert_password)
+sqlite3.register_adapter(Password, adapt_password)
+
+
+def open_database(path: str = ":memory:") -> sqlite3.Connection:
+    """
+    Opens a database with the current schema, like `connect_to_db`.
+    """
+    connection = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    migrate(connection)
+    return connection
+
+
+def create_user(
+    connection: sqlite3.Connection, name: str = "test", unlocked: bool = True
+) -> User:
+    """
+    Inserts a user, with an unlocked vault unless requested otherwise,
+    skipping the key derivation.
+    """
+    user = insert_user(connection.cursor(), User.new(name, "test"))
+    user.set_clear_password("test")
+    if unlocked:
+        user.set_data_key(generate_data_key())
+    connection.commit()
+    return user
+
+
+def new_entry(
+    user: User, description: str, username: Optional[str] = None
+) -> PasswordInformation:
+    return PasswordInformation(
+        user, Password(f"{description}-pw"), description, username
+    )
@@ -0,0 +1,130 @@
+# pylint: disable=C
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from src.controller.backup import backup_database
+from src.controller.backup import list_backups
+from src.controller.backup import rotate_backups
+from src.controller.backup_scheduler import BackupScheduler
+from src.controller.connection_pool import ConnectionPool
+from src.controller.password import insert_many_password_information
+from tests.controller.fixtures import create_user
+from tests.controller.fixtures import new_entry
+from tests.controller.fixtures import open_database
+
+
+class BackupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backups = os.path.join(self.directory.name, "backups")
+        environment = {
+            "DB_PATH": os.path.join(self.directory.name, "test.db"),
+            "BACKUP_DIR": self.backups,
+            "BACKUP_COUNT": "3",
+            "BACKUP_STEP_PAGES": "1",
+        }
+        patch = mock.patch.dict(os.environ, environment)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.connection = open_database(environment["DB_PATH"])
+        user = create_user(self.connection)
+        insert_many_password_information(
+            self.connection.cursor(),
+            [new_entry(user, f"entry{i}") for i in range(50)],
+        )
+        self.connection.commit()
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+
+class TestBackupDatabase(BackupTestCase):
+    def test_backup(self):
+        steps: list[tuple[int, int]] = []
+        path = backup_database(
+            self.connection, progress=lambda *step: steps.append(step)
+        )
+        self.assertEqual(list_backups(), [path])
+        self.assertGreater(len(steps), 1)
+        self.assertEqual(steps[-1][0], 0)
+        with sqlite3.connect(path) as backup:
+            self.assertEqual(
+                backup.execute("PRAGMA integrity_check").fetchone()[0], "ok"
+            )
+            self.assertEqual(
+                backup.execute("SELECT COUNT(*) FROM passwords").fetchone()[0], 50
+            )
+
+    def test_backups_in_the_same_second(self):
+        first = backup_database(self.connection)
+        second = backup_database(self.connection)
+        self.assertNotEqual(first, second)
+        self.assertEqual(list_backups(), [first, second])
+
+    def test_aborted_backup(self):
+        def abort(_remaining: int, _total: int) -> None:
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            backup_database(self.connection, progress=abort)
+        self.assertEqual(list_backups(), [])
+        self.assertEqual(os.listdir(self.backups), [])
+
+    def test_rotation(self):
+        paths = [backup_database(self.connection) for _ in range(5)]
+        self.assertEqual(list_backups(), paths[-3:])
+        self.assertEqual(rotate_backups(None, 1), paths[-3:-1])
+        self.assertEqual(list_backups(), paths[-1:])
+
+
+class TestBackupScheduler(BackupTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pool = ConnectionPool(readers=1).open()
+        self.scheduler = BackupScheduler(self.pool, interval=0)
+
+    def tearDown(self):
+        self.scheduler.stop()
+        self.pool.close()
+        super().tearDown()
+
+    def wait_for_backups(self, count: int) -> None:
+        deadline = time.monotonic() + 10
+        while self.scheduler.completed < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_request(self):
+        self.scheduler.request()
+        self.wait_for_backups(1)
+        self.scheduler.stop()
+        self.assertIsNone(self.scheduler.last_error)
+        self.assertEqual(list_backups(), [self.scheduler.last_backup])
+        self.assertIsNone(self.scheduler.progress)
+
+    def test_start_and_stop(self):
+        self.scheduler.start()
+        self.scheduler.start()
+        self.scheduler.stop()
+        self.assertEqual(self.scheduler.completed, 0)
+        self.assertEqual(list_backups(), [])
+
+    def test_due(self):
+        self.scheduler.interval = 3600
+        self.scheduler.start()
+        self.wait_for_backups(1)
+        self.scheduler.stop()
+        self.assertEqual(len(list_backups()), 1)
+        # The next backup is due an interval after the newest one
+        self.scheduler.start()
+        time.sleep(0.05)
+        self.scheduler.stop()
+        self.assertEqual(self.scheduler.completed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# pylint: disable=C
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.controller.connection_pool import ConnectionPool
+from src.controller.password import insert_many_password_information
+from tests.controller.fixtures import create_user
+from tests.controller.fixtures import new_entry
+from tests.controller.fixtures import open_database
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        environment = {
+            "DB_PATH": os.path.join(self.directory.name, "test.db"),
+            "READER_CONNECTIONS": "2",
+        }
+        patch = mock.patch.dict(os.environ, environment)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.pool = ConnectionPool().open()
+
+    def tearDown(self):
+        self.pool.close()
+        self.directory.cleanup()
+
+    def test_readers_are_bounded(self):
+        lock = threading.Lock()
+        active = [0, 0]
+        used: set[int] = set()
+
+        def read() -> None:
+            with self.pool.reader() as reader:
+                with lock:
+                    active[0] += 1
+                    active[1] = max(active)
+                    used.add(id(reader))
+                reader.execute("SELECT COUNT(*) FROM passwords").fetchone()
+                time.sleep(0.01)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(active[1], 2)
+        self.assertLessEqual(len(used), 2)
+
+    def test_reader_is_read_only(self):
+        with self.pool.reader() as reader:
+            with self.assertRaises(sqlite3.OperationalError):
+                reader.execute("UPDATE change_sequence SET value = value + 1")
+
+    def test_reader_is_reentrant(self):
+        with self.pool.reader() as reader:
+            with self.pool.reader() as nested:
+                self.assertIs(nested, reader)
+
+    def test_reader_during_write(self):
+        writer = self.pool.writer
+        user = create_user(writer)
+        insert_many_password_information(writer.cursor(), [new_entry(user, "pending")])
+        self.assertTrue(writer.in_transaction)
+        with self.pool.reader() as reader:
+            count = reader.execute("SELECT COUNT(*) FROM passwords").fetchone()[0]
+        self.assertEqual(count, 0)
+        writer.commit()
+        with self.pool.reader() as reader:
+            count = reader.execute("SELECT COUNT(*) FROM passwords").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_readers_open_the_writers_database(self):
+        path = os.path.join(self.directory.name, "other.db")
+        with ConnectionPool(connect=lambda: open_database(path)).open() as pool:
+            create_user(pool.writer)
+            with pool.reader() as reader:
+                count = reader.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        self.assertEqual(count, 1)
+        with self.pool.reader() as reader:
+            count = reader.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_closed(self):
+        self.pool.close()
+        with self.assertRaises(RuntimeError):
+            self.pool.writer  # pylint: disable=pointless-statement
+        with self.assertRaises(RuntimeError):
+            with self.pool.reader():
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# pylint: disable=C
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.controller.connection import connect_to_db
+from src.controller.maintenance import IdleMaintenance
+from src.controller.maintenance import blob_size_histograms
+from src.controller.maintenance import incremental_vacuum
+from src.controller.maintenance import index_usage
+from src.controller.maintenance import page_statistics
+from src.controller.maintenance import user_row_counts
+from src.controller.password import insert_many_password_information
+from tests.controller.fixtures import create_user
+from tests.controller.fixtures import new_entry
+
+ENTRIES = 300
+
+
+class MaintenanceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        environment = {
+            "DB_PATH": os.path.join(self.directory.name, "test.db"),
+            "MAINTENANCE_STEP_PAGES": "4",
+        }
+        patch = mock.patch.dict(os.environ, environment)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.connection = connect_to_db()
+        self.cursor = self.connection.cursor()
+        self.user = create_user(self.connection)
+        entries = [new_entry(self.user, f"entry{i}", "name") for i in range(ENTRIES)]
+        for entry in entries:
+            entry.set_note("note " * 100)
+        insert_many_password_information(self.cursor, entries)
+        self.connection.commit()
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def delete_entries(self) -> None:
+        self.cursor.execute("DELETE FROM passwords")
+        self.connection.commit()
+
+    def freelist_count(self) -> int:
+        return page_statistics(self.cursor)["freelist_count"]
+
+
+class TestVacuum(MaintenanceTestCase):
+    def test_incremental_auto_vacuum(self):
+        self.assertEqual(page_statistics(self.cursor)["auto_vacuum"], 2)
+
+    def test_incremental_vacuum(self):
+        self.delete_entries()
+        free = self.freelist_count()
+        pages = page_statistics(self.cursor)["page_count"]
+        self.assertGreater(free, 4)
+        self.assertEqual(incremental_vacuum(self.connection, 4), 4)
+        self.assertEqual(self.freelist_count(), free - 4)
+        self.assertEqual(incremental_vacuum(self.connection), free - 4)
+        self.assertEqual(self.freelist_count(), 0)
+        self.assertEqual(page_statistics(self.cursor)["page_count"], pages - free)
+        self.assertEqual(incremental_vacuum(self.connection), 0)
+
+    def test_idle_steps(self):
+        self.delete_entries()
+        free = self.freelist_count()
+        maintenance = IdleMaintenance()
+        steps = 0
+        while self.freelist_count() and steps <= free:
+            self.assertTrue(maintenance.step(self.connection))
+            steps += 1
+        self.assertEqual(self.freelist_count(), 0)
+        self.assertEqual(steps, -(-free // 4))
+        self.assertFalse(maintenance.optimized)
+        # Once no pages are left, the statistics are refreshed a single time
+        self.assertTrue(maintenance.step(self.connection))
+        self.assertTrue(maintenance.optimized)
+        self.assertFalse(maintenance.step(self.connection))
+        self.assertEqual(self.freelist_count(), 0)
+
+    def test_step_in_transaction(self):
+        self.cursor.execute("DELETE FROM passwords")
+        self.assertFalse(IdleMaintenance().step(self.connection))
+        self.assertTrue(self.connection.in_transaction)
+
+
+class TestStatistics(MaintenanceTestCase):
+    def test_page_statistics(self):
+        statistics = page_statistics(self.cursor)
+        self.assertEqual(
+            set(statistics),
+            {"page_size", "page_count", "freelist_count", "auto_vacuum"},
+        )
+        self.assertGreater(statistics["page_count"], 1)
+
+    def test_user_row_counts(self):
+        other = create_user(self.connection, "other")
+        counts = user_row_counts(self.cursor)
+        self.assertEqual(len(counts), 2)
+        self.assertIn((self.user.username, ENTRIES, ENTRIES), counts)
+        self.assertEqual(
+            user_row_counts(self.cursor, other.id), [(other.username, 0, 0)]
+        )
+
+    def test_blob_size_histograms(self):
+        histograms = blob_size_histograms(self.cursor)
+        self.assertEqual(set(histograms), {"entry", "body", "note", "history"})
+        for name in ("entry", "body", "history"):
+            self.assertEqual(sum(histograms[name].values()), ENTRIES, name)
+            for bucket in histograms[name]:
+                self.assertEqual(bucket & (bucket - 1), 0)
+        self.assertEqual(histograms["note"], {})
+        other = create_user(self.connection, "other")
+        empty = blob_size_histograms(self.cursor, other.id)
+        self.assertEqual(empty, dict.fromkeys(histograms, {}))
+
+    def test_index_usage(self):
+        usage = {index: queries for index, _, _, queries in index_usage(self.cursor)}
+        self.assertIn("list entries", usage["passwords_by_user"])
+        self.assertTrue(all(stat is None for _, _, stat, _ in index_usage(self.cursor)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,408 @@
+# pylint: disable=C
+import sqlite3
+import unittest
+from unittest import mock
+
+from src.controller.password import current_change_seq
+from src.controller.password import delete_password_information
+from src.controller.password import insert_many_password_information
+from src.controller.password import insert_password_information
+from src.controller.password import load_password_history
+from src.controller.password import migrate_vault
+from src.controller.password import retrieve_password_changes
+from src.controller.password import retrieve_password_history
+from src.controller.password import retrieve_password_information
+from src.controller.password import retrieve_password_information_page
+from src.controller.password import stream_password_information
+from src.controller.password import update_password_information
+from src.controller.password import validate_unique_password
+from src.crypto.decrypt_pool import DECRYPT_POOL
+from src.crypto.envelope import generate_data_key
+from src.crypto.key_derivation import KEY_CACHE
+from src.crypto.key_derivation import derive_salted_key
+from src.model.password import Password
+from tests.controller.fixtures import create_user
+from tests.controller.fixtures import new_entry
+from tests.controller.fixtures import open_database
+
+
+COMPOSED = "caf\u00e9"
+DECOMPOSED = "cafe\u0301"
+
+
+class TestValidateUniquePassword(unittest.TestCase):
+    def setUp(self):
+        self.connection = open_database()
+        self.cursor = self.connection.cursor()
+        self.user = create_user(self.connection)
+        insert_many_password_information(
+            self.cursor, [new_entry(self.user, COMPOSED, "me")]
+        )
+        self.connection.commit()
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_indexed(self):
+        self.assertFalse(
+            validate_unique_password(self.cursor, COMPOSED, "me", self.user)
+        )
+        self.assertFalse(
+            validate_unique_password(self.cursor, DECOMPOSED, "me", self.user)
+        )
+        self.assertTrue(
+            validate_unique_password(self.cursor, COMPOSED, None, self.user)
+        )
+
+    def test_unindexed_fallback(self):
+        self.cursor.execute("UPDATE passwords SET blind_index = NULL")
+        self.assertFalse(
+            validate_unique_password(self.cursor, DECOMPOSED, "me", self.user)
+        )
+        self.assertTrue(
+            validate_unique_password(self.cursor, DECOMPOSED, "you", self.user)
+        )
+
+    def test_other_user(self):
+        other = create_user(self.connection, "other")
+        self.assertTrue(validate_unique_password(self.cursor, COMPOSED, "me", other))
+
+
+class TestRetrievePasswordInformation(unittest.TestCase):
+    def setUp(self):
+        self.connection = open_database()
+        self.cursor = self.connection.cursor()
+        KEY_CACHE.clear()
+
+    def tearDown(self):
+        self.connection.close()
+        KEY_CACHE.clear()
+
+    def insert(self, user, names):
+        for name in names:
+            insert_password_information(self.cursor, new_entry(user, name, "me"))
+        self.connection.commit()
+
+    def test_data_key_rows_not_pooled(self):
+        user = create_user(self.connection)
+        names = [f"entry{i}" for i in range(20)]
+        self.insert(user, names)
+        with mock.patch.dict("os.environ", {"PARALLEL_DECRYPT_THRESHOLD": "1"}):
+            with mock.patch.object(DECRYPT_POOL, "map") as pool_map:
+                entries = retrieve_password_information(self.cursor, user)
+        pool_map.assert_not_called()
+        self.assertEqual(
+            [
+                (pw_info.details.description, pw_info.details.username)
+                for pw_info in entries
+            ],
+            [(name.encode(), b"me") for name in names],
+        )
+
+    def test_derived_keys_pooled(self):
+        user = create_user(self.connection, unlocked=False)
+        names = [f"entry{i}" for i in range(3)]
+        self.insert(user, names)
+        KEY_CACHE.clear()
+        with mock.patch.object(DECRYPT_POOL, "map", wraps=DECRYPT_POOL.map) as pool_map:
+            entries = retrieve_password_information(self.cursor, user)
+        pool_map.assert_called_once()
+        func, jobs = pool_map.call_args.args
+        self.assertIs(func, derive_salted_key)
+        self.assertEqual(len(jobs), 3)
+        # The copies of the password are wiped once the keys are derived
+        self.assertTrue(all(not any(password) for password, _ in jobs))
+        self.assertEqual((KEY_CACHE.misses, KEY_CACHE.hits), (3, 3))
+        self.assertEqual(
+            [pw_info.details.description for pw_info in entries],
+            [name.encode() for name in names],
+        )
+
+
+class TestMigrateVault(unittest.TestCase):
+    def test_derived_keys_pooled(self):
+        connection = open_database()
+        cursor = connection.cursor()
+        user = create_user(connection, unlocked=False)
+        with mock.patch.dict("os.environ", {"ENTRY_FORMAT": "fields"}):
+            for name in ("mail", "bank"):
+                entry = new_entry(user, name)
+                entry.add_password(Password(f"{name}-new"))
+                insert_password_information(cursor, entry)
+            insert_password_information(cursor, new_entry(user, "shop"))
+        KEY_CACHE.clear()
+        user.set_data_key(generate_data_key())
+        with mock.patch.object(DECRYPT_POOL, "map", wraps=DECRYPT_POOL.map) as pool_map:
+            self.assertEqual(migrate_vault(cursor, user), 3)
+        # The keys of every entry and of each of its passwords
+        self.assertEqual(len(pool_map.call_args.args[1]), 8)
+        self.assertEqual(KEY_CACHE.misses, 8)
+        self.assertEqual(migrate_vault(cursor, user), 0)
+        connection.close()
+        KEY_CACHE.clear()
+
+
+class TestRetrievePasswordHistory(unittest.TestCase):
+    def setUp(self):
+        self.connection = open_database()
+        self.cursor = self.connection.cursor()
+        self.user = create_user(self.connection)
+        entry = new_entry(self.user, "mail")
+        for number in range(2, 6):
+            entry.add_password(Password(f"mail-{number}"))
+        insert_password_information(self.cursor, entry)
+        self.connection.commit()
+        (self.entry,) = retrieve_password_information(self.cursor, self.user)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def page(self, page, page_size):
+        return [
+            password()
+            for password in retrieve_password_history(
+                self.cursor, self.entry, page, page_size
+            )
+        ]
+
+    def assert_pages(self):
+        self.assertEqual(self.page(0, 2), [b"mail-5", b"mail-4"])
+        self.assertEqual(self.page(1, 2), [b"mail-3", b"mail-2"])
+        self.assertEqual(self.page(2, 2), [b"mail-pw"])
+        self.assertEqual(self.page(3, 2), [])
+        self.assertEqual(
+            self.page(0, 5), [b"mail-5", b"mail-4", b"mail-3", b"mail-2", b"mail-pw"]
+        )
+        self.assertEqual(self.page(1, 5), [])
+
+    def test_stored_in_order(self):
+        self.cursor.execute(
+            "SELECT seq FROM password_history WHERE entry = ? ORDER BY seq",
+            (self.entry.id,),
+        )
+        self.assertEqual(self.cursor.fetchall(), [(seq,) for seq in range(5)])
+        self.assertEqual(self.entry.history_size, 5)
+        self.assertFalse(self.entry.history_loaded)
+
+    def test_pages_from_database(self):
+        self.assert_pages()
+        self.assertFalse(self.entry.history_loaded)
+
+    def test_pages_from_loaded_history(self):
+        load_password_history(self.cursor, self.entry)
+        self.assertTrue(self.entry.history_loaded)
+        self.cursor = mock.Mock(spec=sqlite3.Cursor)
+        self.assert_pages()
+        self.cursor.execute.assert_not_called()
+
+
+class TestInsertManyPasswordInformation(unittest.TestCase):
+    def setUp(self):
+        self.connection = open_database()
+        self.cursor = self.connection.cursor()
+        self.user = create_user(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def insert(self, *descriptions: str) -> list[int]:
+        entries = insert_many_password_information(
+            self.cursor, [new_entry(self.user, name) for name in descriptions]
+        )
+        return [pw_info.id for pw_info in entries]
+
+    def stored(self) -> list[tuple[int, str]]:
+        return [
+            (pw_info.id, pw_info.details.description.decode())
+            for pw_info in retrieve_password_information(self.cursor, self.user)
+        ]
+
+    def test_empty_table(self):
+        self.assertEqual(self.insert(), [])
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.insert("a", "b", "c"), [1, 2, 3])
+        self.assertTrue(self.connection.in_transaction)
+        self.connection.commit()
+        self.assertEqual(self.stored(), [(1, "a"), (2, "b"), (3, "c")])
+        self.cursor.execute("SELECT COUNT(*) FROM password_history")
+        self.assertEqual(self.cursor.fetchone()[0], 3)
+
+    def test_ids_not_reused(self):
+        self.insert("a", "b", "c", "d")
+        self.connection.commit()
+        self.cursor.execute("DELETE FROM passwords WHERE id > 2")
+        self.connection.commit()
+        self.assertEqual(self.insert("e", "f"), [5, 6])
+        self.connection.commit()
+        self.assertEqual(self.stored(), [(1, "a"), (2, "b"), (5, "e"), (6, "f")])
+        # Single inserts continue after the ids of the batch
+        self.cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'passwords'")
+        self.assertEqual(self.cursor.fetchone()[0], 6)
+
+    def test_rollback_on_failed_history(self):
+        self.insert("a")
+        # A stray history row makes the history insert of the batch fail
+        self.cursor.execute(
+            "INSERT INTO password_history (entry, seq, password) VALUES (3, 0, x'')"
+        )
+        self.connection.commit()
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.insert("b", "c")
+        self.connection.rollback()
+        self.assertEqual(self.stored(), [(1, "a")])
+        self.cursor.execute("SELECT COUNT(*) FROM password_history")
+        self.assertEqual(self.cursor.fetchone()[0], 2)
+
+
+class TestPaging(unittest.TestCase):
+    def setUp(self):
+        self.connection = open_database()
+        self.cursor = self.connection.cursor()
+        self.user = create_user(self.connection)
+        other = create_user(self.connection, "other")
+        # Entries of another user interleave with the ids of the user
+        self.ids: list[int] = []
+        for i in range(9):
+            self.ids += [
+                pw_info.id
+                for pw_info in insert_many_password_information(
+                    self.cursor,
+                    [new_entry(self.user, f"entry{i}"), new_entry(other, f"other{i}")],
+                )
+            ][:1]
+        self.connection.commit()
+        patch = mock.patch.dict("os.environ", {"ENTRY_PAGE_SIZE": "3"})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def stream(self, limit=None) -> list[int]:
+        return [
+            pw_info.id
+            for pw_info in stream_password_information(self.cursor, self.user, limit)
+        ]
+
+    def test_pages(self):
+        first = retrieve_password_information_page(self.cursor, self.user)
+        self.assertEqual([pw_info.id for pw_info in first], self.ids[:3])
+        self.assertEqual(
+            [pw_info.details.description for pw_info in first],
+            [b"entry0", b"entry1", b"entry2"],
+        )
+        page = retrieve_password_information_page(
+            self.cursor, self.user, self.ids[3], 4
+        )
+        self.assertEqual([pw_info.id for pw_info in page], self.ids[4:8])
+        self.assertEqual(
+            retrieve_password_information_page(self.cursor, self.user, self.ids[-1]),
+            [],
+        )
+
+    def test_stream_exact_multiple(self):
+        self.assertEqual(self.stream(), self.ids)
+        self.assertEqual(self.stream(9), self.ids)
+
+    def test_stream_partial_page(self):
+        for limit in (2, 4, 8, 10):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.stream(limit), self.ids)
+
+    def test_stream_after_deletes(self):
+        self.cursor.execute(
+            "DELETE FROM passwords WHERE id IN (?, ?)", (self.ids[0], self.ids[4])
+        )
+        self.connection.commit()
+        self.assertEqual(self.stream(), self.ids[1:4] + self.ids[5:])
+
+    def test_stream_empty(self):
+        empty = create_user(self.connection, "empty")
+        self.assertEqual(list(stream_password_information(self.cursor, empty)), [])
+
+    def test_invalid_limit(self):
+        for limit in (0, -1):
+            with self.subTest(limit=limit):
+                with self.assertRaises(ValueError):
+                    retrieve_password_information_page(self.cursor, self.user, 0, limit)
+                with self.assertRaises(ValueError):
+                    self.stream(limit)
+
+
+class TestRetrievePasswordChanges(unittest.TestCase):
+    def setUp(self):
+        self.connection = open_database()
+        self.cursor = self.connection.cursor()
+        self.user = create_user(self.connection)
+        insert_many_password_information(
+            self.cursor,
+            [
+                new_entry(self.user, name)
+                for name in ("edited", "rotated", "deleted", "kept")
+            ],
+        )
+        self.connection.commit()
+        self.entries = {
+            pw_info.details.description.decode(): pw_info
+            for pw_info in retrieve_password_information(self.cursor, self.user)
+        }
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_changes(self):
+        since = current_change_seq(self.cursor)
+        self.assertEqual(
+            retrieve_password_changes(self.cursor, self.user, since), ([], [], since)
+        )
+
+        edited = self.entries["edited"]
+        edited.details.note = b"note"
+        edited.modify()
+        update_password_information(self.cursor, edited)
+        rotated = self.entries["rotated"]
+        rotated.add_password(Password("rotated-new"))
+        update_password_information(self.cursor, rotated)
+        delete_password_information(self.cursor, self.entries["deleted"])
+        self.connection.commit()
+
+        changed, deleted, change_seq = retrieve_password_changes(
+            self.cursor, self.user, since
+        )
+        self.assertEqual(
+            [pw_info.id for pw_info in changed], sorted([edited.id, rotated.id])
+        )
+        self.assertEqual(deleted, [self.entries["deleted"].id])
+        self.assertGreater(change_seq, since)
+        self.assertEqual(change_seq, current_change_seq(self.cursor))
+        self.assertEqual(
+            retrieve_password_changes(self.cursor, self.user, change_seq),
+            ([], [], change_seq),
+        )
+
+    def test_history_change(self):
+        kept = self.entries["kept"]
+        since = current_change_seq(self.cursor)
+        self.cursor.execute(
+            "INSERT INTO password_history (entry, seq, password) "
+            "SELECT entry, seq + 1, password FROM password_history WHERE entry = ?",
+            (kept.id,),
+        )
+        self.connection.commit()
+        changed, _, _ = retrieve_password_changes(self.cursor, self.user, since)
+        self.assertEqual([pw_info.id for pw_info in changed], [kept.id])
+
+    def test_changes_of_other_users(self):
+        since = current_change_seq(self.cursor)
+        other = create_user(self.connection, "other")
+        insert_many_password_information(self.cursor, [new_entry(other, "other")])
+        self.connection.commit()
+        changed, deleted, change_seq = retrieve_password_changes(
+            self.cursor, self.user, since
+        )
+        self.assertEqual((changed, deleted), ([], []))
+        self.assertGreater(change_seq, since)
+
+
+if __name__ == "__main__":
+    unittest.main()
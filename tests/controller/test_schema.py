@@ -0,0 +1,264 @@
+# pylint: disable=C
+import os
+import pickle
+import sqlite3
+import unittest
+from unittest import mock
+
+from src.controller.password import insert_many_password_information
+from src.controller.schema import MIGRATIONS
+from src.controller.schema import SCHEMA_VERSION
+from src.controller.schema import _track_changes
+from src.controller.schema import migrate
+from src.controller.schema import schema_version
+from src.controller.user import retrieve_user_by_name
+from src.crypto.envelope import generate_data_key
+from src.crypto.hashing import hash_sha256
+from src.model.password import Password
+from tests.controller.fixtures import new_entry
+from tests.controller.fixtures import open_database
+
+# The entries of the baseline database by their description and owner
+ENTRIES = {
+    b"mail": "alice",
+    b"bank": "alice",
+    b"forum": "bob",
+    b"shop": "alice",
+    b"work": "bob",
+}
+DELETED = b"deleted"
+
+INDEXES = {
+    "passwords_by_user",
+    "passwords_by_blind_index",
+    "passwords_by_change",
+    "tombstones_by_change",
+}
+TRIGGERS = {
+    "passwords_inserted",
+    "passwords_updated",
+    "passwords_deleted",
+    "password_history_inserted",
+}
+
+
+def legacy_password(value: str, master: bool = False) -> Password:
+    """
+    Returns a password as stored by older versions. The migrations copy the
+    encrypted passwords without decrypting them, so entries are only marked
+    as encrypted.
+    """
+    password = Password(value)
+    if master:
+        password.make_master()
+    else:
+        password.is_encrypted = True
+    return password
+
+
+def create_baseline(connection: sqlite3.Connection) -> None:
+    """
+    Creates the schema and pickled rows of the versions before the schema was
+    versioned. The highest entry is deleted, so its id must not be reused.
+    """
+    connection.executescript(
+        """
+        CREATE TABLE passwords (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description BLOB NOT NULL,
+            username BLOB,
+            passwords BLOB NOT NULL,
+            categories BLOB,
+            note BLOB,
+            user BLOB NOT NULL,
+            metadata BLOB NOT NULL,
+            salt BLOB NOT NULL,
+            FOREIGN KEY(user) REFERENCES users(username)
+        );
+        CREATE TABLE users (
+            username BLOB UNIQUE NOT NULL,
+            password password NOT NULL
+        );
+        """
+    )
+    for name in ("alice", "bob"):
+        connection.execute(
+            "INSERT INTO users VALUES (?, ?)",
+            (
+                hash_sha256(name.encode()),
+                pickle.dumps(legacy_password(name, master=True)),
+            ),
+        )
+    for description, owner in [*ENTRIES.items(), (DELETED, "bob")]:
+        connection.execute(
+            """
+            INSERT INTO passwords (
+                description, username, passwords, categories, note, user,
+                metadata, salt
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                description,
+                pickle.dumps(None),
+                pickle.dumps([legacy_password("old"), legacy_password("new")]),
+                pickle.dumps([]),
+                pickle.dumps(None),
+                hash_sha256(owner.encode()),
+                pickle.dumps(None),
+                pickle.dumps(os.urandom(16)),
+            ),
+        )
+    connection.execute("DELETE FROM passwords WHERE description = ?", (DELETED,))
+    connection.commit()
+
+
+def migrate_to(connection: sqlite3.Connection, version: int) -> None:
+    """
+    Applies the migrations up to the given version, like an older version of
+    the application would have.
+    """
+    cursor = connection.cursor()
+    for target, migration in enumerate(MIGRATIONS[:version], 1):
+        cursor.execute("BEGIN IMMEDIATE")
+        migration(cursor)
+        cursor.execute(f"PRAGMA user_version = {target}")
+        connection.commit()
+
+
+def schema_names(connection: sqlite3.Connection, kind: str) -> set[str]:
+    return {
+        name
+        for (name,) in connection.execute(
+            "SELECT name FROM sqlite_schema WHERE type = ? AND sql IS NOT NULL",
+            (kind,),
+        )
+    }
+
+
+class TestMigrate(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        create_baseline(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def assert_migrated(self):
+        connection = self.connection
+        self.assertEqual(schema_version(connection.cursor()), SCHEMA_VERSION)
+        self.assertEqual(
+            connection.execute("PRAGMA integrity_check").fetchone()[0], "ok"
+        )
+        self.assertEqual(connection.execute("PRAGMA foreign_key_check").fetchall(), [])
+
+        self.assertEqual(
+            connection.execute("SELECT COUNT(*) FROM users").fetchone()[0], 2
+        )
+        owners = dict(
+            connection.execute(
+                "SELECT p.description, u.username FROM passwords p "
+                "JOIN users u ON u.id = p.user"
+            ).fetchall()
+        )
+        self.assertEqual(
+            owners,
+            {
+                description: hash_sha256(owner.encode())
+                for description, owner in ENTRIES.items()
+            },
+        )
+        self.assertEqual(
+            connection.execute("SELECT COUNT(*) FROM password_history").fetchone()[0],
+            2 * len(ENTRIES),
+        )
+        self.assertEqual(
+            connection.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'passwords'"
+            ).fetchone()[0],
+            len(ENTRIES) + 1,
+        )
+        self.assertTrue(INDEXES <= schema_names(connection, "index"))
+        self.assertEqual(schema_names(connection, "trigger"), TRIGGERS)
+
+    def test_migrate_baseline(self):
+        self.assertEqual(migrate(self.connection), SCHEMA_VERSION)
+        self.assert_migrated()
+
+    def test_migrate_from_every_version(self):
+        for version in range(SCHEMA_VERSION + 1):
+            with self.subTest(version=version):
+                self.connection.close()
+                self.connection = sqlite3.connect(":memory:")
+                create_baseline(self.connection)
+                migrate_to(self.connection, version)
+                self.assertEqual(migrate(self.connection), SCHEMA_VERSION - version)
+                self.assert_migrated()
+
+    def test_migrate_twice(self):
+        migrate(self.connection)
+        dump = list(self.connection.iterdump())
+        self.assertEqual(migrate(self.connection), 0)
+        self.assertEqual(list(self.connection.iterdump()), dump)
+
+    def test_tombstones_keep_their_user(self):
+        migrate_to(self.connection, MIGRATIONS.index(_track_changes) + 1)
+        self.connection.execute(
+            "DELETE FROM passwords WHERE description = ?", (b"work",)
+        )
+        self.connection.commit()
+        migrate(self.connection)
+        bob = self.connection.execute(
+            "SELECT id FROM users WHERE username = ?", (hash_sha256(b"bob"),)
+        ).fetchone()[0]
+        self.assertEqual(
+            self.connection.execute("SELECT user FROM password_tombstones").fetchall(),
+            [(bob,)],
+        )
+
+    def test_failed_migration_rolled_back(self):
+        def fail(cursor):
+            cursor.execute("CREATE TABLE partial (id INTEGER)")
+            raise sqlite3.OperationalError("migration failed")
+
+        with mock.patch("src.controller.schema.MIGRATIONS", [*MIGRATIONS, fail]):
+            with self.assertRaisesRegex(sqlite3.OperationalError, "migration failed"):
+                migrate(self.connection)
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(schema_version(self.connection.cursor()), SCHEMA_VERSION)
+        self.assertNotIn("partial", schema_names(self.connection, "table"))
+
+    def test_newer_version(self):
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        with self.assertRaises(sqlite3.DatabaseError):
+            migrate(self.connection)
+
+
+class TestMigratedSchema(unittest.TestCase):
+    def test_ids_not_reused(self):
+        connection = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+        create_baseline(connection)
+        migrate(connection)
+        user = retrieve_user_by_name(connection.cursor(), "bob")
+        user.set_data_key(generate_data_key())
+        (entry,) = insert_many_password_information(
+            connection.cursor(), [new_entry(user, "new")]
+        )
+        self.assertEqual(entry.id, len(ENTRIES) + 2)
+        self.assertEqual(
+            connection.execute(
+                "SELECT user FROM passwords WHERE id = ?", (entry.id,)
+            ).fetchone(),
+            (user.id,),
+        )
+        connection.close()
+
+    def test_new_database(self):
+        connection = open_database()
+        self.assertEqual(schema_version(connection.cursor()), SCHEMA_VERSION)
+        self.assertTrue(INDEXES <= schema_names(connection, "index"))
+        self.assertEqual(schema_names(connection, "trigger"), TRIGGERS)
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
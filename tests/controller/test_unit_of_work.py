@@ -0,0 +1,101 @@
+# pylint: disable=C
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from src.controller.password import retrieve_password_information
+from src.controller.unit_of_work import UnitOfWork
+from tests.controller.fixtures import create_user
+from tests.controller.fixtures import new_entry
+from tests.controller.fixtures import open_database
+
+
+class TestUnitOfWork(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.db")
+        self.connection = open_database(self.path)
+        self.user = create_user(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def count_entries(self) -> int:
+        # A second connection only sees committed entries
+        with sqlite3.connect(self.path) as connection:
+            return connection.execute("SELECT COUNT(*) FROM passwords").fetchone()[0]
+
+    def test_commit(self):
+        with UnitOfWork(self.connection) as work:
+            work.insert(new_entry(self.user, "first"))
+            work.insert(new_entry(self.user, "second"))
+            self.assertEqual(self.count_entries(), 0)
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.count_entries(), 2)
+
+    def test_rollback_on_exception(self):
+        entry = new_entry(self.user, "first")
+        with self.assertRaises(RuntimeError):
+            with UnitOfWork(self.connection) as work:
+                work.insert(entry)
+                work.flush()
+                self.assertTrue(self.connection.in_transaction)
+                raise RuntimeError
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.count_entries(), 0)
+
+    def test_update_and_delete(self):
+        with UnitOfWork(self.connection) as work:
+            work.insert(new_entry(self.user, "edited"))
+            work.insert(new_entry(self.user, "deleted"))
+        edited, deleted = retrieve_password_information(
+            self.connection.cursor(), self.user
+        )
+        edited.details.note = b"note"
+        edited.modify()
+        with UnitOfWork(self.connection) as work:
+            work.update(edited)
+            work.update(edited)
+            work.delete(deleted)
+        (entry,) = retrieve_password_information(self.connection.cursor(), self.user)
+        self.assertEqual(entry.details.note, b"note")
+
+    def test_empty_flush(self):
+        with UnitOfWork(self.connection) as work:
+            work.flush()
+            self.assertFalse(self.connection.in_transaction)
+        # Another writer isn't blocked by an empty unit of work
+        with sqlite3.connect(self.path, timeout=0) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+
+    def test_flush_order(self):
+        calls = mock.Mock()
+        names = (
+            "delete_password_information",
+            "update_password_information",
+            "insert_many_password_information",
+            "update_user",
+        )
+        patches = [
+            mock.patch(f"src.controller.unit_of_work.{name}", getattr(calls, name))
+            for name in names
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        work = UnitOfWork(self.connection)
+        work.update_user(self.user)
+        work.insert(new_entry(self.user, "inserted"))
+        work.update(new_entry(self.user, "updated"))
+        work.delete(new_entry(self.user, "deleted"))
+        work.flush()
+        work.rollback()
+        self.assertEqual([call[0] for call in calls.mock_calls], list(names))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+# pylint: disable=C
+import unittest
+from unittest import mock
+
+from src.controller.password import insert_password_information
+from src.controller.password import load_password_history
+from src.controller.password import retrieve_password_information
+from src.controller.user import retrieve_user_by_name
+from src.controller.user import unlock_vault
+from src.crypto.envelope import DATA_KEY_SALT
+from src.crypto.key_derivation import KdfParameters
+from src.exceptions.encryption_exception import EncryptionException
+from src.model.codec import decode_optional
+from src.model.password import Password
+from tests.controller.fixtures import create_user
+from tests.controller.fixtures import new_entry
+from tests.controller.fixtures import open_database
+
+
+class TestUnlockVault(unittest.TestCase):
+    def setUp(self):
+        self.connection = open_database()
+        self.cursor = self.connection.cursor()
+        self.user = create_user(self.connection, unlocked=False)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def login(self, password: str = "test"):
+        user = retrieve_user_by_name(self.cursor, "test")
+        user.set_clear_password(password)
+        return user
+
+    def stored_salts(self) -> list[bytes]:
+        self.cursor.execute("SELECT salt FROM passwords ORDER BY id")
+        return [decode_optional(salt) for (salt,) in self.cursor.fetchall()]
+
+    def test_first_unlock(self):
+        unlock_vault(self.cursor, self.user)
+        self.connection.commit()
+        self.assertTrue(self.user.has_data_key())
+        self.cursor.execute("SELECT data_key, kek_salt FROM users")
+        wrapped_key, kek_salt = self.cursor.fetchone()
+        self.assertIsNotNone(kek_salt)
+        self.assertNotIn(self.user.get_data_key(), wrapped_key)
+
+        user = self.login()
+        unlock_vault(self.cursor, user)
+        self.assertEqual(user.get_data_key(), self.user.get_data_key())
+        self.cursor.execute("SELECT data_key, kek_salt FROM users")
+        self.assertEqual(self.cursor.fetchone(), (wrapped_key, kek_salt))
+
+    def test_wrong_password(self):
+        unlock_vault(self.cursor, self.user)
+        self.connection.commit()
+        user = self.login("wrong")
+        with self.assertRaises(EncryptionException):
+            unlock_vault(self.cursor, user)
+        self.assertFalse(user.has_data_key())
+
+    def test_rewrap_outdated_parameters(self):
+        with mock.patch.dict("os.environ", {"SCRYPT_N": str(2**10)}):
+            unlock_vault(self.cursor, self.user)
+        self.connection.commit()
+        self.cursor.execute("SELECT data_key, kek_salt FROM users")
+        wrapped_key, kek_salt = self.cursor.fetchone()
+        self.assertFalse(KdfParameters.from_bytes(kek_salt).is_current())
+
+        user = self.login()
+        unlock_vault(self.cursor, user)
+        self.assertEqual(user.get_data_key(), self.user.get_data_key())
+        self.cursor.execute("SELECT data_key, kek_salt FROM users")
+        rewrapped_key, new_salt = self.cursor.fetchone()
+        self.assertNotEqual(rewrapped_key, wrapped_key)
+        self.assertTrue(KdfParameters.from_bytes(new_salt).is_current())
+
+        user = self.login()
+        unlock_vault(self.cursor, user)
+        self.assertEqual(user.get_data_key(), self.user.get_data_key())
+        self.cursor.execute("SELECT data_key, kek_salt FROM users")
+        self.assertEqual(self.cursor.fetchone(), (rewrapped_key, new_salt))
+
+    def test_unknown_user(self):
+        other = create_user(self.connection, "other", unlocked=False)
+        self.cursor.execute("DELETE FROM users WHERE username = ?", (other.username,))
+        with self.assertRaises(ValueError):
+            unlock_vault(self.cursor, other)
+
+    def test_migrate_legacy_rows(self):
+        with mock.patch.dict("os.environ", {"ENTRY_FORMAT": "fields"}):
+            for description in ("mail", "bank"):
+                entry = new_entry(self.user, description, "me")
+                entry.add_password(Password(f"{description}-new"))
+                insert_password_information(self.cursor, entry)
+        self.connection.commit()
+        self.assertNotIn(DATA_KEY_SALT, self.stored_salts())
+
+        user = self.login()
+        unlock_vault(self.cursor, user)
+        self.connection.commit()
+        self.assertEqual(self.stored_salts(), [DATA_KEY_SALT, DATA_KEY_SALT])
+        self.cursor.execute("SELECT COUNT(*) FROM passwords WHERE entry IS NULL")
+        self.assertEqual(self.cursor.fetchone()[0], 0)
+
+        user = self.login()
+        unlock_vault(self.cursor, user)
+        entries = retrieve_password_information(self.cursor, user)
+        self.assertEqual(
+            [pw_info.details.description for pw_info in entries], [b"mail", b"bank"]
+        )
+        for pw_info in entries:
+            description = pw_info.details.description.decode()
+            self.assertEqual(pw_info.details.username, b"me")
+            load_password_history(self.cursor, pw_info)
+            pw_info.decrypt_passwords()
+            self.assertEqual(
+                [password() for password in pw_info.passwords],
+                [f"{description}-pw".encode(), f"{description}-new".encode()],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
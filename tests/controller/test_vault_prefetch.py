@@ -0,0 +1,59 @@
+# pylint: disable=C
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.controller.password import current_change_seq
+from src.controller.password import insert_password_information
+from src.controller.user import unlock_vault
+from src.controller.vault_prefetch import VaultPrefetch
+from tests.controller.fixtures import create_user
+from tests.controller.fixtures import new_entry
+from tests.controller.fixtures import open_database
+
+
+class TestVaultPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "pwm.db")
+        self.connection = open_database(self.path)
+        self.user = create_user(self.connection, unlocked=False)
+        unlock_vault(self.connection.cursor(), self.user)
+        for description in ("a", "b"):
+            insert_password_information(
+                self.connection.cursor(), new_entry(self.user, description, "me")
+            )
+        self.connection.commit()
+        self.prefetch = VaultPrefetch(lambda: open_database(self.path))
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def test_start_and_take(self):
+        self.prefetch.start(self.user)
+        entries, change_seq = self.prefetch.take(self.user)
+        self.assertEqual(change_seq, current_change_seq(self.connection.cursor()))
+        self.assertEqual(
+            [(e.details.description, e.details.username) for e in entries],
+            [(b"a", b"me"), (b"b", b"me")],
+        )
+        self.assertIsNone(self.prefetch.take(self.user))
+
+    def test_error_raised_from_take(self):
+        with mock.patch(
+            "src.controller.vault_prefetch.unlock_vault",
+            side_effect=RuntimeError("unlock failed"),
+        ):
+            self.prefetch.start(self.user)
+            with self.assertRaisesRegex(RuntimeError, "unlock failed"):
+                self.prefetch.take(self.user)
+        self.assertIsNone(self.prefetch.take(self.user))
+
+    def test_take_other_user(self):
+        other = create_user(self.connection, "other", unlocked=False)
+        self.prefetch.start(self.user)
+        self.assertIsNone(self.prefetch.take(other))
+        entries, _ = self.prefetch.take(self.user)
+        self.assertEqual(len(entries), 2)
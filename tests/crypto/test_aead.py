@@ -0,0 +1,109 @@
+# pylint: disable=C
+import os
+import unittest
+
+import src.crypto.aead as aead
+from src.crypto.fernet import encrypt_fernet
+from src.exceptions.encryption_exception import EncryptionException
+
+
+class TestAead(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(32)
+
+    def test_seal_open(self):
+        record = aead.seal(b"password", self.key)
+        self.assertTrue(aead.is_sealed(record))
+        self.assertEqual(len(record), 2 + aead.NONCE_SIZE + len(b"password") + 16)
+        self.assertEqual(aead.open_sealed(record, self.key), b"password")
+
+    def test_associated_data(self):
+        record = aead.seal(b"password", self.key, b"row 1")
+        self.assertEqual(aead.open_sealed(record, self.key, b"row 1"), b"password")
+        with self.assertRaises(EncryptionException):
+            aead.open_sealed(record, self.key, b"row 2")
+
+    def test_tampered_record(self):
+        record = bytearray(aead.seal(b"password", self.key))
+        record[-1] ^= 1
+        with self.assertRaises(EncryptionException):
+            aead.open_sealed(bytes(record), self.key)
+
+    def test_decrypt_legacy_fernet(self):
+        token = encrypt_fernet(b"password", self.key)
+        self.assertFalse(aead.is_sealed(token))
+        self.assertEqual(aead.decrypt_record(token, self.key), b"password")
+        with self.assertRaises(EncryptionException):
+            aead.decrypt_record(token, os.urandom(32))
+
+
+class TestRecordCipher(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(32)
+        self.cipher = aead.RecordCipher(self.key)
+
+    def test_many(self):
+        data = [b"description", b"", b"note" * 100]
+        records = self.cipher.encrypt_many(data)
+        self.assertEqual(len(records), len(data))
+        self.assertTrue(all(aead.is_sealed(record) for record in records))
+        self.assertEqual(self.cipher.decrypt_many(records), data)
+        self.assertEqual(
+            [aead.decrypt_record(record, self.key) for record in records], data
+        )
+
+    def test_memoryview(self):
+        buffer = memoryview(b"xxpasswordxx")[2:-2]
+        record = self.cipher.seal(buffer)
+        self.assertEqual(self.cipher.decrypt_many([memoryview(record)]), [b"password"])
+
+    def test_legacy_fernet(self):
+        tokens = [encrypt_fernet(b"a", self.key), aead.seal(b"b", self.key)]
+        self.assertEqual(self.cipher.decrypt_many(tokens), [b"a", b"b"])
+        with self.assertRaises(EncryptionException):
+            aead.RecordCipher(os.urandom(32)).decrypt_many(tokens)
+
+    def test_cipher_for(self):
+        self.assertIs(aead.cipher_for(self.key), aead.cipher_for(self.key))
+        self.assertIsNot(aead.cipher_for(self.key), aead.cipher_for(os.urandom(32)))
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(32)
+        self.cipher = aead.RecordCipher(self.key, threshold=64)
+
+    def test_compressed(self):
+        note = b"a long note that repeats itself " * 20
+        record = self.cipher.seal(note)
+        self.assertEqual(record[1], aead.FLAG_COMPRESSED)
+        self.assertLess(len(record), len(note))
+        self.assertEqual(self.cipher.open(record), note)
+        self.assertEqual(aead.RecordCipher(self.key, threshold=0).open(record), note)
+
+    def test_not_compressed(self):
+        for data in (b"short", os.urandom(256)):
+            record = self.cipher.seal(data)
+            self.assertEqual(record[1], 0)
+            self.assertEqual(len(record), 2 + aead.NONCE_SIZE + len(data) + 16)
+            self.assertEqual(self.cipher.open(record), data)
+
+        disabled = aead.RecordCipher(self.key, threshold=0)
+        self.assertEqual(disabled.seal(b"x" * 1000)[1], 0)
+
+    def test_associated_data(self):
+        record = self.cipher.seal(b"x" * 1000, b"row 1")
+        self.assertEqual(self.cipher.open(record, b"row 1"), b"x" * 1000)
+        with self.assertRaises(EncryptionException):
+            self.cipher.open(record, b"row 2")
+
+    def test_flags_authenticated(self):
+        compressed = bytearray(self.cipher.seal(b"x" * 1000))
+        compressed[1] = 0
+        plain = bytearray(self.cipher.seal(b"short"))
+        plain[1] = aead.FLAG_COMPRESSED
+        unknown = bytearray(self.cipher.seal(b"short"))
+        unknown[1] = 0x80
+        for record in (compressed, plain, unknown):
+            with self.assertRaises(EncryptionException):
+                self.cipher.open(bytes(record))
@@ -0,0 +1,50 @@
+# pylint: disable=C
+import unittest
+
+from src.crypto.blind_index import blind_index
+from src.crypto.blind_index import blind_index_key
+from src.crypto.envelope import generate_data_key
+
+
+class TestBlindIndex(unittest.TestCase):
+    def setUp(self):
+        self.key = blind_index_key(generate_data_key())
+
+    def test_deterministic(self):
+        self.assertEqual(
+            blind_index(self.key, b"Mail", b"me"), blind_index(self.key, b"Mail", b"me")
+        )
+        self.assertEqual(len(blind_index(self.key, b"Mail", None)), 32)
+
+    def test_distinct(self):
+        indexes = {
+            blind_index(self.key, b"Mail", b"me"),
+            blind_index(self.key, b"Mail", b"you"),
+            blind_index(self.key, b"Mail", None),
+            blind_index(self.key, b"Mailme", None),
+            blind_index(self.key, b"mail", b"me"),
+        }
+        self.assertEqual(len(indexes), 5)
+
+    def test_empty_username(self):
+        self.assertEqual(
+            blind_index(self.key, b"Mail", b""), blind_index(self.key, b"Mail", None)
+        )
+
+    def test_normalized(self):
+        composed = "Café".encode()
+        decomposed = "Café".encode()
+        self.assertEqual(
+            blind_index(self.key, composed, None),
+            blind_index(self.key, decomposed, None),
+        )
+
+    def test_keyed(self):
+        other = blind_index_key(generate_data_key())
+        self.assertNotEqual(
+            blind_index(self.key, b"Mail", None), blind_index(other, b"Mail", None)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
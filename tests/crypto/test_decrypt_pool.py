@@ -0,0 +1,63 @@
+# pylint: disable=C
+import os
+import unittest
+
+from src.crypto.decrypt_pool import DecryptPool
+from src.crypto.hashing import hash_sha256
+from src.crypto.key_derivation import KEY_CACHE
+from src.crypto.key_derivation import scrypt_derive
+from src.crypto.secret import SecretBuffer
+
+
+class TestDecryptPool(unittest.TestCase):
+    def test_serial_fallback(self):
+        pool = DecryptPool(workers=4, serial_threshold=10)
+        items = [bytes([i + 1]) for i in range(5)]
+        self.assertEqual(pool.map(hash_sha256, items), [hash_sha256(i) for i in items])
+        self.assertIsNone(pool._executor)
+
+    def test_parallel_keeps_order(self):
+        pool = DecryptPool(workers=2, serial_threshold=0)
+        items = [bytes([i + 1]) for i in range(50)]
+        try:
+            self.assertEqual(
+                pool.map(hash_sha256, items), [hash_sha256(i) for i in items]
+            )
+            self.assertIsNotNone(pool._executor)
+        finally:
+            pool.shutdown()
+
+
+class TestDeriveKeys(unittest.TestCase):
+    def tearDown(self):
+        KEY_CACHE.clear()
+
+    def test_derive_keys(self):
+        KEY_CACHE.clear()
+        _, cached = KEY_CACHE.derive(b"password")
+        salts = [os.urandom(16) for _ in range(3)]
+        pool = DecryptPool(workers=2, serial_threshold=10)
+        pool.derive_keys(SecretBuffer("password"), [cached, *salts, salts[0]])
+        self.assertEqual(KEY_CACHE.misses, 4)
+        self.assertIsNone(pool._executor)
+        for salt in salts:
+            self.assertEqual(
+                KEY_CACHE.derive(b"password", salt)[0],
+                scrypt_derive(b"password", salt)[0],
+            )
+        self.assertEqual(KEY_CACHE.hits, 3)
+
+    def test_derive_keys_in_workers(self):
+        KEY_CACHE.clear()
+        salts = [os.urandom(16) for _ in range(3)]
+        pool = DecryptPool(workers=2, serial_threshold=0)
+        try:
+            pool.derive_keys(SecretBuffer("password"), salts)
+            self.assertIsNotNone(pool._executor)
+        finally:
+            pool.shutdown()
+        self.assertEqual(
+            [KEY_CACHE.derive(b"password", salt)[0] for salt in salts],
+            [scrypt_derive(b"password", salt)[0] for salt in salts],
+        )
+        self.assertEqual(KEY_CACHE.hits, 3)
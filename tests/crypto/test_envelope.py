@@ -0,0 +1,18 @@
+# pylint: disable=C
+import unittest
+
+import src.crypto.envelope as envelope
+from src.exceptions.encryption_exception import EncryptionException
+
+
+class TestEnvelope(unittest.TestCase):
+    def test_wrap_unwrap(self):
+        data_key = envelope.generate_data_key()
+        wrapped, salt = envelope.wrap_data_key(data_key, b"password")
+        self.assertNotEqual(wrapped, data_key)
+        self.assertEqual(envelope.unwrap_data_key(wrapped, b"password", salt), data_key)
+
+    def test_unwrap_wrong_password(self):
+        wrapped, salt = envelope.wrap_data_key(envelope.generate_data_key(), b"pw")
+        with self.assertRaises(EncryptionException):
+            envelope.unwrap_data_key(wrapped, b"wrong", salt)
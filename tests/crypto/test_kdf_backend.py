@@ -0,0 +1,51 @@
+# pylint: disable=C
+import hashlib
+import os
+import unittest
+from unittest import mock
+
+import src.crypto.kdf_backend as backends
+import src.crypto.key_derivation as kdf
+
+
+class TestKdfBackend(unittest.TestCase):
+    def test_scrypt_backends_agree(self):
+        salt = os.urandom(16)
+        cost = (2**10, 8, 1)
+        self.assertEqual(
+            backends.KDF_BACKENDS[backends.SCRYPT].derive(b"password", salt, cost),
+            backends.KDF_BACKENDS[backends.HASHLIB_SCRYPT].derive(
+                b"password", salt, cost
+            ),
+        )
+
+    @mock.patch("hashlib.scrypt", return_value=b"key")
+    def test_hashlib_scrypt_memory_limit(self, scrypt):
+        backend = backends.KDF_BACKENDS[backends.HASHLIB_SCRYPT]
+        backend.derive(b"password", b"salt", (2**10, 8, 1))
+        self.assertEqual(scrypt.call_args.kwargs["maxmem"], 128 * 8 * (2**10 + 3))
+        backend.derive(b"password", b"salt", (2**22, 8, 1))
+        self.assertEqual(scrypt.call_args.kwargs["maxmem"], backends.MAX_SCRYPT_MEMORY)
+
+    def test_pbkdf2(self):
+        salt = os.urandom(16)
+        key = backends.KDF_BACKENDS[backends.PBKDF2_SHA256].derive(
+            b"password", salt, (2**10, 0, 0)
+        )
+        self.assertEqual(key, hashlib.pbkdf2_hmac("sha256", b"password", salt, 2**10))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            backends.backend_by_name("md5")
+
+    @mock.patch.dict(
+        os.environ, {"KDF_BACKEND": "pbkdf2-sha256", "PBKDF2_ITERATIONS": "1024"}
+    )
+    def test_backend_recorded_per_record(self):
+        key, salt = kdf.derive_key(b"password")
+        params = kdf.KdfParameters.from_bytes(salt)
+        self.assertEqual(params.algorithm, backends.PBKDF2_SHA256)
+        self.assertTrue(params.is_current())
+        with mock.patch.dict(os.environ, {"KDF_BACKEND": "scrypt"}):
+            self.assertFalse(params.is_current())
+            self.assertEqual(kdf.derive_key(b"password", salt)[0], key)
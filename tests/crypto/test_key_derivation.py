@@ -2,6 +2,7 @@
 import unittest
 
 import src.crypto.key_derivation as kdf
+from src.crypto.secret import SecretBuffer
 
 
 def test_scrypt_derive(self):
@@ -24,3 +25,96 @@ def test_scrypt_derive(self):
     salt = b"\x88w\xa2\x81\xdc\xc43QVI\xcfe0\xc1\x93\xab"
     is_same = kdf.scrypt_verify(test_pw, derived_key, salt)
     self.assertTrue(is_same)
+
+
+class TestKdfParameters(unittest.TestCase):
+    def test_roundtrip(self):
+        params = kdf.KdfParameters(kdf.SCRYPT, (2**15, 8, 2), b"0123456789abcdef")
+        decoded = kdf.KdfParameters.from_bytes(params.to_bytes())
+        self.assertEqual(
+            (decoded.algorithm, decoded.n, decoded.r, decoded.p, decoded.salt),
+            (kdf.SCRYPT, 2**15, 8, 2, b"0123456789abcdef"),
+        )
+
+    def test_legacy_salt(self):
+        salt = b"\x88w\xa2\x81\xdc\xc43QVI\xcfe0\xc1\x93\xab"
+        params = kdf.KdfParameters.from_bytes(salt)
+        self.assertEqual((params.n, params.r, params.p), (2**14, 8, 1))
+        self.assertEqual(
+            kdf.derive_key(b"password", salt)[0],
+            kdf.scrypt_derive(b"password", salt)[0],
+        )
+
+    def test_derive_key_stores_parameters(self):
+        key, salt = kdf.derive_key(b"password")
+        self.assertTrue(kdf.KdfParameters.from_bytes(salt).is_current())
+        self.assertEqual(kdf.derive_key(b"password", salt)[0], key)
+
+    def test_invalid_cost(self):
+        with self.assertRaises(ValueError):
+            kdf.KdfParameters(kdf.SCRYPT, (1000, 8, 1), b"")
+
+    def test_calibrate(self):
+        n, r, p = kdf.calibrate_scrypt(0)
+        self.assertEqual((n, r, p), (2**14, 8, 1))
+
+
+class TestDerivedKeyCache(unittest.TestCase):
+    def test_cached_derivation(self):
+        cache = kdf.DerivedKeyCache(max_size=2)
+        key, salt = cache.derive(b"password")
+        self.assertEqual(cache.derive(b"password", salt), (key, salt))
+        self.assertEqual(key, kdf.derive_key(b"password", salt)[0])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_different_password_misses(self):
+        cache = kdf.DerivedKeyCache(max_size=2)
+        key, salt = cache.derive(b"password")
+        other_key, _ = cache.derive(b"other", salt)
+        self.assertNotEqual(key, other_key)
+        self.assertEqual(cache.misses, 2)
+
+    def test_eviction(self):
+        cache = kdf.DerivedKeyCache(max_size=2)
+        _, first_salt = cache.derive(b"password")
+        cache.derive(b"password")
+        cache.derive(b"password")
+        self.assertEqual(len(cache), 2)
+        cache.derive(b"password", first_salt)
+        self.assertEqual(cache.hits, 0)
+
+    def test_clear(self):
+        cache = kdf.DerivedKeyCache(max_size=2)
+        _, salt = cache.derive(b"password")
+        cache.derive(b"password", salt)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_add_and_missing(self):
+        cache = kdf.DerivedKeyCache(max_size=2)
+        key, salt = cache.derive(b"password")
+        self.assertEqual(cache.missing(b"password", [salt, b"a", b"a"]), [b"a"])
+        self.assertEqual(cache.missing(b"other", [salt]), [salt])
+        self.assertEqual(cache.missing(b"password", [b"a", b"b", b"c"]), [b"a", b"b"])
+        cache.add(b"password", b"a", b"key")
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.derive(b"password", b"a"), (b"key", b"a"))
+        self.assertEqual(cache.derive(b"password", salt), (key, salt))
+        self.assertEqual(cache.missing(b"password", [salt, b"a"]), [])
+
+    def test_secret_shares_entries(self):
+        cache = kdf.DerivedKeyCache(max_size=2)
+        key, salt = cache.derive(SecretBuffer("password"))
+        self.assertEqual(cache.derive(b"password", salt), (key, salt))
+        self.assertEqual(cache.hits, 1)
+
+
+class TestDeriveSaltedKey(unittest.TestCase):
+    def test_derive_and_wipe(self):
+        salt = b"0123456789abcdef"
+        password = bytearray(b"password")
+        key = kdf.derive_salted_key((password, salt))
+        self.assertEqual(key, kdf.scrypt_derive(b"password", salt)[0])
+        self.assertEqual(password, bytearray(8))
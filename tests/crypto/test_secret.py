@@ -0,0 +1,38 @@
+# pylint: disable=C
+import unittest
+
+from src.crypto.secret import SecretBuffer
+from src.crypto.secret import fingerprint
+
+
+class TestSecretBuffer(unittest.TestCase):
+    def test_view(self):
+        secret = SecretBuffer("password")
+        view = secret.view()
+        self.assertEqual(view, b"password")
+        self.assertTrue(view.readonly)
+        self.assertEqual(len(secret), 8)
+
+    def test_wipe(self):
+        secret = SecretBuffer(b"password")
+        view = secret.view()
+        secret.wipe()
+        self.assertTrue(secret.is_wiped)
+        self.assertEqual(view, bytes(8))
+        with self.assertRaises(ValueError):
+            secret.view()
+
+    def test_equality(self):
+        self.assertEqual(SecretBuffer("password"), SecretBuffer(b"password"))
+        self.assertNotEqual(SecretBuffer("password"), SecretBuffer("other"))
+        wiped = SecretBuffer("password")
+        wiped.wipe()
+        self.assertNotEqual(wiped, SecretBuffer("password"))
+
+    def test_repr_hides_secret(self):
+        self.assertNotIn("password", repr(SecretBuffer("password")))
+
+    def test_fingerprint(self):
+        secret = SecretBuffer("password")
+        self.assertEqual(secret.fingerprint, fingerprint(b"password"))
+        self.assertNotEqual(secret.fingerprint, fingerprint(b"other"))
@@ -0,0 +1,83 @@
+# pylint: disable=C
+import datetime
+import os
+import pickle
+import unittest
+
+from src.model.codec import CODEC_VERSION
+from src.model.codec import MARKER
+from src.model.codec import Decoder
+from src.model.codec import Encoder
+from src.model.codec import decode_list
+from src.model.codec import decode_optional
+from src.model.codec import encode_list
+from src.model.codec import encode_optional
+from src.model.codec import is_encoded
+from src.model.codec import load_legacy
+
+
+class TestCodec(unittest.TestCase):
+    def test_encoder_decoder(self):
+        encoder = Encoder()
+        encoder.write_byte(3)
+        encoder.write_bytes(b"value")
+        encoder.write_optional(None)
+        encoder.write_list([b"a", b"", b"bc"])
+        encoder.write_optional(b"")
+
+        decoder = Decoder(encoder.to_bytes())
+        self.assertEqual(decoder.read_byte(), 3)
+        self.assertEqual(decoder.read_bytes(), b"value")
+        self.assertIsNone(decoder.read_optional())
+        self.assertEqual(decoder.read_list(), [b"a", b"", b"bc"])
+        self.assertEqual(decoder.read_optional(), b"")
+        with self.assertRaises(ValueError):
+            decoder.read_byte()
+
+    def test_optional(self):
+        for value in (None, b"", os.urandom(40)):
+            self.assertEqual(decode_optional(encode_optional(value)), value)
+
+    def test_list(self):
+        for values in ([], [b""], [os.urandom(40), os.urandom(12)]):
+            self.assertEqual(decode_list(encode_list(values)), values)
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            decode_list(encode_list([b"abc", b"def"])[:-1])
+        encoder = Encoder()
+        encoder.write_bytes(b"abc")
+        with self.assertRaises(ValueError):
+            Decoder(encoder.to_bytes()[:-1]).read_bytes()
+
+    def test_unknown_version(self):
+        data = bytes([MARKER, CODEC_VERSION + 1]) + encode_list([])[2:]
+        self.assertTrue(is_encoded(data))
+        with self.assertRaises(ValueError):
+            decode_list(data)
+        with self.assertRaises(ValueError):
+            Decoder(data)
+
+    def test_legacy(self):
+        timestamp = datetime.datetime.now()
+        self.assertFalse(is_encoded(pickle.dumps(b"salt")))
+        self.assertEqual(decode_optional(pickle.dumps(b"salt")), b"salt")
+        self.assertIsNone(decode_optional(pickle.dumps(None)))
+        self.assertEqual(decode_list(pickle.dumps([b"a", b"b"])), [b"a", b"b"])
+        self.assertEqual(load_legacy(pickle.dumps(timestamp)), timestamp)
+
+    def test_legacy_wrong_type(self):
+        with self.assertRaises(TypeError):
+            decode_optional(pickle.dumps("text"))
+        with self.assertRaises(TypeError):
+            decode_list(pickle.dumps([b"a", 1]))
+
+    def test_legacy_rejects_other_classes(self):
+        with self.assertRaises(pickle.UnpicklingError):
+            load_legacy(pickle.dumps(os.system))
+        with self.assertRaises(pickle.UnpicklingError):
+            load_legacy(pickle.dumps(datetime.date.today()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,18 @@
+import os
 import pickle
 import unittest
+
+from src.crypto.aes256 import encrypt_aes
+from src.crypto.secret import SecretBuffer
 from src.model.password import Password, adapt_password, convert_password
+from src.model.password import adapt_passwords, convert_passwords
 from src.exceptions.encryption_exception import EncryptionException
 
 
 class TestPassword(unittest.TestCase):
     def setUp(self):
         self.password = Password("test_password")
-        self.user_password = "FakePassword"
+        self.user_password = SecretBuffer("FakePassword")
 
     def test_encrypt_decrypt(self):
         self.password.encrypt(self.user_password)
@@ -17,6 +22,18 @@ class TestPassword(unittest.TestCase):
         self.assertFalse(self.password.is_encrypted)
         self.assertNotEqual(encrypted_password, self.password())
 
+    def test_decrypt_legacy_aes_cbc(self):
+        key = os.urandom(32)
+        self.password.encrypt_with_key(key, b"")
+        legacy = Password("unused")
+        del legacy.record_format
+        legacy.password_bytes = encrypt_aes(b"test_password", key)
+        legacy.is_encrypted = True
+        legacy.decrypt_with_key(key)
+        self.assertEqual(legacy(), b"test_password")
+        self.password.decrypt_with_key(key)
+        self.assertEqual(self.password(), b"test_password")
+
     def test_make_master(self):
         self.password.make_master()
         self.assertTrue(self.password.is_master)
@@ -45,6 +62,24 @@ class TestPassword(unittest.TestCase):
         self.assertIsInstance(deserialized_password, Password)
         self.assertTrue(deserialized_password.is_encrypted)
 
+    def test_convert_legacy_password(self):
+        self.password.encrypt(self.user_password)
+        deserialized_password = convert_password(pickle.dumps(self.password))
+        self.assertEqual(deserialized_password(), self.password())
+        self.assertEqual(deserialized_password.salt, self.password.salt)
+
+    def test_convert_passwords(self):
+        self.password.encrypt(self.user_password)
+        master = Password("master")
+        master.make_master()
+        passwords = convert_passwords(adapt_passwords([self.password, master]))
+        self.assertEqual(passwords[0](), self.password())
+        self.assertEqual(passwords[0].salt, self.password.salt)
+        self.assertTrue(passwords[0].is_encrypted)
+        self.assertTrue(passwords[1].is_master)
+        self.assertIsNone(passwords[1].salt)
+        self.assertEqual(passwords[1](), master())
+
     def test_adapt_password_not_encrypted(self):
         with self.assertRaises(TypeError):
             adapt_password(self.password)
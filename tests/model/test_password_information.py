@@ -1,10 +1,17 @@
+import os
 import pickle
 import unittest
+from unittest import mock
 
+from src.crypto.envelope import DATA_KEY_SALT
+from src.crypto.envelope import generate_data_key
 from src.crypto.placeholder import dummy_decrypt_fernet
+from src.crypto.secret import SecretBuffer
 from src.model.metadata import EncryptedMetadata
 from src.model.metadata import Metadata
 from src.model.password import Password
+from src.model.password_information import FIELD_ENTRY
+from src.model.password_information import SEALED_ENTRY
 from src.model.password_information import PasswordInformation
 from src.model.user import User
 
@@ -34,6 +41,7 @@ class TestPasswordInformation(unittest.TestCase):
         info.add_category("Test")
         self.assertRaises(ValueError, info.add_category, "Test")
 
+    @mock.patch.dict(os.environ, {"ENTRY_FORMAT": FIELD_ENTRY})
     def test_encrypt(self):
         info, _, _ = create_test_info()
         info.add_password(Password("test2"))
@@ -41,28 +49,240 @@ class TestPasswordInformation(unittest.TestCase):
             self.assertFalse(password.is_encrypted)
         self.assertIsInstance(info.metadata, Metadata)
 
-        info.encrypt_data(user_password="FakeKey")
-        info.encrypt_passwords(user_password="FakeKey")
+        info.encrypt_data(user_password=SecretBuffer("FakeKey"))
+        info.encrypt_passwords(user_password=SecretBuffer("FakeKey"))
         for password in info.passwords:
             self.assertTrue(password.is_encrypted)
         self.assertIsInstance(info.metadata, EncryptedMetadata)
 
+    @mock.patch.dict(os.environ, {"ENTRY_FORMAT": FIELD_ENTRY})
     def test_decrypt(self):
         info, _, _ = create_test_info()
 
         info.add_password(Password("test2"))
-        info.encrypt_data(user_password="FakeKey")
-        info.encrypt_passwords(user_password="FakeKey")
+        info.encrypt_data(user_password=SecretBuffer("FakeKey"))
+        info.encrypt_passwords(user_password=SecretBuffer("FakeKey"))
         for password in info.passwords:
             self.assertTrue(password.is_encrypted)
         self.assertIsInstance(info.metadata, EncryptedMetadata)
 
-        info.decrypt_data(user_password="FakeKey")
-        info.decrypt_passwords(user_password="FakeKey")
+        info.decrypt_data(user_password=SecretBuffer("FakeKey"))
+        info.decrypt_passwords(user_password=SecretBuffer("FakeKey"))
         for password in info.passwords:
             self.assertFalse(password.is_encrypted)
         self.assertIsInstance(info.metadata, Metadata)
 
+    def test_data_key(self):
+        info, _, user = create_test_info()
+        user.set_data_key(generate_data_key())
+        info.encrypt_data()
+        info.encrypt_passwords()
+        self.assertEqual(info.get_salt(), DATA_KEY_SALT)
+        for password in info.passwords:
+            self.assertEqual(password.salt, DATA_KEY_SALT)
+
+        info.decrypt_data()
+        info.decrypt_passwords()
+        self.assertEqual(info.details.description, b"Test Password")
+        self.assertEqual(info.passwords[-1](), b"test")
+
+    @mock.patch.dict(os.environ, {"ENTRY_FORMAT": SEALED_ENTRY})
+    def test_sealed_entry(self):
+        info, _, user = create_test_info()
+        user.set_data_key(generate_data_key())
+        info.add_password(Password("test2"))
+        info.add_category("Test")
+        info.set_note("Note")
+        created_at = info.metadata.created_at
+
+        info.encrypt_data()
+        info.encrypt_passwords()
+        self.assertIsNotNone(info.sealed_entry)
+        self.assertIsNotNone(info.sealed_body)
+        self.assertEqual(info.details.description, b"")
+        self.assertEqual(len(info.passwords), 2)
+        for password in info.passwords:
+            self.assertTrue(password.is_encrypted)
+
+        info.decrypt_data()
+        info.decrypt_passwords()
+        self.assertIsNone(info.sealed_entry)
+        self.assertFalse(info.data_is_encrypted)
+        self.assertEqual(info.details.description, b"Test Password")
+        self.assertEqual(info.details.categories, [b"Test"])
+        self.assertEqual(info.details.note, b"Note")
+        self.assertIsInstance(info.metadata, Metadata)
+        self.assertEqual(info.metadata.created_at, created_at)
+        self.assertEqual(
+            [password() for password in info.passwords], [b"test", b"test2"]
+        )
+
+    @mock.patch.dict(os.environ, {"ENTRY_FORMAT": SEALED_ENTRY})
+    def test_sealed_entry_from_encrypted_passwords(self):
+        info, _, _ = create_test_info()
+        info.encrypt_passwords(user_password=SecretBuffer("FakeKey"))
+        info.encrypt_data(user_password=SecretBuffer("FakeKey"))
+
+        info.decrypt_data(user_password=SecretBuffer("FakeKey"))
+        info.decrypt_passwords(user_password=SecretBuffer("FakeKey"))
+        self.assertEqual(info.passwords[-1](), b"test")
+
+    def test_apply_summary(self):
+        for entry_format in (FIELD_ENTRY, SEALED_ENTRY):
+            with mock.patch.dict(os.environ, {"ENTRY_FORMAT": entry_format}):
+                info, _, user = create_test_info()
+                user.set_data_key(generate_data_key())
+                info.add_category("Test")
+                info.encrypt_data()
+                info.encrypt_passwords()
+                info.mark_clean()
+
+                info.apply_summary(b"Test Password", None)
+                self.assertFalse(info.data_is_encrypted)
+                self.assertIsNotNone(info._pending)
+                self.assertEqual(info.details.description, b"Test Password")
+
+                self.assertEqual(info.details.categories, [b"Test"])
+                self.assertIsNone(info._pending)
+                self.assertIsInstance(info.metadata, Metadata)
+                info.decrypt_passwords()
+                self.assertEqual(info.passwords[-1](), b"test")
+
+                info.encrypt_data()
+                self.assertEqual(info.dirty_fields, set())
+
+    def test_lazy_fields_stay_encrypted(self):
+        with mock.patch.dict(os.environ, {"ENTRY_FORMAT": FIELD_ENTRY}):
+            info, _, user = create_test_info()
+            user.set_data_key(generate_data_key())
+            info.set_note("Note")
+            info.encrypt_data()
+            info.mark_clean()
+            note = info.details.note
+            metadata = info.metadata
+
+            info.apply_summary(b"Test Password", None)
+            info.details.description = b"Renamed"
+            info.encrypt_data()
+            self.assertEqual(info.dirty_fields, {"description", "blind_index"})
+            self.assertEqual(info.blind_index, user.blind_index(b"Renamed", None))
+            self.assertEqual(info.details.note, note)
+            self.assertIs(info.metadata, metadata)
+
+    @mock.patch.dict(os.environ, {"ENTRY_FORMAT": FIELD_ENTRY})
+    def test_dirty_fields(self):
+        info, _, user = create_test_info()
+        user.set_data_key(generate_data_key())
+        info.encrypt_data()
+        info.encrypt_passwords()
+        info.mark_clean()
+        description = info.details.description
+        metadata = info.metadata
+
+        info.decrypt_data()
+        self.assertEqual(info.dirty_fields, set())
+        info.encrypt_data()
+        self.assertEqual(info.dirty_fields, set())
+        self.assertEqual(info.details.description, description)
+        self.assertIs(info.metadata, metadata)
+
+        info.decrypt_data()
+        info.details.note = b"Note"
+        info.modify()
+        info.encrypt_data()
+        self.assertEqual(info.dirty_fields, {"note", "metadata"})
+        self.assertEqual(info.details.description, description)
+        self.assertIsNot(info.metadata, metadata)
+
+        info.decrypt_data()
+        self.assertEqual(info.details.note, b"Note")
+        info.add_password(Password("test2"))
+        info.encrypt_data()
+        info.encrypt_passwords()
+        self.assertEqual(info.dirty_fields, {"passwords", "metadata"})
+
+    @mock.patch.dict(os.environ, {"ENTRY_FORMAT": SEALED_ENTRY})
+    def test_dirty_sealed_entry(self):
+        info, _, user = create_test_info()
+        user.set_data_key(generate_data_key())
+        info.encrypt_data()
+        info.mark_clean()
+        sealed_entry = info.sealed_entry
+
+        info.decrypt_data()
+        info.encrypt_data()
+        self.assertEqual(info.dirty_fields, set())
+        self.assertEqual(info.sealed_entry, sealed_entry)
+
+        info.decrypt_data()
+        info.add_category("Test")
+        info.encrypt_data()
+        self.assertEqual(info.dirty_fields, {"body"})
+        self.assertEqual(info.sealed_entry, sealed_entry)
+
+        info.decrypt_data()
+        info.details.description = b"Renamed"
+        info.modify()
+        info.encrypt_data()
+        self.assertEqual(info.dirty_fields, {"entry", "body", "blind_index"})
+        self.assertNotEqual(info.sealed_entry, sealed_entry)
+
+    def test_blind_index(self):
+        info, _, user = create_test_info()
+        info.encrypt_data(user_password=SecretBuffer("FakeKey"))
+        self.assertIsNone(info.blind_index)
+
+        info, _, user = create_test_info()
+        user.set_data_key(generate_data_key())
+        info.encrypt_data()
+        self.assertIn("blind_index", info.dirty_fields)
+        self.assertEqual(info.blind_index, user.blind_index(b"Test Password", None))
+
+        info.mark_clean()
+        info.decrypt_data()
+        info.set_note("Note")
+        info.encrypt_data()
+        self.assertNotIn("blind_index", info.dirty_fields)
+
+    def test_history(self):
+        info, _, _ = create_test_info()
+        self.assertEqual(info.unstored_passwords(), [(0, info.passwords[0])])
+
+        current = Password("current")
+        info.set_history([current], 3)
+        info.mark_clean()
+        self.assertFalse(info.history_loaded)
+        self.assertEqual(info.history_start, 2)
+        self.assertEqual(info.unstored_passwords(), [])
+
+        new = Password("new")
+        info.add_password(new)
+        self.assertEqual(info.unstored_passwords(), [(3, new)])
+        self.assertRaises(ValueError, info.load_history, [Password("old")])
+
+        older = [Password("old"), Password("older")]
+        info.load_history(older)
+        self.assertTrue(info.history_loaded)
+        self.assertEqual(info.passwords, [*older, current, new])
+
+        info.rewrite_history()
+        self.assertEqual(
+            info.unstored_passwords(), list(enumerate([*older, current, new]))
+        )
+
+    def test_format_change_rewrites_all(self):
+        info, _, user = create_test_info()
+        user.set_data_key(generate_data_key())
+        with mock.patch.dict(os.environ, {"ENTRY_FORMAT": FIELD_ENTRY}):
+            info.encrypt_data()
+        info.mark_clean()
+        info.decrypt_data()
+        with mock.patch.dict(os.environ, {"ENTRY_FORMAT": SEALED_ENTRY}):
+            info.encrypt_data()
+        self.assertIn("entry", info.dirty_fields)
+        self.assertIn("body", info.dirty_fields)
+        self.assertIn("description", info.dirty_fields)
+
 
 def create_test_info() -> tuple[PasswordInformation, Password, User]:
     test_password = Password("test")
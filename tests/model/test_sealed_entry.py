@@ -0,0 +1,66 @@
+# pylint: disable=C
+import os
+import pickle
+import unittest
+
+from src.crypto.aead import seal
+from src.model.metadata import Metadata
+from src.model.password import Password
+from src.model.sealed_entry import decrypt_summary
+from src.model.sealed_entry import entry_body
+from src.model.sealed_entry import entry_head
+from src.model.sealed_entry import open_entry_body
+from src.model.sealed_entry import open_entry_head
+
+
+class TestSealedEntry(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(32)
+        self.metadata = Metadata()
+
+    def test_head_and_body(self):
+        head = seal(entry_head(b"Description", b"Username"), self.key)
+        body = seal(
+            entry_body(([b"Category"], b"Note"), self.metadata),
+            self.key,
+        )
+
+        self.assertEqual(open_entry_head(head, self.key), (b"Description", b"Username"))
+        categories, note, metadata, passwords = open_entry_body(body, self.key)
+        self.assertEqual(categories, [b"Category"])
+        self.assertEqual(note, b"Note")
+        self.assertEqual(metadata.created_at, self.metadata.created_at)
+        self.assertEqual(passwords, [])
+
+    def test_single_record_layout(self):
+        entry = seal(
+            pickle.dumps(
+                (
+                    1,
+                    b"Description",
+                    None,
+                    [],
+                    None,
+                    self.metadata.created_at,
+                    self.metadata.last_modified,
+                    [b"password"],
+                )
+            ),
+            self.key,
+        )
+        self.assertEqual(open_entry_head(entry, self.key), (b"Description", None))
+        _, _, _, passwords = open_entry_body(entry, self.key)
+        self.assertEqual(passwords[0](), b"password")
+
+    def test_decrypt_summary(self):
+        head = seal(entry_head(b"Description", None), self.key)
+        self.assertEqual(
+            decrypt_summary(self.key, head, b"", None), (b"Description", None)
+        )
+        fields = (
+            self.key,
+            None,
+            seal(b"Description", self.key),
+            seal(b"User", self.key),
+        )
+        self.assertEqual(decrypt_summary(*fields), (b"Description", b"User"))
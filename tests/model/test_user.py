@@ -19,6 +19,12 @@ class TestUser(unittest.TestCase):
         self.assertEqual(user.username, hash_sha256(b"test"))
         self.assertEqual(user.password(), hash_sha256(b"test"))
 
+    def test_init_user_id(self):
+        user = User(hash_sha256(b"test"), Password("test"))
+        self.assertIsNone(user.id)
+        user = User(hash_sha256(b"test"), Password("test"), 3)
+        self.assertEqual(user.id, 3)
+
     def test_init_static_user(self):
         """
         Test the static method `User.new()` for creating a User instance.
@@ -27,3 +33,15 @@ class TestUser(unittest.TestCase):
         self.assertIsInstance(user, User)
         self.assertEqual(user.username, hash_sha256(b"test"))
         self.assertEqual(user.password(), hash_sha256(b"test"))
+
+    def test_wipe_clear_password(self):
+        user = User.new("test", "test")
+        user.set_clear_password("first")
+        first = user.get_clear_password()
+        user.set_clear_password("second")
+        self.assertTrue(first.is_wiped)
+        self.assertEqual(user.get_clear_password().view(), b"second")
+        user.wipe_clear_password()
+        self.assertFalse(user.has_clear_password())
+        with self.assertRaises(ValueError):
+            user.get_clear_password()